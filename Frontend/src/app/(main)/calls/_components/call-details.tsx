@@ -1,13 +1,35 @@
 
 'use client';
+import { useEffect, useState } from 'react';
 import { Play, Phone } from 'lucide-react';
 import { ApiCall as Call } from '@/lib/types';
+import { API_BASE_URL } from '@/lib/config';
 
 interface CallDetailsProps {
   selectedCall: Call | null;
 }
 
 export function CallDetails({ selectedCall }: CallDetailsProps) {
+  const [transcript, setTranscript] = useState<string | null>(null);
+
+  // Transcripts are not in the call listing; load the selected one on demand
+  useEffect(() => {
+    if (!selectedCall) return;
+    if (selectedCall.transcript) {
+      setTranscript(selectedCall.transcript);
+      return;
+    }
+    let cancelled = false;
+    setTranscript(null);
+    fetch(`${API_BASE_URL}/calls/${encodeURIComponent(selectedCall.conv_id)}/transcript`)
+      .then((res) => (res.ok ? res.json() : Promise.reject(new Error(`HTTP ${res.status}`))))
+      .then((data) => { if (!cancelled) setTranscript(data?.transcript ?? ''); })
+      .catch(() => { if (!cancelled) setTranscript(''); });
+    return () => {
+      cancelled = true;
+    };
+  }, [selectedCall]);
+
   if (!selectedCall) {
     return (
       <div className="flex flex-col items-center justify-center h-full text-center">
@@ -48,7 +70,7 @@ export function CallDetails({ selectedCall }: CallDetailsProps) {
         <div>
           <p className="text-sm text-gray-600 mb-2">Transcript</p>
           <div className="p-3 bg-gray-50 rounded text-xs text-gray-700 max-h-40 overflow-y-auto border">
-            {selectedCall.transcript}
+            {transcript === null ? 'Loading transcript...' : transcript || 'No transcript available.'}
           </div>
         </div>
         <div className="pt-4 border-t border-gray-200">
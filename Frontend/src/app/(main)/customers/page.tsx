@@ -127,29 +127,19 @@ export default function CustomersHubPage() {
       setLoading({ customers: true, leads: true, events: true });
 
       try {
-        const [customersResponse, leadsResponse, eventsResponse] = await Promise.all([
-          fetch(`${API_BASE_URL}/customers/?skip=0&limit=100`),
-          fetch(`${API_BASE_URL}/leads/?skip=0&limit=100`),
-          fetch(`${API_BASE_URL}/events/?skip=0&limit=100`),
-        ]);
-
-        if (!customersResponse.ok) throw new Error(`HTTP error on customers: ${customersResponse.status} ${await customersResponse.text() || customersResponse.statusText}`);
-        if (!leadsResponse.ok) throw new Error(`HTTP error on leads: ${leadsResponse.status} ${await leadsResponse.text() || leadsResponse.statusText}`);
-        if (!eventsResponse.ok) throw new Error(`HTTP error on events: ${eventsResponse.status} ${await eventsResponse.text() || eventsResponse.statusText}`);
-
-        const [customersDataRaw, leadsDataRaw, eventsDataRaw] = await Promise.all([
-          customersResponse.json(),
-          leadsResponse.json(),
-          eventsResponse.json(),
-        ]);
+        // One pre-joined payload instead of three list calls
+        const response = await fetch(`${API_BASE_URL}/customers/page-data?limit=100`);
+        if (!response.ok) throw new Error(`HTTP error on customers page: ${response.status} ${await response.text() || response.statusText}`);
+
+        const pageData = await response.json();
 
         if (cancelled) return;
         
         setError(null);
 
-        const customersArray = Array.isArray(customersDataRaw) ? customersDataRaw : [customersDataRaw];
-        const leadsArray = Array.isArray(leadsDataRaw) ? leadsDataRaw : [leadsDataRaw];
-        const eventsArray = Array.isArray(eventsDataRaw) ? eventsDataRaw : [eventsDataRaw];
+        const customersArray = Array.isArray(pageData?.customers) ? pageData.customers : [];
+        const leadsArray = Array.isArray(pageData?.leads) ? pageData.leads : [];
+        const eventsArray = Array.isArray(pageData?.events) ? pageData.events : [];
 
         setCustomers(customersArray.map(normalizeCustomer));
         setLeads(leadsArray.map(normalizeLead));
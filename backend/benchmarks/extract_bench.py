@@ -0,0 +1,151 @@
+"""
+extract_bench.py
+----------------
+Microbenchmark: the old hand-written extract_call_analysis vs the
+spec-driven extractor (services/call_analysis_extractor.py), on a corpus of
+post-call payloads. Also checks that both produce the same row for every
+payload, so a spec change that alters output shows up here.
+
+The corpus is either a directory of captured webhook bodies (*.json, as used
+by webhook_replay.py) or synthetic payloads with missing fields, failed
+criteria and odd values mixed in.
+
+Run from the repo root:
+    python -m backend.benchmarks.extract_bench [--captures captures/] [--payloads 2000] [--repeat 5]
+"""
+
+import random
+import argparse
+import timeit
+from typing import Any, Dict, List
+
+from backend.benchmarks.fakes import post_call_payload
+from backend.benchmarks.webhook_replay import load_captures
+from backend.services.call_analysis_extractor import extract_call_fields
+from backend.utils.phone import normalize_phone_or_none
+
+
+def _legacy_transcript_text(transcript_array: list) -> str:
+    try:
+        messages = []
+        for turn in transcript_array:
+            if turn.get("message"):
+                messages.append(f"{turn.get('role', 'unknown')}: {turn.get('message')}")
+        return "\n".join(messages)
+    except Exception:
+        return ""
+
+
+def _legacy_extract(webhook_payload: Dict[str, Any]) -> Dict[str, Any]:
+    # The previous elevenlabs_router.extract_call_analysis, kept here as the baseline
+    try:
+        data = webhook_payload.get("data", {})
+        analysis = data.get("analysis", {})
+        metadata = data.get("metadata", {})
+        eval_results = analysis.get("evaluation_criteria_results", {})
+        collected_data = analysis.get("data_collection_results", {})
+        transcript_text = _legacy_transcript_text(data.get("transcript", []))
+
+        booking_success = eval_results.get("booking_successful", {}).get("result") == "success"
+        human_transfer_eval = eval_results.get("human_transfer_needed", {})
+        human_agent_flag = human_transfer_eval.get("result") == "failure"
+        human_intervention_reason = human_transfer_eval.get("rationale", "")[:100] if human_agent_flag else ""
+        ai_detected_flag = eval_results.get("ai_detected_by_customer", {}).get("result") == "failure"
+        product_inquiry_resolved = eval_results.get("inquiry_resolved", {}).get("result") == "success"
+        out_of_scope = eval_results.get("out_of_scope", {}).get("result") == "failure"
+        conversation_completed_eval = eval_results.get("conversation_completed", {})
+        failed_conversation_reason = ""
+        if conversation_completed_eval.get("result") == "failure":
+            failed_conversation_reason = conversation_completed_eval.get("rationale", "")[:100]
+
+        sentiment_score = collected_data.get("sentiment_score", {}).get("value")
+        emotional_score = collected_data.get("emotional_score", {}).get("value")
+        customer_rating = collected_data.get("customer_satisfaction_rating", {}).get("value")
+        caller_number = normalize_phone_or_none(collected_data.get("caller_number", {}).get("value"))
+
+        if isinstance(sentiment_score, (int, float)):
+            sentiment_score = max(0.0, min(1.0, float(sentiment_score)))
+        else:
+            sentiment_score = 0.5
+        if isinstance(emotional_score, (int, float)):
+            emotional_score = max(0.0, min(1.0, float(emotional_score)))
+        else:
+            emotional_score = 0.5
+        if not isinstance(customer_rating, (int, float)):
+            customer_rating = 3
+
+        return {
+            "conv_id": data.get("conversation_id"),
+            "customer_rating": customer_rating,
+            "human_agent_flag": human_agent_flag,
+            "ai_detected_flag": ai_detected_flag,
+            "summary": analysis.get("transcript_summary", "") if analysis else "",
+            "sentiment_score": sentiment_score,
+            "emotional_score": emotional_score,
+            "human_intervention_reason": human_intervention_reason,
+            "failed_conversation_reason": failed_conversation_reason,
+            "out_of_scope": out_of_scope,
+            "transcript": transcript_text,
+            "booking_successful": booking_success,
+            "product_inquiry_resolved": product_inquiry_resolved,
+            "agent_id": data.get("agent_id"),
+            "duration": metadata.get("call_duration_secs", 0) if metadata else 0,
+            "cost": metadata.get("cost", 0) if metadata else 0,
+            "status": data.get("status"),
+            "customer_type": collected_data.get("customer_type", {}).get("value"),
+            "customer_id": collected_data.get("customer_id", {}).get("value"),
+            "call_intent": collected_data.get("call_intent", {}).get("value"),
+            "caller_name": collected_data.get("caller_name", {}).get("value"),
+            "caller_number": caller_number,
+        }
+    except Exception:
+        return {}
+
+
+def _synthetic_corpus(count: int) -> List[Dict[str, Any]]:
+    """Benchmark payloads with realistic variation: failed criteria, gaps, bad values."""
+    rnd = random.Random(42)
+    corpus = []
+    for i in range(count):
+        payload = post_call_payload(conv_id=f"conv_bench_{i}", turns=rnd.randint(0, 60))
+        analysis = payload["data"]["analysis"]
+        for criterion in analysis["evaluation_criteria_results"].values():
+            if rnd.random() < 0.3:
+                criterion["result"] = "failure"
+                criterion["rationale"] = "Caller asked for a human. " * rnd.randint(1, 8)
+        collected = analysis["data_collection_results"]
+        if rnd.random() < 0.2:
+            del collected["sentiment_score"]
+        if rnd.random() < 0.1:
+            collected["customer_satisfaction_rating"]["value"] = None
+        if rnd.random() < 0.1:
+            collected["emotional_score"]["value"] = 1.7
+        if rnd.random() < 0.1:
+            payload["data"]["metadata"] = {}
+        corpus.append(payload)
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark call analysis extraction.")
+    parser.add_argument("--captures", help="Directory of captured webhook bodies (default: synthetic corpus).")
+    parser.add_argument("--payloads", type=int, default=2000, help="Synthetic corpus size.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = load_captures(args.captures) if args.captures else _synthetic_corpus(args.payloads)
+
+    mismatches = [p for p in corpus if _legacy_extract(p) != extract_call_fields(p)]
+    print(f"{len(corpus)} payloads, {len(mismatches)} with different output")
+    for payload in mismatches[:3]:
+        legacy, extracted = _legacy_extract(payload), extract_call_fields(payload)
+        diff = {k: (legacy.get(k), extracted.get(k)) for k in set(legacy) | set(extracted) if legacy.get(k) != extracted.get(k)}
+        print(f"  {payload.get('data', {}).get('conversation_id')}: {diff}")
+
+    for name, fn in (("legacy", _legacy_extract), ("spec", extract_call_fields)):
+        best = min(timeit.repeat(lambda: [fn(p) for p in corpus], number=1, repeat=args.repeat))
+        print(f"{name:<10} {best * 1e6 / len(corpus):8.2f} us/payload")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,431 @@
+"""
+fakes.py
+--------
+Local stand-ins for the API's external dependencies, for benchmarks:
+
+- FakeSupabase: PostgREST table reads/writes (/rest/v1/<table>) and RPCs
+  (/rest/v1/rpc/<fn>) over deterministic synthetic rows
+- FakeBookeo: /bookings with pageNavigationToken pagination and periodic
+  429 + Retry-After responses
+- FakePayU: /oauth/token, /payment-links/ and /payment-links/<id>/txns
+- ElevenLabs webhooks: post_call_payload() / sign_elevenlabs() build signed
+  post-call webhooks (the API never calls ElevenLabs on that path)
+
+Every server adds a configurable fixed latency (plus jitter) to each
+response, so a benchmark can model a nearby or a distant dependency.
+Only the stdlib is used; each server runs on its own thread.
+
+Usage:
+    with FakeSupabase(latency_ms=20) as supabase, FakeBookeo(pages=3) as bookeo:
+        env = {"SUPABASE_URL": supabase.url, "BOOKEO_API_URL": bookeo.url, ...}
+"""
+
+import json
+import time
+import uuid
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from backend.utils.auth import get_hmac_key
+
+# A JWT-shaped key; supabase-py rejects keys that do not look like one
+FAKE_SUPABASE_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYmVuY2gifQ.YmVuY2g"
+
+# Synthetic timestamps start 30 days back, so incremental syncs see a recent watermark
+_EPOCH = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=30)
+
+
+# ================== SERVER BASE ==================
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real services
+
+    def _dispatch(self):
+        fake: "FakeServer" = self.server.fake
+        parts = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        fake.sleep()
+        status, payload, headers = fake.handle(self.command, parts.path, parse_qs(parts.query), body, self.headers)
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _dispatch
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeServer:
+    """A threaded HTTP server on 127.0.0.1 (random port) with injected latency."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, port: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def sleep(self):
+        with self._lock:
+            self.requests += 1
+        delay = self.latency_ms + (random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def handle(self, method: str, path: str, query: Dict[str, List[str]], body: bytes, headers) -> Tuple[int, Any, Optional[Dict[str, str]]]:
+        raise NotImplementedError
+
+    def start(self) -> "FakeServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ================== SUPABASE ==================
+
+def _iso(i: int, step_minutes: int = 37) -> str:
+    return (_EPOCH + timedelta(minutes=i * step_minutes)).isoformat()
+
+
+# Synthetic row per table; covers the columns the dashboard, KPI and compute routes read
+ROW_FACTORIES: Dict[str, Callable[[int], Dict[str, Any]]] = {
+    "call": lambda i: {
+        "conv_id": f"conv_{i:06d}",
+        "customer_id": f"cust_{i % 500:04d}",
+        "date_time": _iso(i),
+        "duration": 30 + i % 600,
+        "transcript": "agent: Hello\nuser: I want to book a room" if i % 9 else "",
+        "call_intent": ("booking", "pricing", "availability", "other")[i % 4],
+        "credits_consumed": 100 + i % 50,
+        "caller_name": f"Caller {i}",
+        "caller_number": f"+9198{i:08d}",
+    },
+    "call_analysis": lambda i: {
+        "conv_id": f"conv_{i:06d}",
+        "customer_rating": 1 + i % 5,
+        "human_agent_flag": i % 7 == 0,
+        "ai_detect_flag": i % 11 == 0,
+        "summary": "Customer asked about weekend availability.",
+        "sentiment_score": round((i % 100) / 100, 2),
+        "emotional_score": round(((i * 7) % 100) / 100, 2),
+        "human_intervention_reason": "",
+        "failed_conversation_reason": "abandoned" if i % 13 == 0 else "",
+        "out_of_scope": i % 17 == 0,
+    },
+    "bookings": lambda i: {
+        "booking_id": f"B{i:07d}",
+        "event_id": f"evt_{i % 40}",
+        "theme_id": f"theme_{i % 8}",
+        "customer_id": f"cust_{i % 500:04d}",
+        "start_time": _iso(i, 53),
+        "end_time": _iso(i, 53),
+        "creation_time": _iso(i),
+        "status": ("confirmed", "canceled", "booked")[i % 3],
+        "adults": 2 + i % 4,
+        "children": i % 3,
+        "total_gross": 2000.0 + i % 900,
+        "total_net": 1800.0 + i % 900,
+        "total_taxes": 200.0,
+        "total_paid": 1000.0 + i % 800,
+    },
+    "payment": lambda i: {
+        "payment_id": f"pay_{i:06d}",
+        "booking_id": f"B{i:07d}",
+        "payment_status": ("paid", "pending", "failed", "refunded")[i % 4],
+        "payment_amount": 500.0 + i % 1500,
+        "creation_time": _iso(i),
+    },
+    "leads": lambda i: {
+        "lead_id": f"lead_{i:06d}",
+        "status": ("new", "contacted", "qualified", "converted")[i % 4],
+        "source": ("website", "call", "walk_in")[i % 3],
+        "created_at": _iso(i),
+    },
+}
+
+# RPC name -> row factory; list-shaped RPCs return `rpc_rows` rows, KPI RPCs a single row
+RPC_RESULTS: Dict[str, Callable[[int], Dict[str, Any]]] = {
+    "get_calls_trend": lambda i: {"date": _iso(i * 39)[:10], "calls": 20 + i % 15},
+    "get_bookings_trend": lambda i: {"date": _iso(i * 39)[:10], "confirmed_bookings": 5 + i % 7},
+    "get_lead_funnel": lambda i: {"status": f"stage_{i}", "count": 100 - i * 10},
+    "get_lead_sources": lambda i: {"source": f"source_{i}", "conversions": 10 + i},
+    "get_customer_growth": lambda i: {"date": _iso(i * 39)[:10], "new_customers": 3 + i % 5},
+    "get_customer_segments": lambda i: {"city": f"city_{i}", "count": 40 + i},
+    "get_payments_status": lambda i: {"payment_status": ("paid", "pending", "failed")[i % 3], "total": 1000.0 * (i + 1)},
+    "get_call_intent_summary": lambda i: {"call_intent": f"intent_{i}", "count": 25 + i},
+}
+SINGLE_ROW_RPCS: Dict[str, Dict[str, Any]] = {
+    "get_revenue_summary": {"total_revenue": 125000.0, "total_received": 98000.0, "total_dues": 27000.0},
+    "get_sentiment_summary": {"positive": 320, "neutral": 140, "negative": 40},
+    "get_booking_metrics": {
+        "total_bookings": 812, "booking_conversion_rate": 34.2, "avg_booking_value": 2150.5,
+        "cancellation_rate": 6.1, "repeat_booking_rate": 12.4, "total_gross_revenue": 1746000.0,
+        "total_collections": 1320000.0,
+    },
+    "get_all_lead_kpis": {
+        "total_leads_generated": 2400, "lead_conversion_rate": 21.5, "avg_lead_response_time": 3.2,
+        "best_lead_source": "website", "qualified_lead_ratio": 44.0,
+    },
+    "get_all_cust_kpis": {"total_customers": 1900, "new_customers": 240, "avg_spend_per_customer": 2310.0, "customer_conversion_rate": 28.0},
+    "get_all_payment_kpis": {
+        "total_revenue_collected": 1320000.0, "outstanding_payments": 426000.0, "avg_payment_value": 1625.0,
+        "revenue_growth_rate": 8.5, "refund_chargeback_rate": 1.2,
+    },
+    "get_llm_kpis": {"ai_detection_rate": 9.1, "human_agent_involvement_rate": 14.3, "out_of_scope_rate": 5.9, "ai_success_rate": 81.2},
+}
+
+_PAGING_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+class FakeSupabase(FakeServer):
+    """
+    PostgREST look-alike. Each table holds `rows` synthetic rows; `eq.` and
+    `in.()` filters, the first `order` column and limit/offset are applied,
+    other filters (gte, lte, ilike, ...) are accepted and ignored. Writes
+    echo the submitted rows.
+    """
+
+    def __init__(self, rows: int = 1000, rpc_rows: int = 30, **kwargs):
+        super().__init__(**kwargs)
+        self.rows = rows
+        self.rpc_rows = rpc_rows
+        self._tables: Dict[str, List[Dict[str, Any]]] = {}
+
+    def _table(self, name: str) -> List[Dict[str, Any]]:
+        rows = self._tables.get(name)
+        if rows is None:
+            factory = ROW_FACTORIES.get(name, lambda i: {"id": i})
+            rows = self._tables[name] = [factory(i) for i in range(self.rows)]
+        return rows
+
+    def _select(self, table: str, query: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+        rows = self._table(table)
+        for column, values in query.items():
+            if column in _PAGING_PARAMS:
+                continue
+            for value in values:
+                if value.startswith("eq."):
+                    target = value[3:]
+                    rows = [r for r in rows if str(r.get(column)) == target]
+                elif value.startswith("in.("):
+                    targets = {v.strip('"') for v in value[4:-1].split(",")}
+                    rows = [r for r in rows if str(r.get(column)) in targets]
+        if "order" in query:
+            column, _, direction = query["order"][0].split(",")[0].partition(".")
+            rows = sorted(rows, key=lambda r: (r.get(column) is None, r.get(column)), reverse=direction.startswith("desc"))
+        offset = int(query.get("offset", ["0"])[0])
+        if "limit" in query:
+            rows = rows[offset:offset + int(query["limit"][0])]
+        elif offset:
+            rows = rows[offset:]
+        select = query.get("select", ["*"])[0]
+        if select != "*":
+            columns = [c.strip() for c in select.split(",")]
+            rows = [{c: r.get(c) for c in columns} for r in rows]
+        return rows
+
+    def handle(self, method, path, query, body, headers):
+        if not path.startswith("/rest/v1/"):
+            return 404, {"message": f"unknown path {path}"}, None
+        name = path[len("/rest/v1/"):]
+        if name.startswith("rpc/"):
+            fn = name[len("rpc/"):]
+            if fn in SINGLE_ROW_RPCS:
+                return 200, [SINGLE_ROW_RPCS[fn]], None
+            factory = RPC_RESULTS.get(fn)
+            return 200, [factory(i) for i in range(self.rpc_rows)] if factory else [], None
+        if method == "GET":
+            rows = self._select(name, query)
+            return 200, rows, {"Content-Range": f"0-{max(len(rows) - 1, 0)}/*"}
+        if method in ("POST", "PATCH", "PUT"):
+            submitted = json.loads(body or b"[]")
+            return (201 if method == "POST" else 200), submitted if isinstance(submitted, list) else [submitted], None
+        if method == "DELETE":
+            return 200, [], None
+        return 405, {"message": f"{method} not supported"}, None
+
+
+# ================== BOOKEO ==================
+
+def _bookeo_booking(i: int) -> Dict[str, Any]:
+    return {
+        "bookingNumber": f"BK{i:07d}",
+        "eventId": f"evt_{i % 40}",
+        "productId": f"theme_{i % 8}",
+        "startTime": _iso(i, 53),
+        "endTime": _iso(i, 53),
+        "customerId": f"cust_{i % 500:04d}",
+        "canceled": i % 10 == 0,
+        "creationTime": _iso(i),
+        "participants": {"numbers": [
+            {"peopleCategoryId": "Cadults", "number": 2 + i % 3},
+            {"peopleCategoryId": "Cchildren", "number": i % 2},
+        ]},
+        "price": {
+            "totalGross": {"amount": str(2000 + i % 900)},
+            "totalNet": {"amount": str(1800 + i % 900)},
+            "totalTTaxes": {"amount": "200"},
+            "totalPaid": {"amount": str(1000 + i % 800)},
+        },
+    }
+
+
+class FakeBookeo(FakeServer):
+    """
+    Bookeo /bookings: `pages` pages of `page_size` bookings per query, chained
+    with pageNavigationToken. Every `rate_limit_every`-th request (0 = never)
+    is answered 429 with Retry-After: `retry_after` seconds.
+    """
+
+    def __init__(self, pages: int = 3, page_size: int = 100, rate_limit_every: int = 0, retry_after: int = 1, **kwargs):
+        super().__init__(**kwargs)
+        self.pages = pages
+        self.page_size = page_size
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.rate_limited = 0
+        self._cursors: Dict[str, int] = {}
+
+    def handle(self, method, path, query, body, headers):
+        if self.rate_limit_every and self.requests % self.rate_limit_every == 0:
+            self.rate_limited += 1
+            return 429, {"message": "Too many requests"}, {"Retry-After": str(self.retry_after)}
+        if path.rstrip("/").endswith("/bookings") and method == "GET":
+            token = query.get("pageNavigationToken", [None])[0]
+            with self._lock:
+                if token is None:
+                    token, page = uuid.uuid4().hex, 1
+                else:
+                    # Like Bookeo, the result set lives server-side behind the token; each call moves one page on
+                    page = self._cursors.pop(token, 0) + 1
+                if page < self.pages:
+                    self._cursors[token] = page
+            start = (page - 1) * self.page_size
+            info = {"totalItems": self.pages * self.page_size, "totalPages": self.pages, "currentPage": page}
+            if page < self.pages:
+                info["pageNavigationToken"] = token
+            data = [_bookeo_booking(start + i) for i in range(self.page_size)] if page <= self.pages else []
+            return 200, {"info": info, "data": data}, None
+        return 404, {"message": f"unknown path {path}"}, None
+
+
+# ================== PAYU ==================
+
+class FakePayU(FakeServer):
+    """PayU OAuth token, payment-link creation and transaction listing."""
+
+    def handle(self, method, path, query, body, headers):
+        if path == "/oauth/token" and method == "POST":
+            return 200, {"access_token": uuid.uuid4().hex, "token_type": "bearer", "expires_in": 7200}, None
+        if path.rstrip("/") == "/payment-links" and method == "POST":
+            request = json.loads(body or b"{}")
+            invoice = request.get("invoiceNumber") or f"INV{uuid.uuid4().hex[:10]}"
+            amount = float(request.get("subAmount") or 0)
+            return 200, {
+                "status": 0,
+                "message": "payment link created",
+                "guid": uuid.uuid4().hex,
+                "result": {
+                    "subAmount": amount, "tax": 0.0, "shippingCharge": 0.0, "totalAmount": amount,
+                    "invoiceNumber": invoice, "paymentLink": f"{self.url}/pay/{invoice}",
+                    "description": request.get("description", ""), "active": True,
+                    "isPartialPaymentAllowed": bool(request.get("isPartialPaymentAllowed")),
+                    "expiryDate": (datetime.now(timezone.utc) + timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S"),
+                    "udf": {}, "address": {}, "emailStatus": "not opted", "smsStatus": "not opted",
+                    "currency": "INR", "addedOn": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+                    "status": "active", "maxPaymentsAllowed": 1,
+                    "customerName": request.get("customer", {}).get("name", ""),
+                    "customerPhone": request.get("customer", {}).get("phone", ""),
+                    "customerEmail": request.get("customer", {}).get("email", ""),
+                    "notes": "", "amountCollected": 0.0, "dueAmount": amount, "minAmountForCustomer": 0.0,
+                    "adjustment": 0.0, "discount": 0.0,
+                },
+            }, None
+        if path.startswith("/payment-links/") and path.endswith("/txns") and method == "GET":
+            invoice = path.split("/")[2]
+            return 200, {
+                "status": 0, "message": None, "errorCode": None, "guid": uuid.uuid4().hex,
+                "result": {"pageSize": 10, "pages": 1, "rows": 1, "pageOffset": 0, "data": [{
+                    "createdOn": _iso(1), "transactionId": f"txn_{invoice}", "merchantReferenceId": invoice,
+                    "paymentId": "403993715", "settledAmount": 1000.0, "customerEmail": "bench@example.com",
+                    "status": "success", "mode": "UPI", "bankCode": None, "cardNum": None,
+                    "subscriptionDetails": None,
+                }]},
+            }, None
+        return 404, {"message": f"unknown path {path}"}, None
+
+
+# ================== ELEVENLABS ==================
+
+def post_call_payload(conv_id: Optional[str] = None, turns: int = 20) -> Dict[str, Any]:
+    """A post_call_transcription webhook body in the shape ElevenLabs sends."""
+    conv_id = conv_id or f"conv_{uuid.uuid4().hex}"
+    criteria = ("booking_successful", "human_transfer_needed", "ai_detected_by_customer",
+                "inquiry_resolved", "out_of_scope", "conversation_completed")
+    return {
+        "type": "post_call_transcription",
+        "event_timestamp": int(time.time()),
+        "data": {
+            "agent_id": "agent_bench",
+            "conversation_id": conv_id,
+            "status": "done",
+            "transcript": [
+                {"role": "agent" if i % 2 == 0 else "user", "message": f"Turn {i}: can I book an escape room for Saturday?"}
+                for i in range(turns)
+            ],
+            "metadata": {"call_duration_secs": 182, "cost": 740},
+            "analysis": {
+                "transcript_summary": "Caller booked a room for four people on Saturday evening.",
+                "evaluation_criteria_results": {
+                    name: {"criteria_id": name, "result": "success", "rationale": "Benchmark payload."}
+                    for name in criteria
+                },
+                "data_collection_results": {
+                    "sentiment_score": {"value": 0.82},
+                    "emotional_score": {"value": 0.64},
+                    "customer_satisfaction_rating": {"value": 5},
+                    "customer_type": {"value": "new"},
+                    "customer_id": {"value": None},
+                    "call_intent": {"value": "booking"},
+                    "caller_name": {"value": "Bench Caller"},
+                    "caller_number": {"value": "98765 43210"},
+                },
+            },
+        },
+    }
+
+
+def sign_elevenlabs(body: bytes, secret: str, timestamp: Optional[int] = None) -> str:
+    """The 'elevenlabs-signature' header value for `body`."""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    digest = get_hmac_key(secret).hexdigest(str(timestamp).encode("ascii"), b".", body)
+    return f"t={timestamp},v0={digest}"
@@ -0,0 +1,256 @@
+"""
+load_bench.py
+-------------
+End-to-end load benchmark. Starts local stand-ins for Supabase, Bookeo and
+PayU (benchmarks/fakes.py), runs the API under uvicorn in a subprocess
+pointed at them, then drives each scenario at a fixed concurrency and
+reports throughput and latency percentiles.
+
+Scenarios:
+    overview          GET  /api/dashboard/overview
+    kpis_all          GET  /kpis/all
+    compute_kpis      GET  /compute/kpis
+    bookings_refresh  POST /bookeo/bookings/refresh
+    post_call         POST /ElevenLabs/elevenlabs/post-call (signed, unique conversation per request)
+    payu_txns         GET  /payments/transaction-details (not in the default set)
+
+Run from the repo root:
+    python -m backend.benchmarks.load_bench [--scenarios overview,kpis_all] [--concurrency 16]
+        [--requests 200] [--latency-ms 15] [--jitter-ms 5] [--rows 1000]
+        [--bookeo-pages 3] [--bookeo-429-every 0] [--json results.json]
+
+Numbers are only comparable between runs on the same machine with the same
+flags; keep the --json output of a run as the baseline for the next change.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from backend.benchmarks.fakes import (
+    FAKE_SUPABASE_KEY,
+    FakeBookeo,
+    FakePayU,
+    FakeSupabase,
+    post_call_payload,
+    sign_elevenlabs,
+)
+
+WEBHOOK_SECRET = "bench-webhook-secret"
+
+# name -> (method, path, request factory returning (body, headers))
+RequestFactory = Callable[[], Tuple[Optional[bytes], Dict[str, str]]]
+
+
+def _no_body() -> Tuple[Optional[bytes], Dict[str, str]]:
+    return None, {}
+
+
+def _post_call() -> Tuple[Optional[bytes], Dict[str, str]]:
+    body = json.dumps(post_call_payload()).encode("utf-8")
+    return body, {"Content-Type": "application/json", "elevenlabs-signature": sign_elevenlabs(body, WEBHOOK_SECRET)}
+
+
+SCENARIOS: Dict[str, Tuple[str, str, RequestFactory]] = {
+    "overview": ("GET", "/api/dashboard/overview?filter=all_time", _no_body),
+    "kpis_all": ("GET", "/kpis/all", _no_body),
+    "compute_kpis": ("GET", "/compute/kpis?filter=all_time", _no_body),
+    "bookings_refresh": ("POST", "/bookeo/bookings/refresh", _no_body),
+    "post_call": ("POST", "/ElevenLabs/elevenlabs/post-call", _post_call),
+    "payu_txns": ("GET", "/payments/transaction-details?invoice_id=INVBENCH1", _no_body),
+}
+DEFAULT_SCENARIOS = ["overview", "kpis_all", "compute_kpis", "bookings_refresh", "post_call"]
+
+
+@dataclass
+class Result:
+    scenario: str
+    requests: int
+    concurrency: int
+    seconds: float
+    throughput_rps: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+    statuses: Dict[str, int] = field(default_factory=dict)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+# ================== API PROCESS ==================
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_api(env: Dict[str, str], port: int, timeout: float = 60.0) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"API exited during startup (code {proc.returncode})")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1.0).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("API did not become ready in time")
+
+
+# ================== LOAD ==================
+
+async def run_scenario(client: httpx.AsyncClient, name: str, requests: int, concurrency: int, warmup: int) -> Result:
+    method, path, make_request = SCENARIOS[name]
+
+    async def one() -> Tuple[float, str]:
+        body, headers = make_request()
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, content=body, headers=headers)
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        return time.perf_counter() - start, status
+
+    for _ in range(warmup):
+        await one()
+
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            elapsed, status = await one()
+            latencies.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - started
+
+    latencies.sort()
+    ms = lambda v: round(v * 1000, 2)
+    return Result(
+        scenario=name,
+        requests=len(latencies),
+        concurrency=concurrency,
+        seconds=round(seconds, 3),
+        throughput_rps=round(len(latencies) / seconds, 2) if seconds else 0.0,
+        p50_ms=ms(percentile(latencies, 50)),
+        p90_ms=ms(percentile(latencies, 90)),
+        p99_ms=ms(percentile(latencies, 99)),
+        max_ms=ms(latencies[-1]) if latencies else 0.0,
+        statuses=statuses,
+    )
+
+
+async def run_all(base_url: str, scenarios: List[str], requests: int, concurrency: int, warmup: int) -> List[Result]:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as client:
+        results = []
+        for name in scenarios:
+            result = await run_scenario(client, name, requests, concurrency, warmup)
+            print_result(result)
+            results.append(result)
+        return results
+
+
+def print_result(r: Result):
+    statuses = ", ".join(f"{k}x{v}" for k, v in sorted(r.statuses.items()))
+    print(
+        f"{r.scenario:<18} {r.throughput_rps:>9.1f} req/s   "
+        f"p50 {r.p50_ms:>8.1f} ms   p90 {r.p90_ms:>8.1f} ms   p99 {r.p99_ms:>8.1f} ms   "
+        f"max {r.max_ms:>8.1f} ms   [{statuses}]"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load benchmark against local fake dependencies.")
+    parser.add_argument("--scenarios", default=",".join(DEFAULT_SCENARIOS), help=f"Comma-separated; available: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario.")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per scenario.")
+    parser.add_argument("--latency-ms", type=float, default=15.0, help="Added to every fake dependency response.")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--rows", type=int, default=1000, help="Synthetic rows per Supabase table.")
+    parser.add_argument("--bookeo-pages", type=int, default=3)
+    parser.add_argument("--bookeo-429-every", type=int, default=0, help="Answer every Nth Bookeo request with 429 (0 = never).")
+    parser.add_argument("--json", help="Write results to this file.")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    latency = {"latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms}
+    with FakeSupabase(rows=args.rows, **latency) as supabase, \
+            FakeBookeo(pages=args.bookeo_pages, rate_limit_every=args.bookeo_429_every, **latency) as bookeo, \
+            FakePayU(**latency) as payu:
+        env = dict(os.environ)
+        env.update({
+            "SUPABASE_URL": supabase.url,
+            "SUPABASE_KEY": FAKE_SUPABASE_KEY,
+            "BOOKEO_API_URL": bookeo.url,
+            "BOOKEO_API_KEY": "bench",
+            "BOOKEO_SECRET_KEY": "bench",
+            "PAYU_ACCOUNTS_HOST": payu.url,
+            "API_BASE_URL": payu.url,
+            "PAYU_CLIENT_ID": "bench",
+            "PAYU_CLIENT_SECRET": "bench",
+            "PAYU_KEY": "bench",
+            "PAYU_SALT": "bench",
+            "MID": "bench",
+            "POST_CALL_WEBHOOK_SECRET": WEBHOOK_SECRET,
+            "REMINDER_SCHEDULER_ENABLED": "false",
+            "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),
+        })
+        port = _free_port()
+        api = start_api(env, port)
+        try:
+            print(
+                f"concurrency {args.concurrency}, {args.requests} requests/scenario, "
+                f"dependency latency {args.latency_ms}+{args.jitter_ms} ms, {args.rows} rows/table\n"
+            )
+            results = asyncio.run(run_all(f"http://127.0.0.1:{port}", scenarios, args.requests, args.concurrency, args.warmup))
+        finally:
+            api.terminate()
+            api.wait(timeout=10)
+
+        print(f"\ndependency requests: supabase={supabase.requests} bookeo={bookeo.requests} "
+              f"(429s: {bookeo.rate_limited}) payu={payu.requests}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": [asdict(r) for r in results]}, f, indent=2)
+        print(f"results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+phone_bench.py
+--------------
+Microbenchmark: the old per-call WATI normalization vs backend.utils.phone.
+
+Run from the repo root:
+    python -m backend.benchmarks.phone_bench [--rows 10000] [--repeat 5]
+"""
+
+import re
+import random
+import argparse
+import timeit
+
+from backend.utils.phone import normalize_phone, normalize_phones, _normalize
+
+
+def _legacy_safe_phone(p: str) -> str:
+    # The previous wati._safe_phone, kept here as the baseline
+    if not isinstance(p, str):
+        return ""
+    p = p.strip()
+    if p.startswith("+"):
+        return "+" + re.sub(r"\D", "", p[1:])
+    return re.sub(r"\D", "", p)
+
+
+def _make_column(rows: int, unique: int):
+    """A customer-sync-like column: mixed formats, repeats and a few blanks."""
+    rnd = random.Random(42)
+    formats = [
+        lambda d: "+91" + d,
+        lambda d: "+91 " + d[:5] + " " + d[5:],
+        lambda d: "0" + d[:5] + "-" + d[5:],
+        lambda d: "(" + d[:3] + ") " + d[3:6] + "-" + d[6:],
+        lambda d: d,
+    ]
+    pool = []
+    for _ in range(unique):
+        digits = "".join(rnd.choice("0123456789") for _ in range(10))
+        pool.append(rnd.choice(formats)(digits))
+    pool += [None, "", "  "]
+    return [rnd.choice(pool) for _ in range(rows)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Phone normalization microbenchmark.")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--unique", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    column = _make_column(args.rows, args.unique)
+    assert [_legacy_safe_phone(p) for p in column] == normalize_phones(column)
+
+    def legacy():
+        return [_legacy_safe_phone(p) for p in column]
+
+    def single_cold():
+        _normalize.cache_clear()
+        return [normalize_phone(p) for p in column]
+
+    def single_warm():
+        return [normalize_phone(p) for p in column]
+
+    def batch_cold():
+        _normalize.cache_clear()
+        return normalize_phones(column)
+
+    print(f"{args.rows} rows, {args.unique} unique numbers, best of {args.repeat}")
+    for name, fn in [
+        ("legacy _safe_phone", legacy),
+        ("normalize_phone (cold cache)", single_cold),
+        ("normalize_phone (warm cache)", single_warm),
+        ("normalize_phones (cold cache)", batch_cold),
+    ]:
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        print(f"  {name:32s} {best * 1000:8.2f} ms  ({best / args.rows * 1e9:6.0f} ns/row)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+rag_jobs_check.py
+-----------------
+Checks the RAG index job worker (services/rag_index_jobs.py) against the
+real ElevenLabsClient wrapper with a scripted SDK underneath, so the SDK ->
+ElevenLabsError -> retry path is exercised end to end:
+
+- a document whose first RAG_JOB_MAX_ERRORS - 1 calls fail, then succeeds,
+  must end "succeeded" (transient errors are retried);
+- a document that keeps failing must end "failed" after exactly
+  RAG_JOB_MAX_ERRORS calls, with the wrapper's error message;
+- a document that reports a terminal non-success status must end "failed".
+
+Exits non-zero if any expectation is not met.
+
+Run from the repo root:
+    python -m backend.benchmarks.rag_jobs_check
+"""
+
+import sys
+import asyncio
+from types import SimpleNamespace
+from typing import Dict
+
+from backend.config.eleven_labs import ElevenLabsClient
+from backend.services import rag_index_jobs as jobs_module
+from backend.services.rag_index_jobs import RAG_JOB_MAX_ERRORS, RagIndexJobs
+
+
+class ScriptedRagSDK:
+    """Stands in for ElevenLabs(...).conversational_ai.knowledge_base.document."""
+
+    def __init__(self):
+        self.calls: Dict[str, int] = {}
+
+    def compute_rag_index(self, documentation_id: str, model: str):
+        n = self.calls[documentation_id] = self.calls.get(documentation_id, 0) + 1
+        if documentation_id == "flaky" and n < RAG_JOB_MAX_ERRORS:
+            raise ConnectionError("upstream reset")
+        if documentation_id == "broken":
+            raise ConnectionError("upstream down")
+        if documentation_id == "small":
+            return {"status": "document_too_small"}
+        return {"status": "succeeded" if n >= RAG_JOB_MAX_ERRORS + 1 else "processing", "progress_percentage": 50}
+
+
+def _client(sdk: ScriptedRagSDK) -> ElevenLabsClient:
+    # Skip __init__ (API key, network); only the SDK attribute path is used
+    client = ElevenLabsClient.__new__(ElevenLabsClient)
+    client.client = SimpleNamespace(conversational_ai=SimpleNamespace(knowledge_base=SimpleNamespace(document=sdk)))
+    return client
+
+
+async def run_check() -> int:
+    jobs_module.RAG_POLL_INITIAL_SECONDS = 0.01
+    jobs_module.RAG_POLL_MAX_SECONDS = 0.02
+    sdk = ScriptedRagSDK()
+    jobs = RagIndexJobs()
+    batch = jobs.submit_batch(_client(sdk), ["flaky", "broken", "small"], "e5_mistral_7b_instruct")
+    while not jobs.get_batch(batch["batch_id"])["finished"]:
+        await asyncio.sleep(0.01)
+    result = {j["document_id"]: j for j in jobs.get_batch(batch["batch_id"])["jobs"]}
+
+    failures = []
+    if result["flaky"]["state"] != "succeeded":
+        failures.append(f"flaky: expected succeeded after retries, got {result['flaky']['state']} ({result['flaky']['error']})")
+    if result["broken"]["state"] != "failed" or sdk.calls["broken"] != RAG_JOB_MAX_ERRORS:
+        failures.append(f"broken: expected failed after {RAG_JOB_MAX_ERRORS} calls, got {result['broken']['state']} after {sdk.calls['broken']}")
+    if "upstream down" not in (result["broken"]["error"] or ""):
+        failures.append(f"broken: error should carry the SDK message, got {result['broken']['error']!r}")
+    if result["small"]["state"] != "failed" or result["small"]["rag_status"] != "document_too_small":
+        failures.append(f"small: expected failed/document_too_small, got {result['small']['state']}/{result['small']['rag_status']}")
+
+    for line in failures:
+        print(f"FAIL {line}")
+    print(f"{'FAILED' if failures else 'OK'}: {len(failures)} failure(s); SDK calls: {sdk.calls}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run_check()))
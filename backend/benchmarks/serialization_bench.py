@@ -0,0 +1,116 @@
+"""
+serialization_bench.py
+----------------------
+Per-row serialization cost for Call, Booking and Lead list responses:
+
+  default  Model(**row) in the service, then FastAPI's response_model pass
+           (dump, re-validate, dump to JSON-able python, json.dumps)
+  fast     Model.model_construct(**row) + FastJSONResponse (orjson)
+  raw      plain dict rows + orjson (what the lead routes return)
+
+Run from the repo root:
+    python -m backend.benchmarks.serialization_bench [--rows 2000] [--repeat 5]
+"""
+
+import json
+import argparse
+import timeit
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+
+from backend.models.booking_model import Booking
+from backend.models.call_model import Call
+from backend.models.lead_model import Lead
+from backend.utils.response_handlers import FastJSONResponse, construct_rows
+
+
+def _ts(i: int) -> str:
+    return (datetime(2025, 10, 1, tzinfo=timezone.utc) + timedelta(minutes=i)).isoformat()
+
+
+def call_row(i: int) -> dict:
+    return {
+        "conv_id": f"conv_{i:08d}",
+        "customer_id": f"cust_{i % 500}",
+        "transcript": "agent: Hello, thanks for calling.\nuser: I want to book a room.\n" * 20,
+        "date_time": _ts(i),
+        "duration": 120 + i % 300,
+        "call_intent": "New Booking Inquiry",
+        "credits_consumed": i % 40,
+    }
+
+
+def booking_row(i: int) -> dict:
+    return {
+        "booking_id": f"{2561510147820801 + i}",
+        "event_id": f"evt_{i % 90}",
+        "theme_id": f"theme_{i % 12}",
+        "start_time": _ts(i + 1440),
+        "end_time": _ts(i + 1500),
+        "customer_id": f"cust_{i % 500}",
+        "status": "Confirmed",
+        "creation_time": _ts(i),
+        "conv_id": f"conv_{i:08d}",
+        "adults": 4,
+        "children": 1,
+        "total_gross": 2600.0,
+        "total_net": 2600.0,
+        "total_taxes": 0.0,
+        "total_paid": 1000.0,
+    }
+
+
+def lead_row(i: int) -> dict:
+    return {
+        "lead_id": i,
+        "name": f"Lead {i}",
+        "email": f"lead{i}@example.com",
+        "phonenumber": f"+91987654{i % 10000:04d}",
+        "status": "new",
+        "lead_type": "new_inquiry",
+        "priority": "medium",
+        "source": "Website",
+        "notes": None,
+        "last_notified": None,
+        "created_at": _ts(i),
+    }
+
+
+def default_path(model, rows):
+    # Service layer
+    objs = [model(**row) for row in rows]
+    # FastAPI response_model handling
+    adapter = TypeAdapter(List[model])
+    validated = adapter.validate_python([o.model_dump() for o in objs])
+    return json.dumps(adapter.dump_python(validated, mode="json")).encode("utf-8")
+
+
+def fast_path(model, rows):
+    return FastJSONResponse(construct_rows(model, rows)).body
+
+
+def raw_path(model, rows):
+    return FastJSONResponse(rows).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response serialization benchmark.")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.rows} rows per response, best of {args.repeat} (microseconds per row)")
+    print(f"  {'model':10s} {'default':>10s} {'fast':>10s} {'raw':>10s}")
+    for model, make_row in [(Call, call_row), (Booking, booking_row), (Lead, lead_row)]:
+        rows = [make_row(i) for i in range(args.rows)]
+        timings = []
+        for path in (default_path, fast_path, raw_path):
+            best = min(timeit.repeat(lambda: path(model, rows), number=1, repeat=args.repeat))
+            timings.append(best / args.rows * 1e6)
+        print(f"  {model.__name__:10s} " + " ".join(f"{t:10.2f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+startup_profile.py
+------------------
+Import-time profile of the API: runs `python -X importtime -c "import backend.main"`
+in a fresh interpreter and reports total import time, the slowest modules and
+the cost per top-level package.
+
+Run from the repo root:
+    python -m backend.benchmarks.startup_profile [--top 25] [--routers a,b,...] [--all-routers]
+
+--routers sets ENABLED_ROUTERS for the run, so the cold start of a trimmed
+deployment can be compared with the default set.
+"""
+
+import os
+import re
+import ast
+import sys
+import time
+import argparse
+import subprocess
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile(env: Dict[str, str]) -> Tuple[float, List[Tuple[str, int, int, int]]]:
+    """Returns (wall seconds, [(module, self_us, cumulative_us, depth), ...])."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        tail = "\n".join(l for l in proc.stderr.splitlines() if not l.startswith("import time:"))
+        raise SystemExit(f"import backend.main failed:\n{tail}")
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            depth = (len(m.group(3)) - 1) // 2
+            modules.append((m.group(4), int(m.group(1)), int(m.group(2)), depth))
+    return wall, modules
+
+
+def _router_lists() -> Dict[str, List[str]]:
+    """Read ROUTERS / OPTIONAL_ROUTERS from main.py without importing it (that would skew the profile)."""
+    path = os.path.join(os.path.dirname(__file__), "..", "main.py")
+    with open(path) as f:
+        tree = ast.parse(f.read())
+    lists = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and isinstance(node.targets[0], ast.Name):
+            if node.targets[0].id in ("ROUTERS", "OPTIONAL_ROUTERS"):
+                lists[node.targets[0].id] = ast.literal_eval(node.value)
+    return lists
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile for backend.main.")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--routers", help="Comma-separated ENABLED_ROUTERS for the run.")
+    parser.add_argument("--all-routers", action="store_true", help="Enable every router, including archived ones.")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.all_routers:
+        lists = _router_lists()
+        env["ENABLED_ROUTERS"] = ",".join(lists["ROUTERS"] + lists["OPTIONAL_ROUTERS"])
+    elif args.routers:
+        env["ENABLED_ROUTERS"] = args.routers
+
+    wall, modules = profile(env)
+    total_us = sum(m[1] for m in modules)
+    print(f"routers: {env.get('ENABLED_ROUTERS') or 'default'}")
+    print(f"wall time (interpreter + imports): {wall * 1000:.0f} ms")
+    print(f"import time: {total_us / 1000:.0f} ms across {len(modules)} modules\n")
+
+    print(f"Top {args.top} modules by cumulative time")
+    for name, self_us, cum_us, depth in sorted(modules, key=lambda m: m[2], reverse=True)[:args.top]:
+        print(f"  {cum_us / 1000:9.1f} ms  {name}")
+
+    per_package = defaultdict(int)
+    for name, self_us, _, _ in modules:
+        per_package[name.split(".")[0]] += self_us
+    print(f"\nTop {args.top} top-level packages by self time")
+    for package, self_us in sorted(per_package.items(), key=lambda p: p[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:9.1f} ms  {package}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+webhook_replay.py
+-----------------
+Replays captured ElevenLabs post_call_transcription payloads against
+/ElevenLabs/elevenlabs/post-call at a target rate, to size workers for peak
+call hours.
+
+Every *.json file in the capture directory is one webhook body. Each send is
+re-signed with the webhook secret ("t=<now>,v0=<hmac>", as
+verify_elevenlabs_signature expects), so old captures are not rejected as
+stale.
+
+Sends are open-loop: request i is fired at start + i / rate whether or not
+earlier ones have finished (up to --max-in-flight), which is how webhook
+traffic arrives. Reported:
+- acceptance latency (p50/p90/p99/max) and HTTP status counts
+- handler outcomes: success / skipped (duplicate) / error, and whether every
+  intentional duplicate was skipped
+- DB write throughput: rows written per second (call + call_analysis per
+  accepted event), plus the Supabase time per table from /metrics when
+  the API exposes it
+
+Run from the repo root:
+    python -m backend.benchmarks.webhook_replay captures/ [--url http://127.0.0.1:8000]
+        [--rate 20] [--count 500] [--fresh-ids] [--duplicate-ratio 0.1]
+        [--secret $POST_CALL_WEBHOOK_SECRET]
+
+--fresh-ids gives every send a new conversation_id so each one is a real
+insert; without it, replaying a capture twice measures the duplicate path.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from backend.benchmarks.fakes import sign_elevenlabs
+from backend.benchmarks.load_bench import percentile
+
+WEBHOOK_PATH = "/ElevenLabs/elevenlabs/post-call"
+# Rows written per accepted event: one in `call`, one in `call_analysis`
+ROWS_PER_EVENT = 2
+
+_METRIC_LINE = re.compile(r'dependency_call_duration_seconds_(sum|count)\{dependency="supabase",operation="([^"]+)"\} ([0-9.eE+-]+)')
+
+
+def load_captures(directory: str) -> List[dict]:
+    payloads = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(directory, name)) as f:
+            payload = json.load(f)
+        if payload.get("type") != "post_call_transcription":
+            print(f"skipping {name}: type {payload.get('type')!r}", file=sys.stderr)
+            continue
+        payloads.append(payload)
+    if not payloads:
+        raise SystemExit(f"no post_call_transcription payloads in {directory}")
+    return payloads
+
+
+def build_plan(payloads: List[dict], count: int, fresh_ids: bool, duplicate_ratio: float) -> List[Tuple[dict, bool]]:
+    """
+    (payload, is_intentional_duplicate) per send. With --fresh-ids each send
+    gets a new conversation_id, then `duplicate_ratio` of sends repeat an
+    earlier one.
+    """
+    plan: List[Tuple[dict, bool]] = []
+    sent: List[dict] = []
+    for i in range(count):
+        if sent and random.random() < duplicate_ratio:
+            plan.append((random.choice(sent), True))
+            continue
+        payload = payloads[i % len(payloads)]
+        if fresh_ids:
+            payload = {**payload, "data": {**payload.get("data", {}), "conversation_id": f"replay_{uuid.uuid4().hex}"}}
+        sent.append(payload)
+        plan.append((payload, False))
+    return plan
+
+
+async def scrape_supabase_metrics(client: httpx.AsyncClient) -> Optional[Dict[str, Tuple[float, float]]]:
+    """table -> (count, seconds) from /metrics, or None if metrics are off."""
+    try:
+        response = await client.get("/metrics")
+    except httpx.HTTPError:
+        return None
+    if response.status_code != 200:
+        return None
+    totals: Dict[str, List[float]] = {}
+    for kind, operation, value in _METRIC_LINE.findall(response.text):
+        entry = totals.setdefault(operation, [0.0, 0.0])
+        entry[0 if kind == "count" else 1] = float(value)
+    return {op: (c, s) for op, (c, s) in totals.items()}
+
+
+async def replay(url: str, plan: List[Tuple[dict, bool]], secret: str, rate: float, max_in_flight: int, timeout: float):
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    outcomes: Counter = Counter()
+    duplicates_skipped = 0
+    semaphore = asyncio.Semaphore(max_in_flight)
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        before = await scrape_supabase_metrics(client)
+
+        async def send(payload: dict, is_duplicate: bool):
+            nonlocal duplicates_skipped
+            async with semaphore:
+                body = json.dumps(payload).encode("utf-8")
+                headers = {"Content-Type": "application/json", "elevenlabs-signature": sign_elevenlabs(body, secret)}
+                start = time.perf_counter()
+                try:
+                    response = await client.post(WEBHOOK_PATH, content=body, headers=headers)
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                    return
+                latencies.append(time.perf_counter() - start)
+                statuses[str(response.status_code)] += 1
+                try:
+                    outcome = response.json().get("status", "unknown")
+                except ValueError:
+                    outcome = "unparseable"
+                outcomes[outcome] += 1
+                if is_duplicate and outcome == "skipped":
+                    duplicates_skipped += 1
+
+        started = time.perf_counter()
+        tasks = []
+        for i, (payload, is_duplicate) in enumerate(plan):
+            delay = started + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(payload, is_duplicate)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+        after = await scrape_supabase_metrics(client)
+
+    return latencies, statuses, outcomes, duplicates_skipped, elapsed, before, after
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured ElevenLabs post-call webhooks at a target rate.")
+    parser.add_argument("captures", help="Directory of captured webhook bodies (*.json).")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="API base URL.")
+    parser.add_argument("--secret", default=os.getenv("POST_CALL_WEBHOOK_SECRET"), help="Webhook secret (default: POST_CALL_WEBHOOK_SECRET).")
+    parser.add_argument("--rate", type=float, default=10.0, help="Target sends per second.")
+    parser.add_argument("--count", type=int, help="Number of sends (default: one per capture).")
+    parser.add_argument("--fresh-ids", action="store_true", help="New conversation_id per send, so every send is an insert.")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.0, help="With --fresh-ids, fraction of sends that repeat an earlier event.")
+    parser.add_argument("--max-in-flight", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if not args.secret:
+        parser.error("no webhook secret: pass --secret or set POST_CALL_WEBHOOK_SECRET")
+    random.seed(args.seed)
+
+    payloads = load_captures(args.captures)
+    count = args.count or len(payloads)
+    plan = build_plan(payloads, count, args.fresh_ids, args.duplicate_ratio if args.fresh_ids else 0.0)
+    expected_duplicates = sum(1 for _, dup in plan if dup)
+
+    print(f"replaying {count} events from {len(payloads)} capture(s) at {args.rate}/s to {args.url}{WEBHOOK_PATH}")
+    latencies, statuses, outcomes, duplicates_skipped, elapsed, before, after = asyncio.run(
+        replay(args.url, plan, args.secret, args.rate, args.max_in_flight, args.timeout)
+    )
+
+    latencies.sort()
+    ms = lambda v: v * 1000
+    print(f"\nsent {count} in {elapsed:.2f}s ({count / elapsed:.1f}/s achieved)")
+    print(
+        f"acceptance latency: p50 {ms(percentile(latencies, 50)):.1f} ms   p90 {ms(percentile(latencies, 90)):.1f} ms   "
+        f"p99 {ms(percentile(latencies, 99)):.1f} ms   max {ms(latencies[-1]) if latencies else 0:.1f} ms"
+    )
+    print("http status: " + ", ".join(f"{k}x{v}" for k, v in sorted(statuses.items())))
+    print("outcomes:    " + ", ".join(f"{k}x{v}" for k, v in sorted(outcomes.items())))
+    if expected_duplicates:
+        print(f"duplicates:  {duplicates_skipped}/{expected_duplicates} intentional duplicates skipped")
+
+    accepted = outcomes.get("success", 0)
+    print(f"db writes:   {accepted * ROWS_PER_EVENT} rows ({accepted * ROWS_PER_EVENT / elapsed:.1f} rows/s)")
+    if before is not None and after is not None:
+        for table in sorted(after):
+            count_after, seconds_after = after[table]
+            count_before, seconds_before = before.get(table, (0.0, 0.0))
+            calls = count_after - count_before
+            if calls:
+                print(f"  supabase {table:<16} {calls:>7.0f} calls   mean {(seconds_after - seconds_before) / calls * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
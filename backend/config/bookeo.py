@@ -7,6 +7,7 @@ import logging
 import time
 import os
 from backend.config.payu_client import get_payu_client, PaymentLinkRequest
+from backend.utils.metrics import path_label, record
 from dotenv import load_dotenv
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), 'keys.env'))
@@ -24,16 +25,16 @@ class BookeoAPI:
     Uses API key and secret key for authentication via headers and as URL params as backup.
     """
 
-    def __init__(self, base_url: str = "https://api.bookeo.com/v2"):
+    def __init__(self, base_url: Optional[str] = None):
         """
         Initialize the Bookeo API client.
 
         Args:
-            base_url (str): Base URL for Bookeo API (default: https://api.bookeo.com/v2)
+            base_url (str): Base URL for Bookeo API (default: BOOKEO_API_URL or https://api.bookeo.com/v2)
         """
         self.api_key = os.environ.get("BOOKEO_API_KEY")
         self.secret_key = os.environ.get("BOOKEO_SECRET_KEY")
-        self.base_url = base_url.rstrip('/')
+        self.base_url = (base_url or os.environ.get("BOOKEO_API_URL", "https://api.bookeo.com/v2")).rstrip('/')
 
         # Set up logging
         logging.basicConfig(level=logging.INFO)
@@ -41,6 +42,12 @@ class BookeoAPI:
 
         # Create session for connection reuse
         self.session = requests.Session()
+        # Time every Bookeo round trip for /metrics
+        self.session.hooks["response"].append(
+            lambda r, *args, **kwargs: record(
+                "bookeo", f"{r.request.method} {path_label(r.request.path_url)}", r.elapsed.total_seconds()
+            )
+        )
 
         # Set default headers as per Bookeo API documentation
         self.session.headers.update({
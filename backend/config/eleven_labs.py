@@ -15,15 +15,29 @@ Usage:
     agents = client.list_agents()
 """
 
-from hashlib import sha256
-import hmac
 import json
-import time
+from time import perf_counter
 from typing import Any, Dict, Optional, List, BinaryIO
 import os
+import httpx
 from dotenv import load_dotenv
 from elevenlabs.client import ElevenLabs
 
+from backend.utils.auth import verify_elevenlabs_signature
+from backend.utils.metrics import path_label, record
+
+
+def _start_timer(request: httpx.Request) -> None:
+    request.extensions["metrics_start"] = perf_counter()
+
+
+def _stop_timer(response: httpx.Response) -> None:
+    # Called once response headers arrive; records the SDK round trip for /metrics
+    start = response.request.extensions.get("metrics_start")
+    if start is not None:
+        operation = f"{response.request.method} {path_label(response.request.url.path, depth=3)}"
+        record("elevenlabs", operation, perf_counter() - start)
+
 
 class ElevenLabsError(Exception):
     """Custom exception for ElevenLabs operations"""
@@ -76,6 +90,11 @@ class ElevenLabsClient:
             self.client = ElevenLabs(
                 api_key=self.api_key,
                 timeout=timeout,
+                httpx_client=httpx.Client(
+                    timeout=timeout,
+                    follow_redirects=True,
+                    event_hooks={"request": [_start_timer], "response": [_stop_timer]},
+                ),
             )
         except Exception as e:
             raise ElevenLabsError(f"Failed to initialize ElevenLabs client: {str(e)}") from e
@@ -484,7 +503,7 @@ class ElevenLabsClient:
             
             return response.model_dump() if hasattr(response, 'model_dump') else response
         except Exception as e:
-            self._handle_error(e,f"Compute Rag Index Error :" ,e)
+            self._handle_error(e, f"computing RAG index for document {document_id}")
     
     # ================== PHONE NUMBERS ==================
 
@@ -870,83 +889,17 @@ class ElevenLabsClient:
             payload_body: Raw request body as bytes
             signature_header: Value from 'elevenlabs-signature' header
                              Format: "t=<timestamp>,v0=<signature>"
-            secret: Secret key (your ElevenLabs API key)
             timestamp_tolerance_seconds: Max age of request in seconds (default 30 mins)
         
         Returns:
             True if signature is valid and timestamp is recent, False otherwise
-        
-        Raises:
-            ValueError: If signature header format is invalid
         """
-        try:
-            # Step 1: Parse signature header
-            # Format: "t=<timestamp>,v0=<hmac_signature>"
-            parts = signature_header.split(",")
-            
-            if len(parts) != 2:
-                print(f"❌ Invalid signature header format: {signature_header}")
-                return False
-            
-            # Extract timestamp
-            timestamp_part = parts[0]  # "t=1234567890"
-            if not timestamp_part.startswith("t="):
-                print(f"❌ Invalid timestamp format: {timestamp_part}")
-                return False
-            timestamp = timestamp_part[2:]
-            
-            # Extract HMAC signature
-            signature_part = parts[1]  # "v0=abc123..."
-            if not signature_part.startswith("v0="):
-                print(f"❌ Invalid signature format: {signature_part}")
-                return False
-            hmac_signature = signature_part
-            
-            # Step 2: Validate timestamp (prevent replay attacks)
-            try:
-                timestamp_int = int(timestamp)
-            except ValueError:
-                print(f"❌ Timestamp is not a valid integer: {timestamp}")
-                return False
-            
-            current_time = int(time.time())
-            tolerance_threshold = current_time - timestamp_tolerance_seconds
-            
-            if timestamp_int < tolerance_threshold:
-                print(f"❌ Timestamp too old: {timestamp} (current: {current_time}, tolerance: {tolerance_threshold})")
-                return False
-            
-            # Timestamp in future (more than 1 minute) - also reject
-            if timestamp_int > current_time + 60:
-                print(f"❌ Timestamp in future: {timestamp}")
-                return False
-            
-            # Step 3: Calculate HMAC signature
-            # Format: "<timestamp>.<payload>"
-            full_payload_to_sign = f"{timestamp}.{payload_body.decode('utf-8')}"
-            
-            mac = hmac.new(
-                key=self.post_call_secret.encode("utf-8"),
-                msg=full_payload_to_sign.encode("utf-8"),
-                digestmod=sha256,
-            )
-            
-            # Create expected signature in format "v0=<hex>"
-            expected_digest = "v0=" + mac.hexdigest()
-            
-            # Step 4: Compare signatures (use constant-time comparison to prevent timing attacks)
-            if not hmac.compare_digest(hmac_signature, expected_digest):
-                print(f"❌ Signature mismatch")
-                print(f"   Expected: {expected_digest}")
-                print(f"   Received: {hmac_signature}")
-                return False
-            
-            print(f"✅ Webhook signature verified successfully")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error verifying signature: {str(e)}")
-            return False
+        return verify_elevenlabs_signature(
+            payload_body,
+            signature_header,
+            self.post_call_secret,
+            timestamp_tolerance_seconds=timestamp_tolerance_seconds,
+        )
 
 
 
@@ -14,9 +14,20 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, Any,List
 from pydantic import BaseModel, Field, EmailStr, validator
 from dotenv import load_dotenv
+from backend.utils.metrics import span
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), 'keys.env'))
 
+# OAuth host; overridable so local stand-ins (benchmarks/fakes.py) can be used
+PAYU_ACCOUNTS_HOST = os.getenv("PAYU_ACCOUNTS_HOST", "uat-accounts.payu.in")
+
+
+def _connection(host: str) -> http.client.HTTPConnection:
+    """HTTPS by default; a host given as "http://host:port" gets a plain connection."""
+    if host.startswith("http://"):
+        return http.client.HTTPConnection(host[len("http://"):])
+    return http.client.HTTPSConnection(host.replace("https://", "", 1))
+
 # ============================================================================
 # EXCEPTION CLASSES
 # ============================================================================
@@ -334,15 +345,16 @@ class PayUManager:
         }
 
         try:
-            conn = http.client.HTTPSConnection("uat-accounts.payu.in")
+            conn = _connection(PAYU_ACCOUNTS_HOST)
             headers = {'Content-Type': 'application/x-www-form-urlencoded'}
             
             # Convert payload to URL-encoded string
             body = "&".join([f"{k}={v}" for k, v in payload.items()])
             
-            conn.request("POST", "/oauth/token", body, headers)
-            response = conn.getresponse()
-            data = json.loads(response.read().decode("utf-8"))
+            with span("payu", "oauth_token"):
+                conn.request("POST", "/oauth/token", body, headers)
+                response = conn.getresponse()
+                data = json.loads(response.read().decode("utf-8"))
 
             if response.status != 200:
                 raise PayUAPIError(f"Token fetch failed: {data}")
@@ -486,10 +498,11 @@ class PayUManager:
                 'Authorization': f"Bearer {token}"
             }
             # Make API request
-            conn = http.client.HTTPSConnection(self.API_BASE_URL)
-            conn.request("POST", "/payment-links/", payload_json, headers)
-            response = conn.getresponse()
-            data = json.loads(response.read().decode("utf-8"))
+            conn = _connection(self.API_BASE_URL)
+            with span("payu", "create_payment_link"):
+                conn.request("POST", "/payment-links/", payload_json, headers)
+                response = conn.getresponse()
+                data = json.loads(response.read().decode("utf-8"))
             
             conn.close()
             # print("Response Data:", data)
@@ -547,10 +560,11 @@ class PayUManager:
             f"&dateTo={date_to_str}"
         )
 
-        conn = http.client.HTTPSConnection(self.API_BASE_URL)
-        conn.request("GET", path, headers=headers)
-        response = conn.getresponse()
-        raw = response.read().decode("utf-8")
+        conn = _connection(self.API_BASE_URL)
+        with span("payu", "get_transaction_details"):
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            raw = response.read().decode("utf-8")
         conn.close()
 
         if response.status != 200:
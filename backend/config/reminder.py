@@ -1,21 +1,32 @@
 import os
+import signal
+import argparse
+import threading
 import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
-from typing import Dict, Any
-from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+
+from backend.utils.structured_logging import log_event, setup_logging
 
 # --- Import Your Shared Clients ---
 try:
     # 1. Import your shared Supabase client
     from backend.config.supabase_client import supabase
     logging.info("Successfully imported shared Supabase client.")
-    
+
+    from backend.config.reminder_scheduler import reminder_scheduler
+    from backend.services.consumption_ledger import consumption_ledger
+
     # 2. Import your shared WATI client instance
-    # from wati import wati_client
-    # if wati_client is None:
-    #     raise ImportError("wati_client is None, check WATI env variables.")
-    # logging.info("Successfully imported shared Wati client.")
-    
+    from backend.config.wati import wati_client, _safe_phone
+    if wati_client is None:
+        logging.warning("wati_client is None, check WATI env variables. Reminders will not be sent.")
+    else:
+        logging.info("Successfully imported shared Wati client.")
+
 except ImportError as e:
     logging.critical(f"Fatal: Could not import shared client: {e}")
     logging.critical("Ensure PYTHONPATH is set correctly and env variables are loaded.")
@@ -25,17 +36,33 @@ except ImportError as e:
 # Load .env file for local testing
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '..', 'keys.env'))
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO, 
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Set up logging (no-op when the API has already configured it)
+setup_logging()
+logger = logging.getLogger(__name__)
 
 # --- Constants ---
 # We still need retry logic here
 MAX_RETRIES = 3
 RETRY_DELAY_MINUTES = 15
 
+# Fraction of "nothing due" poll results that are logged
+IDLE_LOG_SAMPLE_RATE = float(os.getenv("REMINDER_IDLE_LOG_SAMPLE_RATE", "0.05"))
+
+# Dispatcher tuning (override via env)
+POLL_INTERVAL_SECONDS = float(os.getenv("REMINDER_POLL_INTERVAL_SECONDS", "10"))
+MAX_WORKERS = int(os.getenv("REMINDER_MAX_WORKERS", "8"))
+WATI_BATCH_SIZE = int(os.getenv("REMINDER_WATI_BATCH_SIZE", "50"))
+
+# reminder_stage -> (TEMPLATES key, timing phrase)
+STAGE_TEMPLATES = {
+    "one_day": ("reminder_generic", "tomorrow"),
+    "one_hour": ("reminder_generic", "in 1 hour"),
+}
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
 # --- Helper Functions (Database Updates) ---
 # These functions are unchanged, as they only interact with Supabase
 
@@ -46,19 +73,39 @@ def update_reminder_status(booking_id: str, stage: str, update_data: Dict[str, A
     """
     try:
         update_data["updated_at"] = "now()"
-        
+
         # Uses the global 'supabase' client
         supabase.table("reminders").update(update_data).match({
             "booking_id": booking_id,
             "reminder_stage": stage
         }).execute()
-        
+
         logging.info(f"Updated booking {booking_id} ({stage}) to status: {update_data.get('status')}")
-        
+
     except Exception as e:
         logging.error(f"FATAL: Could not update status for booking {booking_id} ({stage}): {e}")
 
 
+def bulk_update_reminder_status(stage: str, booking_ids: List[str], update_data: Dict[str, Any]):
+    """
+    Apply the same status update to many reminders of one stage in a single request.
+    """
+    if not booking_ids:
+        return
+    try:
+        update_data["updated_at"] = _now_iso()
+
+        supabase.table("reminders").update(update_data) \
+            .eq("reminder_stage", stage) \
+            .in_("booking_id", booking_ids) \
+            .execute()
+
+        logging.info(f"Updated {len(booking_ids)} reminder(s) ({stage}) to status: {update_data.get('status')}")
+
+    except Exception as e:
+        logging.error(f"FATAL: Could not bulk update status for {len(booking_ids)} reminder(s) ({stage}): {e}")
+
+
 def handle_send_success(booking_id: str, stage: str):
     """Update reminder status to 'sent'."""
     update_data = {
@@ -69,94 +116,264 @@ def handle_send_success(booking_id: str, stage: str):
     update_reminder_status(booking_id, stage, update_data)
 
 
-def handle_send_failure(booking_id: str, stage: str, retry_count: int, error: str):
-    """Handles a failed send, implementing the retry logic."""
-    
+def _failure_update_data(retry_count: int, error: str) -> Dict[str, Any]:
+    """Build the status update for a failed send, implementing the retry logic."""
     if retry_count + 1 >= MAX_RETRIES:
-        logging.warning(f"Booking {booking_id} ({stage}) reached max retries. Marking as 'failed'.")
-        update_data = {
+        return {
             "status": "failed",
             "error_message": f"Final attempt failed: {error}"[:500],
             "retry_count": retry_count + 1
         }
+    next_trigger = datetime.now(timezone.utc) + timedelta(minutes=RETRY_DELAY_MINUTES)
+    return {
+        "status": "pending",
+        "retry_count": retry_count + 1,
+        "error_message": f"Attempt {retry_count + 1} failed: {error}"[:500],
+        "next_trigger": next_trigger.isoformat()
+    }
+
+
+def handle_send_failure(booking_id: str, stage: str, retry_count: int, error: str):
+    """Handles a failed send, implementing the retry logic."""
+
+    if retry_count + 1 >= MAX_RETRIES:
+        logging.warning(f"Booking {booking_id} ({stage}) reached max retries. Marking as 'failed'.")
     else:
         logging.info(f"Booking {booking_id} ({stage}) failed. Scheduling retry {retry_count + 1}.")
-        update_data = {
-            "status": "pending",
-            "retry_count": retry_count + 1,
-            "error_message": f"Attempt {retry_count + 1} failed: {error}"[:500],
-            "next_trigger": f"now() + interval '{RETRY_DELAY_MINUTES} minutes'"
-        }
-    
-    update_reminder_status(booking_id, stage, update_data)
 
+    update_reminder_status(booking_id, stage, _failure_update_data(retry_count, error))
 
-# --- Main Cron Job Function ---
 
-def main():
-    """Main function to fetch, process, and update reminders."""
-    logging.info("--- 🚀 Starting reminder cron job run ---")
+def bulk_handle_send_success(reminders: List[Dict[str, Any]]):
+    """Mark all sent reminders as 'sent', one request per stage."""
+    by_stage: Dict[str, List[str]] = defaultdict(list)
+    for reminder in reminders:
+        by_stage[reminder["reminder_stage"]].append(reminder["booking_id"])
 
-    # 1. Fetch and lock due reminders
+    sent_at = _now_iso()
+    for stage, booking_ids in by_stage.items():
+        bulk_update_reminder_status(stage, booking_ids, {
+            "status": "sent",
+            "sent_at": sent_at,
+            "error_message": None
+        })
+
+
+def bulk_handle_send_failure(failures: List[Tuple[Dict[str, Any], str]]):
+    """
+    Write back failed sends. Reminders sharing stage, retry count and error
+    get identical updates, so each such group is a single request.
+    """
+    groups: Dict[Tuple[str, int, str], List[str]] = defaultdict(list)
+    for reminder, error in failures:
+        retry_count = reminder.get("retry_count") or 0
+        groups[(reminder["reminder_stage"], retry_count, error)].append(reminder["booking_id"])
+
+    for (stage, retry_count, error), booking_ids in groups.items():
+        if retry_count + 1 >= MAX_RETRIES:
+            logging.warning(f"{len(booking_ids)} reminder(s) ({stage}) reached max retries. Marking as 'failed'.")
+        else:
+            logging.info(f"{len(booking_ids)} reminder(s) ({stage}) failed. Scheduling retry {retry_count + 1}.")
+        bulk_update_reminder_status(stage, booking_ids, _failure_update_data(retry_count, error))
+
+
+# --- Dispatcher ---
+
+def _build_receiver(reminder: Dict[str, Any]) -> Tuple[str, Tuple[str, List[str]]]:
+    """
+    Resolve a due reminder to (template_name, (phone, params_list)).
+    Raises on unknown stage, bad phone or bad start_time so the caller can record the failure.
+    """
+    stage = reminder["reminder_stage"]
+    if stage not in STAGE_TEMPLATES:
+        raise ValueError(f"Unknown reminder_stage '{stage}'")
+    template_key, timing_phrase = STAGE_TEMPLATES[stage]
+
+    phone = _safe_phone(reminder.get("phone_number"))
+    if not phone:
+        raise ValueError("Invalid phone number")
+
+    # Convert the start_time string from Supabase to a datetime object,
+    # which the wati_client functions expect.
+    start_time_dt = datetime.fromisoformat(reminder["start_time"].replace("Z", "+00:00"))
+    params_list = wati_client.build_reminder_params(
+        timing_phrase=timing_phrase,
+        customer_name=reminder.get("customer_name") or "",
+        theme_name=reminder.get("theme_name") or "",
+        start_time=start_time_dt,
+        participants={
+            "adults": reminder.get("adults") or 0,
+            "children": reminder.get("children") or 0,
+        },
+    )
+    template = wati_client.registry.get(template_key)
+    if not template["valid"]:
+        raise ValueError(f"Template '{template['name']}' failed validation: {'; '.join(template['issues'])}")
+    return template["name"], (phone, params_list)
+
+
+def _send_batch(template_name: str, batch: List[Tuple[Dict[str, Any], Tuple[str, List[str]]]]) -> bool:
+    success = wati_client.send_template_batch(
+        template_name=template_name,
+        receivers=[receiver for _, receiver in batch],
+        broadcast_name=f"reminder_{template_name}",
+    )
+    if success:
+        consumption_ledger.record_whatsapp_messages(len(batch), reference=template_name)
+    return success
+
+
+def dispatch_reminders(due_reminders: List[Dict[str, Any]], pool: ThreadPoolExecutor) -> Tuple[int, int]:
+    """
+    Group due reminders by template, send each group in WATI batches on the
+    worker pool, then write all status changes back in bulk.
+    Returns (sent, failed) counts.
+    """
+    groups: Dict[str, List[Tuple[Dict[str, Any], Tuple[str, List[str]]]]] = defaultdict(list)
+    failed: List[Tuple[Dict[str, Any], str]] = []
+
+    for reminder in due_reminders:
+        try:
+            template_name, receiver = _build_receiver(reminder)
+            groups[template_name].append((reminder, receiver))
+        except Exception as e:
+            # This catches errors in *our* logic (e.g., bad datetime format)
+            logging.error(f"Critical error processing booking {reminder.get('booking_id')} ({reminder.get('reminder_stage')}): {e}")
+            failed.append((reminder, str(e)))
+
+    futures = {}
+    for template_name, items in groups.items():
+        for i in range(0, len(items), WATI_BATCH_SIZE):
+            batch = items[i:i + WATI_BATCH_SIZE]
+            futures[pool.submit(_send_batch, template_name, batch)] = batch
+
+    sent: List[Dict[str, Any]] = []
+    for future in as_completed(futures):
+        reminders = [reminder for reminder, _ in futures[future]]
+        try:
+            success = future.result()
+            error = "WATI client call failed"
+        except Exception as e:
+            success, error = False, str(e)
+
+        if success:
+            sent.extend(reminders)
+        else:
+            failed.extend((reminder, error) for reminder in reminders)
+
+    bulk_handle_send_success(sent)
+    bulk_handle_send_failure(failed)
+    return len(sent), len(failed)
+
+
+def fetch_due_reminders() -> Optional[List[Dict[str, Any]]]:
+    """Fetch and lock due reminders. Returns None if the RPC call failed."""
     try:
         # Uses the global 'supabase' client to call the RPC function
         response = supabase.rpc('get_and_lock_due_reminders').execute()
-        due_reminders = response.data
-        
-        if not due_reminders:
-            logging.info("No due reminders found. Job finished.")
-            return
-            
+        return response.data or []
     except Exception as e:
         logging.error(f"Error calling RPC 'get_and_lock_due_reminders': {e}")
-        return
+        return None
 
-    logging.info(f"Found {len(due_reminders)} reminders to process.")
 
-    # 2. Process each reminder
-    for reminder in due_reminders:
-        booking_id = reminder['booking_id']
-        stage = reminder['reminder_stage']
-        
-        try:
-            # Convert the start_time string from Supabase to a datetime object,
-            # which the wati_client functions expect.
-            # start_time_dt = datetime.fromisoformat(reminder['start_time'])
-            print(reminder)
-            # success = False
-            
-            # # Call the correct WatiClient function based on the stage
-            # if stage == 'one_day':
-            #     success = wati_client.send_one_day_reminder(
-            #         phone_number=reminder['phone_number'],
-            #         customer_name=reminder['customer_name'],
-            #         theme_name=reminder['theme_name'],
-            #         start_time=start_time_dt
-            #     )
-            # elif stage == 'one_hour':
-            #     success = wati_client.send_one_hour_reminder(
-            #         phone_number=reminder['phone_number'],
-            #         customer_name=reminder['customer_name'],
-            #         theme_name=reminder['theme_name'],
-            #         start_time=start_time_dt
-            #     )
-            # else:
-            #     logging.warning(f"Unknown reminder_stage '{stage}' for booking {booking_id}. Skipping.")
-            #     continue # Skip to the next reminder
-
-            # # 3. Update status in Supabase based on outcome
-            # if success:
-            #     handle_send_success(booking_id, stage)
-            # else:
-            #     handle_send_failure(booking_id, stage, reminder['retry_count'], "WATI client call failed")
+# --- Main Cron Job Function ---
 
-        except Exception as e:
-            # This catches errors in *our* logic (e.g., bad datetime format)
-            logging.error(f"Critical error processing booking {booking_id} ({stage}): {e}")
-            handle_send_failure(booking_id, stage, reminder['retry_count'], str(e))
+def main(pool: Optional[ThreadPoolExecutor] = None) -> int:
+    """
+    Main function to fetch, process, and update reminders.
+    Returns the number of reminders processed in this run.
+    """
+    if wati_client is None:
+        log_event(logger, logging.CRITICAL, "reminder_run_skipped", reason="WATI client is not configured")
+        return 0
+
+    # 1. Fetch and lock due reminders
+    due_reminders = fetch_due_reminders()
+    if not due_reminders:
+        log_event(logger, logging.INFO, "reminder_run_idle", sample=IDLE_LOG_SAMPLE_RATE)
+        return 0
+
+    log_event(logger, logging.INFO, "reminder_run_started", due=len(due_reminders))
+
+    # 2. Send concurrently and write statuses back in bulk
+    if pool is None:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as one_shot_pool:
+            sent, failed = dispatch_reminders(due_reminders, one_shot_pool)
+    else:
+        sent, failed = dispatch_reminders(due_reminders, pool)
+    # Cron runs exit right after this, before the ledger's periodic flush
+    consumption_ledger.flush()
+
+    log_event(logger, logging.INFO, "reminder_run_finished", due=len(due_reminders), sent=sent, failed=failed)
+    return len(due_reminders)
+
+
+def run_forever(poll_interval: float = POLL_INTERVAL_SECONDS, stop_event: Optional[threading.Event] = None):
+    """
+    Long-lived worker: poll for due reminders every `poll_interval` seconds.
+    When a run finds work it polls again immediately, so a backlog drains without waiting.
+    """
+    stop_event = stop_event or threading.Event()
+    logging.info(f"Reminder worker started (poll every {poll_interval}s, {MAX_WORKERS} workers).")
+    if wati_client is not None:
+        # Load and validate WATI templates up front so sends never wait on the list endpoint
+        wati_client.registry.refresh()
 
-    logging.info("--- ✅ Reminder cron job run finished ---")
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        while not stop_event.is_set():
+            try:
+                processed = main(pool)
+            except Exception:
+                log_event(logger, logging.ERROR, "reminder_run_failed", exc_info=True)
+                processed = 0
+            if not processed:
+                stop_event.wait(poll_interval)
+
+    logging.info("Reminder worker stopped.")
+
+
+_scheduler_pool: Optional[ThreadPoolExecutor] = None
+
+
+def start_scheduler():
+    """
+    Start the timer-driven mode: the reminder scheduler wakes at each reminder's
+    due time and runs one dispatch pass, instead of polling on an interval.
+    """
+    global _scheduler_pool
+    if reminder_scheduler.running:
+        return
+    _scheduler_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    if wati_client is not None:
+        wati_client.registry.refresh()
+    reminder_scheduler.start(fire=lambda due_keys: main(_scheduler_pool))
+
+
+def stop_scheduler():
+    global _scheduler_pool
+    reminder_scheduler.stop()
+    if _scheduler_pool is not None:
+        _scheduler_pool.shutdown(wait=True)
+        _scheduler_pool = None
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Send due booking reminders over WATI.")
+    parser.add_argument("--once", action="store_true", help="Run a single pass (cron mode) and exit.")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL_SECONDS, help="Poll interval in seconds.")
+    parser.add_argument("--scheduled", action="store_true", help="Fire at each reminder's due time instead of polling.")
+    args = parser.parse_args()
+
+    if args.once:
+        main()
+    else:
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+        if args.scheduled:
+            start_scheduler()
+            stop.wait()
+            stop_scheduler()
+        else:
+            run_forever(poll_interval=args.interval, stop_event=stop)
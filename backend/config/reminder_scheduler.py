@@ -0,0 +1,327 @@
+"""
+reminder_scheduler.py
+---------------------
+In-process timer index for booking reminders.
+
+Keeps a min-heap of (due_at, booking_id, reminder_stage) so the reminder
+worker wakes exactly when the next reminder is due instead of polling the
+`get_and_lock_due_reminders` RPC on a fixed interval. The RPC stays the source
+of truth: a fired timer only triggers a dispatch run, which locks and sends
+whatever the database considers due.
+
+State is snapshotted to a local JSON file together with an `updated_at`
+watermark, so a restart reloads the snapshot and only fetches reminders that
+changed since, instead of scanning the whole table.
+"""
+
+import os
+import json
+import heapq
+import time
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from backend.config.supabase_client import supabase
+
+logger = logging.getLogger(__name__)
+
+STATE_PATH = os.getenv(
+    "REMINDER_SCHEDULER_STATE",
+    os.path.join(os.path.dirname(__file__), "reminder_schedule.json"),
+)
+# Offsets from booking start_time for each reminder stage
+STAGE_OFFSETS = {
+    "one_day": timedelta(days=1),
+    "one_hour": timedelta(hours=1),
+}
+# Small delay after the due time so the RPC's now() has passed next_trigger
+FIRE_LAG_SECONDS = 1.0
+# A reminder still pending and due after a run is re-checked after this long
+RECHECK_SECONDS = 60.0
+PAGE_SIZE = 1000
+
+Key = Tuple[str, str]  # (booking_id, reminder_stage)
+
+
+def _to_epoch(value: Any) -> Optional[float]:
+    """Accept datetimes or ISO strings (with or without 'Z'); naive values are UTC."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class ReminderScheduler:
+    """
+    Heap-based scheduler. Entries are removed lazily: `_due` holds the current
+    due time per key and heap items that no longer match it are skipped.
+    """
+
+    def __init__(self, state_path: str = STATE_PATH):
+        self.state_path = state_path
+        self._heap: List[Tuple[float, str, str]] = []
+        self._due: Dict[Key, float] = {}
+        self._watermark: Optional[str] = None
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._fire: Optional[Callable[[List[Key]], Any]] = None
+        self._running = False
+
+    # ------------------------------------------------------------------
+    # Timer index
+    # ------------------------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def schedule(self, booking_id: str, stage: str, due_at: Any) -> None:
+        """Add or move the timer for one reminder."""
+        due = _to_epoch(due_at)
+        if due is None:
+            return
+        key = (str(booking_id), stage)
+        with self._cond:
+            self._due[key] = due
+            heapq.heappush(self._heap, (due, key[0], key[1]))
+            # Wake the timer thread if this is now the earliest entry
+            if self._heap[0][0] == due:
+                self._cond.notify()
+
+    def unschedule(self, booking_id: str, stage: Optional[str] = None) -> None:
+        stages = [stage] if stage else list(STAGE_OFFSETS)
+        with self._cond:
+            for s in stages:
+                self._due.pop((str(booking_id), s), None)
+
+    def next_due(self) -> Optional[float]:
+        with self._cond:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def _drop_stale(self) -> None:
+        while self._heap:
+            due, booking_id, stage = self._heap[0]
+            if self._due.get((booking_id, stage)) == due:
+                return
+            heapq.heappop(self._heap)
+
+    def _pop_due(self, now: float) -> List[Key]:
+        keys: List[Key] = []
+        while self._heap and self._heap[0][0] <= now:
+            due, booking_id, stage = heapq.heappop(self._heap)
+            key = (booking_id, stage)
+            if self._due.get(key) == due:
+                del self._due[key]
+                keys.append(key)
+        return keys
+
+    # ------------------------------------------------------------------
+    # Booking change hooks
+    # ------------------------------------------------------------------
+
+    def schedule_booking(self, booking_id: str, start_time: Any) -> None:
+        """(Re)arm the one_day / one_hour timers for a booking. No-op when not running."""
+        if not self._running:
+            return
+        start = _to_epoch(start_time)
+        if start is None:
+            return
+        now = time.time()
+        for stage, offset in STAGE_OFFSETS.items():
+            due = start - offset.total_seconds()
+            if due > now:
+                self.schedule(booking_id, stage, datetime.fromtimestamp(due, timezone.utc))
+            else:
+                self.unschedule(booking_id, stage)
+
+    def cancel_booking(self, booking_id: str) -> None:
+        if not self._running:
+            return
+        self.unschedule(booking_id)
+
+    def sync_bookings(self, bookings: Iterable[Dict[str, Any]]) -> None:
+        """Apply a batch of booking rows (as stored in `bookings`)."""
+        if not self._running:
+            return
+        for booking in bookings:
+            if (booking.get("status") or "").lower() in ("canceled", "cancelled"):
+                self.cancel_booking(booking["booking_id"])
+            elif booking.get("start_time"):
+                self.schedule_booking(booking["booking_id"], booking["start_time"])
+
+    # ------------------------------------------------------------------
+    # Loading and persistence
+    # ------------------------------------------------------------------
+
+    def _apply_rows(self, rows: List[Dict[str, Any]], overdue_delay: float = FIRE_LAG_SECONDS) -> None:
+        now = time.time()
+        for row in rows:
+            updated_at = row.get("updated_at")
+            if updated_at and (self._watermark is None or updated_at > self._watermark):
+                self._watermark = updated_at
+
+            key_args = (row["booking_id"], row["reminder_stage"])
+            if row.get("status") != "pending":
+                self.unschedule(*key_args)
+                continue
+            due = _to_epoch(row.get("next_trigger"))
+            if due is None:
+                continue
+            if due <= now:
+                # Overdue: fire shortly so the next dispatch picks it up
+                due = now + overdue_delay
+            self.schedule(*key_args, datetime.fromtimestamp(due, timezone.utc))
+
+    def _fetch_pages(self, query_factory: Callable[[], Any]) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        offset = 0
+        while True:
+            page = query_factory().range(offset, offset + PAGE_SIZE - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+            offset += PAGE_SIZE
+
+    def _full_load(self) -> None:
+        logger.info("Reminder scheduler: no snapshot, loading pending reminders from the table.")
+        self._watermark = datetime.now(timezone.utc).isoformat()
+        rows = self._fetch_pages(
+            lambda: supabase.table("reminders")
+            .select("booking_id, reminder_stage, status, next_trigger")
+            .eq("status", "pending")
+            .order("next_trigger")
+        )
+        self._apply_rows(rows)
+
+    def _delta_load(self) -> None:
+        rows = self._fetch_pages(
+            lambda: supabase.table("reminders")
+            .select("booking_id, reminder_stage, status, next_trigger, updated_at")
+            .gt("updated_at", self._watermark)
+            .order("updated_at")
+        )
+        logger.info(f"Reminder scheduler: {len(rows)} reminder(s) changed since {self._watermark}.")
+        self._apply_rows(rows)
+
+    def _resync(self, keys: List[Key]) -> None:
+        """Re-read reminders a run just handled; retries come back with a later next_trigger."""
+        wanted = set(keys)
+        booking_ids = sorted({booking_id for booking_id, _ in keys})
+        for i in range(0, len(booking_ids), PAGE_SIZE):
+            resp = (
+                supabase.table("reminders")
+                .select("booking_id, reminder_stage, status, next_trigger")
+                .in_("booking_id", booking_ids[i:i + PAGE_SIZE])
+                .execute()
+            )
+            rows = [r for r in resp.data or [] if (r["booking_id"], r["reminder_stage"]) in wanted]
+            # Anything still pending and due was not picked up by the RPC; re-check later
+            self._apply_rows(rows, overdue_delay=RECHECK_SECONDS)
+
+    def load(self) -> None:
+        """Restore from the snapshot plus a delta fetch, or fall back to a full load."""
+        try:
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            state = None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Reminder scheduler: ignoring unreadable snapshot {self.state_path}: {e}")
+            state = None
+
+        if not state or not state.get("watermark"):
+            self._full_load()
+        else:
+            self._watermark = state["watermark"]
+            for booking_id, stage, due in state.get("timers", []):
+                self.schedule(booking_id, stage, datetime.fromtimestamp(due, timezone.utc))
+            self._delta_load()
+        self.save()
+        logger.info(f"Reminder scheduler: {len(self)} pending timer(s) loaded.")
+
+    def save(self) -> None:
+        """Atomically write the current timers and watermark to disk."""
+        with self._cond:
+            state = {
+                "watermark": self._watermark,
+                "timers": [[b, s, due] for (b, s), due in self._due.items()],
+            }
+        tmp_path = f"{self.state_path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            logger.error(f"Reminder scheduler: could not save snapshot: {e}")
+
+    # ------------------------------------------------------------------
+    # Timer thread
+    # ------------------------------------------------------------------
+
+    def start(self, fire: Callable[[List[Key]], Any]) -> None:
+        """
+        Load state and start the timer thread. `fire` receives the keys that
+        became due and should run one dispatch pass.
+        """
+        if self._running:
+            return
+        self._fire = fire
+        self._running = True
+        self.load()
+        self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if not self._running:
+            return
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=10)
+        self.save()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running:
+                    self._drop_stale()
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    delay = self._heap[0][0] + FIRE_LAG_SECONDS - time.time()
+                    if delay <= 0:
+                        break
+                    self._cond.wait(timeout=delay)
+                if not self._running:
+                    return
+                keys = self._pop_due(time.time() - FIRE_LAG_SECONDS)
+
+            if not keys:
+                continue
+            logger.info(f"Reminder scheduler: {len(keys)} reminder(s) due, dispatching.")
+            try:
+                self._fire(keys)
+            except Exception as e:
+                logger.error(f"Reminder scheduler: dispatch failed: {e}")
+            try:
+                self._resync(keys)
+            except Exception as e:
+                logger.error(f"Reminder scheduler: could not re-read dispatched reminders: {e}")
+            self.save()
+
+
+# --- Global instance for app imports ---
+reminder_scheduler = ReminderScheduler()
@@ -1,17 +1,90 @@
 import os
-from supabase import create_client, Client as SupabaseClient
+import threading
+from typing import TYPE_CHECKING, Optional
+
 from dotenv import load_dotenv
 
+from backend.utils.metrics import span
+
+if TYPE_CHECKING:
+    from supabase import Client as SupabaseClient
+
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), 'keys.env'))
 
-url: str = os.environ.get("SUPABASE_URL")
-key: str = os.environ.get("SUPABASE_KEY")
+_client: Optional["SupabaseClient"] = None
+_client_lock = threading.Lock()
+
+
+def get_supabase() -> "SupabaseClient":
+    """
+    Return the shared Supabase client, creating it on first use. The supabase
+    SDK itself is imported here too, so importing this module (and every
+    service that imports it) stays cheap.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                url: str = os.environ.get("SUPABASE_URL")
+                key: str = os.environ.get("SUPABASE_KEY")
+
+                if not url or not key:
+                    raise Exception("Supabase URL and Key must be set in the environment variables.")
+
+                from supabase import create_client
+                _client = create_client(url, key)
+    return _client
+
+
+class _TimedQuery:
+    """
+    Wraps a PostgREST request builder so `.execute()` is recorded as a
+    "supabase" span. Chained builder calls (select, eq, order, not_, ...)
+    return wrapped builders, so the span label survives the chain.
+    """
+
+    __slots__ = ("_builder", "_operation")
+
+    def __init__(self, builder, operation: str):
+        self._builder = builder
+        self._operation = operation
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if name == "execute":
+            def execute(*args, **kwargs):
+                with span("supabase", self._operation):
+                    return attr(*args, **kwargs)
+            return execute
+        if callable(attr):
+            def chained(*args, **kwargs):
+                result = attr(*args, **kwargs)
+                return _TimedQuery(result, self._operation) if hasattr(result, "execute") else result
+            return chained
+        return _TimedQuery(attr, self._operation) if hasattr(attr, "execute") else attr
+
+
+class _LazySupabase:
+    """Stands in for the client at import time; forwards everything to get_supabase()."""
+
+    def table(self, table_name: str):
+        return _TimedQuery(get_supabase().table(table_name), table_name)
+
+    from_ = table
+
+    def rpc(self, fn: str, *args, **kwargs):
+        return _TimedQuery(get_supabase().rpc(fn, *args, **kwargs), f"rpc:{fn}")
+
+    def __getattr__(self, name):
+        return getattr(get_supabase(), name)
+
+    def __repr__(self) -> str:
+        return f"<lazy Supabase client, initialized={_client is not None}>"
 
-if not url or not key:
-    raise Exception("Supabase URL and Key must be set in the environment variables.")
 
-supabase: SupabaseClient = create_client(url, key)
+# `from backend.config.supabase_client import supabase` keeps working unchanged
+supabase: "SupabaseClient" = _LazySupabase()
 
 
 # if __name__=="__main__":
-#     print(supabase.)
\ No newline at end of file
+#     print(supabase.)
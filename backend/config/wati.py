@@ -1,11 +1,15 @@
 import os
 import re
+import time
 import logging
+import threading
 import requests
 from dotenv import load_dotenv
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
+from backend.utils.phone import normalize_phone, normalize_phones
+
 logger = logging.getLogger(__name__)
 
 
@@ -50,12 +54,159 @@ def _safe_phone(p: str) -> str:
     - keep one leading '+' if present
     - remove other non-digits
     """
-    if not isinstance(p, str):
-        return ""
-    p = p.strip()
-    if p.startswith("+"):
-        return "+" + re.sub(r"\D", "", p[1:])
-    return re.sub(r"\D", "", p)
+    return normalize_phone(p)
+
+
+# Seconds before the remote template cache is considered stale
+TEMPLATE_CACHE_TTL = int(os.getenv("WATI_TEMPLATE_CACHE_TTL", "3600"))
+# After a failed load, wait this long (or the TTL, if shorter) before trying again
+TEMPLATE_RETRY_SECONDS = 60
+# Upper bound on template list pages read per refresh
+TEMPLATE_MAX_PAGES = 50
+
+_PLACEHOLDER_RE = re.compile(r"\{\{\s*([^{}]+?)\s*\}\}")
+
+
+def _template_placeholders(remote: Dict[str, Any]) -> List[str]:
+    """
+    Ordered, de-duplicated variable names of a remote WATI template.
+    Prefers the declared customParams, falls back to {{...}} markers in the body.
+    """
+    names = [
+        p.get("paramName")
+        for p in (remote.get("customParams") or [])
+        if isinstance(p, dict) and p.get("paramName")
+    ]
+    if names:
+        return names
+    seen: List[str] = []
+    for name in _PLACEHOLDER_RE.findall(remote.get("body") or ""):
+        if name not in seen:
+            seen.append(name)
+    return seen
+
+
+class TemplateRegistry:
+    """
+    In-memory cache of remote WATI templates, validated against the local TEMPLATES config.
+
+    Lookups never touch the network: a stale cache is refreshed in a background
+    thread while callers keep using the last resolved entries.
+    """
+
+    def __init__(self, client: "WatiClient", local_templates: Dict[str, Dict[str, Any]], ttl_seconds: int = TEMPLATE_CACHE_TTL):
+        self._client = client
+        self._local = local_templates
+        self.ttl_seconds = ttl_seconds
+        # Until the first load, trust the local config as-is
+        self._resolved = {
+            key: {"name": tpl["name"], "params": list(tpl["params"]), "valid": True, "issues": []}
+            for key, tpl in local_templates.items()
+        }
+        self._remote: Dict[str, Dict[str, Any]] = {}
+        self._loaded_at: Optional[float] = None
+        self._failed_at: Optional[float] = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    # --- Loading ---
+
+    def refresh(self) -> bool:
+        """Reload remote templates and re-validate the local config. Returns False on failure."""
+        try:
+            remote = self._fetch_all()
+        except Exception as e:
+            logger.error(f"Failed to load WATI templates: {e}")
+            with self._lock:
+                self._failed_at = time.monotonic()
+            return False
+
+        resolved = {key: self._resolve(key, tpl, remote) for key, tpl in self._local.items()}
+        with self._lock:
+            self._remote = remote
+            self._resolved = resolved
+            self._loaded_at = time.monotonic()
+            self._failed_at = None
+        logger.info(f"Loaded {len(remote)} WATI template(s).")
+        return True
+
+    def _fetch_all(self, page_size: int = 100) -> Dict[str, Dict[str, Any]]:
+        remote: Dict[str, Dict[str, Any]] = {}
+        for page in range(1, TEMPLATE_MAX_PAGES + 1):
+            data = self._client.get_templates(page=page, page_size=page_size)
+            items = data.get("messageTemplates") or []
+            before = len(remote)
+            for item in items:
+                name = item.get("elementName")
+                if name:
+                    remote[name] = item
+            # A short page is the last one; a page with nothing new means the
+            # API ignored the page number and keeps returning the same templates
+            if len(items) < page_size or len(remote) == before:
+                return remote
+        logger.warning(f"Stopped reading WATI templates after {TEMPLATE_MAX_PAGES} pages.")
+        return remote
+
+    @staticmethod
+    def _resolve(key: str, local: Dict[str, Any], remote: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        entry = {"name": local["name"], "params": list(local["params"]), "valid": True, "issues": []}
+        tpl = remote.get(local["name"])
+        if tpl is None:
+            entry["issues"].append("not found in WATI")
+        else:
+            status = (tpl.get("status") or "").upper()
+            if status and status != "APPROVED":
+                entry["issues"].append(f"status is {status}")
+            placeholders = _template_placeholders(tpl)
+            if placeholders and len(placeholders) != len(entry["params"]):
+                entry["issues"].append(
+                    f"expects {len(placeholders)} params, local config has {len(entry['params'])}"
+                )
+            elif placeholders and set(placeholders) == set(entry["params"]):
+                # Named variables: the remote definition decides the order
+                entry["params"] = placeholders
+
+        entry["valid"] = not entry["issues"]
+        for issue in entry["issues"]:
+            logger.error(f"WATI template '{key}' ({local['name']}): {issue}")
+        return entry
+
+    # --- Lookups ---
+
+    def _is_stale(self) -> bool:
+        now = time.monotonic()
+        if self._failed_at is not None and now - self._failed_at < min(self.ttl_seconds, TEMPLATE_RETRY_SECONDS):
+            # The last load failed recently: keep the current entries, don't hammer WATI
+            return False
+        return self._loaded_at is None or now - self._loaded_at > self.ttl_seconds
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run():
+            try:
+                self.refresh()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_run, name="wati-template-refresh", daemon=True).start()
+
+    def get(self, key: str) -> Dict[str, Any]:
+        """Resolved template entry: {"name", "params", "valid", "issues"}."""
+        if self._is_stale():
+            self._refresh_in_background()
+        return self._resolved[key]
+
+    def remote_templates(self) -> Dict[str, Dict[str, Any]]:
+        """Last loaded remote templates keyed by elementName."""
+        return dict(self._remote)
+
+    def validation_report(self) -> Dict[str, Dict[str, Any]]:
+        return {key: {"name": e["name"], "valid": e["valid"], "issues": list(e["issues"])} for key, e in self._resolved.items()}
 
 
 def _extract_api_base(full_endpoint: str) -> Optional[str]:
@@ -95,6 +246,7 @@ class WatiClient:
             }
         )
         self.templates = TEMPLATES
+        self.registry = TemplateRegistry(self, TEMPLATES)
 
     @staticmethod
     def _build_custom_params(params_list: List[str]) -> List[Dict[str, str]]:
@@ -108,27 +260,52 @@ class WatiClient:
         broadcast_name: Optional[str] = None,
         timeout_sec: int = 20,
     ) -> bool:
-        phone = _safe_phone(phone_number)
-        if not phone:
-            logger.error("Invalid phone number for WATI send.")
-            return False
+        return self.send_template_batch(
+            template_name=template_name,
+            receivers=[(phone_number, params_list)],
+            broadcast_name=broadcast_name,
+            timeout_sec=timeout_sec,
+        )
+
+    def send_template_batch(
+        self,
+        template_name: str,
+        receivers: List[Tuple[str, List[str]]],
+        broadcast_name: Optional[str] = None,
+        timeout_sec: int = 20,
+    ) -> bool:
+        """
+        Send one template to many receivers in a single sendTemplateMessages call.
+        Each receiver is a (phone_number, params_list) pair; the whole batch
+        succeeds or fails together.
+        """
         if not template_name:
             logger.error("Template name is required for WATI send.")
             return False
 
-        payload = {
-            "template_name": template_name,
-            "broadcast_name": broadcast_name or f"api_broadcast_{template_name}",
-            "receivers": [
+        phones = normalize_phones([phone_number for phone_number, _ in receivers])
+        wati_receivers = []
+        for phone, (_, params_list) in zip(phones, receivers):
+            if not phone:
+                logger.error("Invalid phone number for WATI send.")
+                return False
+            wati_receivers.append(
                 {
                     "whatsappNumber": phone,
                     "customParams": self._build_custom_params(params_list),
                 }
-            ],
+            )
+        if not wati_receivers:
+            return True
+
+        payload = {
+            "template_name": template_name,
+            "broadcast_name": broadcast_name or f"api_broadcast_{template_name}",
+            "receivers": wati_receivers,
         }
 
         try:
-            logger.info(f"Sending WATI template '{template_name}' to {phone}...")
+            logger.info(f"Sending WATI template '{template_name}' to {len(wati_receivers)} receiver(s)...")
             resp = self._session.post(self.send_endpoint, json=payload, timeout=timeout_sec)
             # try to capture server response for diagnostics
             try:
@@ -136,7 +313,7 @@ class WatiClient:
             except Exception:
                 content = resp.text
             resp.raise_for_status()
-            logger.info(f"WATI send OK to {phone}. Response: {content}")
+            logger.info(f"WATI send OK to {len(wati_receivers)} receiver(s). Response: {content}")
             return True
         except requests.exceptions.HTTPError as http_err:
             logger.error(f"WATI HTTP error: {http_err} - Body: {getattr(http_err, 'response', None) and getattr(http_err.response, 'text', '')}")
@@ -161,6 +338,8 @@ class WatiClient:
             raise ValueError("Templates endpoint is not configured.")
         params: Dict[str, Any] = {}
         if page is not None:
+            # WATI pages with pageNumber; page is kept for older tenants
+            params["pageNumber"] = int(page)
             params["page"] = int(page)
         if page_size is not None:
             params["pageSize"] = int(page_size)
@@ -201,7 +380,10 @@ class WatiClient:
         start_time: datetime,
         participants: Dict[str, int],
     ) -> bool:
-        template = self.templates["booking_confirmation"]
+        template = self.registry.get("booking_confirmation")
+        if not template["valid"]:
+            logger.error(f"Template '{template['name']}' failed validation: {template['issues']}")
+            return False
         dt = self._format_date_time(start_time)
         participants_summary = self._format_participants(participants)
         params_map = {
@@ -235,19 +417,18 @@ class WatiClient:
         """
         Reuse a single generic reminder template by varying 'timing_phrase'.
         """
-        template = self.templates["reminder_generic"]
-        dt = self._format_date_time(start_time)
-        participants_summary = self._format_participants(participants)
-        params_map = {
-            "timing_phrase": timing_phrase,
-            "customer_name": customer_name,
-            "theme_name": theme_name,
-            "booking_date": dt["booking_date"],
-            "booking_time": dt["booking_time"],
-            "participants_summary": participants_summary,
-        }
+        template = self.registry.get("reminder_generic")
+        if not template["valid"]:
+            logger.error(f"Template '{template['name']}' failed validation: {template['issues']}")
+            return False
         try:
-            params_list = [params_map[p] for p in template["params"]]
+            params_list = self.build_reminder_params(
+                timing_phrase=timing_phrase,
+                customer_name=customer_name,
+                theme_name=theme_name,
+                start_time=start_time,
+                participants=participants,
+            )
         except KeyError as e:
             logger.error(f"Missing parameter {e} for template '{template['name']}'")
             return False
@@ -258,6 +439,30 @@ class WatiClient:
             params_list=params_list,
         )
 
+    def build_reminder_params(
+        self,
+        timing_phrase: str,
+        customer_name: str,
+        theme_name: str,
+        start_time: datetime,
+        participants: Dict[str, int],
+    ) -> List[str]:
+        """
+        Build the ordered params list for the generic reminder template.
+        Raises KeyError if the template expects a param we cannot fill.
+        """
+        template = self.registry.get("reminder_generic")
+        dt = self._format_date_time(start_time)
+        params_map = {
+            "timing_phrase": timing_phrase,
+            "customer_name": customer_name,
+            "theme_name": theme_name,
+            "booking_date": dt["booking_date"],
+            "booking_time": dt["booking_time"],
+            "participants_summary": self._format_participants(participants),
+        }
+        return [params_map[p] for p in template["params"]]
+
 
 
 # --- Global instance for app imports ---
@@ -269,4 +474,5 @@ except ValueError as e:
 
 if __name__=="__main__":
 
-    print(wati_client.get_templates())
\ No newline at end of file
+    wati_client.registry.refresh()
+    print(wati_client.registry.validation_report())
\ No newline at end of file
@@ -1,14 +1,111 @@
+import os
+import sys
+import logging
+import importlib
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-# Import your routers from the 'routers' directory
-from backend.config import reminder
-from backend.models.followup_model import FollowUp
-from backend.routers import branch_router, call_analysis_router, \
-call_router, customer_router, dashboard_router, booking_router, event_router, lead_router, payment_router, payu_payments_router, theme_router, compute_router2,bookeo_router,\
-analysis_router2, elevenlabs_router,analysis_combined_kpi_router, user_router
-from backend.routers.archived_routers import analysis_router, consumption_router, followup_router, linktracker_router, scripts_router, slot_router
+from backend.utils.metrics import MetricsMiddleware
+from backend.utils.structured_logging import setup_logging
+
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', 'keys.env'))
+
+# JSON logs written from a background thread (LOG_LEVEL / LOG_FORMAT)
+setup_logging()
+logger = logging.getLogger(__name__)
 
+# ----------------- Router Registry -----------------
+
+# Routers are imported only if enabled, so disabled ones cost nothing at startup.
+# Order matters: it is the include order.
+ROUTERS = [
+    "elevenlabs_router",
+    "payu_payments_router",
+    "bookeo_router",
+    "event_router",
+    "lead_router",
+    "dashboard_router",
+    "compute_router2",
+    "analysis_combined_kpi_router",
+    "booking_router",
+    "branch_router",
+    "call_analysis_router",
+    "call_router",
+    "customer_router",
+    "user_router",
+    "payment_router",
+    "theme_router",
+    "export_router",
+    "cost_router",
+    "metrics_router",
+]
+# Available but off unless listed in ENABLED_ROUTERS
+OPTIONAL_ROUTERS = [
+    "analysis_router2",
+    "archived_routers.analysis_router",
+    "archived_routers.consumption_router",
+    "archived_routers.followup_router",
+    "archived_routers.linktracker_router",
+    "archived_routers.scripts_router",
+    "archived_routers.slot_router",
+]
+
+
+def _env_list(name: str):
+    return [r.strip() for r in os.getenv(name, "").split(",") if r.strip()]
+
+
+def enabled_routers():
+    """
+    ENABLED_ROUTERS (comma-separated) replaces the default list entirely;
+    DISABLED_ROUTERS removes entries from whichever list is in effect.
+    """
+    names = _env_list("ENABLED_ROUTERS") or ROUTERS
+    disabled = set(_env_list("DISABLED_ROUTERS"))
+    known = set(ROUTERS) | set(OPTIONAL_ROUTERS)
+    for name in names:
+        if name not in known:
+            raise ValueError(f"Unknown router '{name}' in ENABLED_ROUTERS")
+    return [name for name in names if name not in disabled]
+
+
+def include_routers(app: FastAPI):
+    for name in enabled_routers():
+        module = importlib.import_module(f"backend.routers.{name}")
+        app.include_router(module.router)
+
+
+# ----------------- Lifespan -----------------
+
+REMINDER_SCHEDULER_ENABLED = os.getenv("REMINDER_SCHEDULER_ENABLED", "false").lower() == "true"
+# Per-route latency and dependency timings, served on /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Create the Supabase client during startup instead of on the first request
+SUPABASE_EAGER_INIT = os.getenv("SUPABASE_EAGER_INIT", "false").lower() == "true"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if SUPABASE_EAGER_INIT:
+        from backend.config.supabase_client import get_supabase
+        get_supabase()
+
+    reminder = None
+    # Timer-driven reminders are opt-in; the reminder module (and WATI client) load only then
+    if REMINDER_SCHEDULER_ENABLED:
+        from backend.config import reminder
+        reminder.start_scheduler()
+    try:
+        yield
+    finally:
+        if reminder is not None:
+            reminder.stop_scheduler()
+        # Write consumption entries still waiting for the next periodic flush
+        if "backend.services.consumption_ledger" in sys.modules:
+            sys.modules["backend.services.consumption_ledger"].consumption_ledger.stop()
 
 
 # ----------------- App Initialization -----------------
@@ -22,6 +119,7 @@ app = FastAPI(
         "name": "API Support",
         "email": "support@example.com",
     },
+    lifespan=lifespan,
 )
 
 # ----------------- Middleware -----------------
@@ -43,36 +141,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all HTTP methods (GET, POST, etc.)
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["X-Next-Cursor", "ETag"],  # List-page cursor; version tag on polled analytics endpoints
 )
 
+if METRICS_ENABLED:
+    # Added last so it is outermost and its timing includes the CORS layer
+    app.add_middleware(MetricsMiddleware)
+
 # ----------------- API Routers -----------------
 
-# Include the routers into the main application.
+# Include the enabled routers into the main application (see ROUTERS above).
 # The endpoints defined in these routers will be accessible under their specified prefixes.
-app.include_router(elevenlabs_router.router)
-app.include_router(payu_payments_router.router)
-app.include_router(bookeo_router.router)
-app.include_router(event_router.router)
-app.include_router(lead_router.router)
-app.include_router(dashboard_router.router)
-app.include_router(compute_router2.router)
-app.include_router(analysis_combined_kpi_router.router)
-app.include_router(booking_router.router)
-app.include_router(branch_router.router)
-app.include_router(call_analysis_router.router)
-app.include_router(call_router.router)
-app.include_router(customer_router.router)
-app.include_router(user_router.router)
-app.include_router(payment_router.router)
-app.include_router(theme_router.router)
-
-# app.include_router(consumption_router.router)
-# app.include_router(followup_router.router)
-# app.include_router(linktracker_router.router)
-# app.include_router(scripts_router.router)
-# app.include_router(slot_router.router)
-# Add other routers here as you create them...
-# e.g., app.include_router(customer_router.router)
+include_routers(app)
 
 # ----------------- Root Endpoint -----------------
 
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
+from backend.utils.db_utils import partial_model
 
 class Booking(BaseModel):
     """Schema representing a booking record from the database."""
@@ -73,3 +74,7 @@ class BookingUpdate(BaseModel):
     total_net: Optional[float] = Field(None, description="Total net amount for the booking.", example=2600)
     total_taxes: Optional[float] = Field(None, description="Total taxes for the booking.", example=0)
     total_paid: float = Field(0, description="Total amount paid towards the booking.", example=0)
+
+
+# Response model for ?fields= projections: every field optional
+BookingPartial = partial_model(Booking)
@@ -1,10 +1,12 @@
 from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime 
+from backend.utils.db_utils import partial_model
 class CallBase(BaseModel):
     """Base schema for a call record."""
     customer_id: Optional[str] = Field(..., description="Foreign key for the customer making the call.", example=201)
-    transcript: Optional[str] = Field(None, description="The full transcript of the call.")
+    transcript: Optional[str] = Field(None, description="Legacy inline transcript; new transcripts are served by /calls/{conv_id}/transcript.")
+    transcript_chars: Optional[int] = Field(None, ge=0, description="Length of the call transcript (0 if there was none).")
     date_time: datetime = Field(..., description="The time the call was made.", example="2025-10-04T14:30:00Z")
     duration: Optional[int] = Field(None, gt=0, description="Duration of the call in seconds.", example=375.5)
     call_intent: Optional[str] = Field(None, max_length=100, description="The detected intent of the call.", example="New Booking Inquiry")
@@ -27,3 +29,7 @@ class Call(CallBase):
 
     class Config:
         from_attributes = True
+
+
+# Response model for ?fields= projections: every field optional
+CallPartial = partial_model(Call)
@@ -1,22 +1,26 @@
 from pydantic import BaseModel, Field
 from typing import Optional
+from datetime import datetime
 from enum import Enum
 
-# class ConsumptionType(str, Enum):
-#     """Enumeration for the types of service consumption."""
-#     ELEVEN_LABS = "Eleven_labs"
-#     SIP_TRUNKING = "SIP_trunking"
-#     TWILIO = "twilio"
-#     WHATSAPP = "whatsapp_message"
+class ConsumptionType(str, Enum):
+    """Enumeration for the types of service consumption."""
+    ELEVEN_LABS = "Eleven_labs"
+    SIP_TRUNKING = "SIP_trunking"
+    TWILIO = "twilio"
+    WHATSAPP = "whatsapp_message"
+    PAYU_FEE = "payu_fee"
 
 class ConsumptionBase(BaseModel):
     """Base schema for a consumption record."""
     branch_id: int = Field(..., description="Foreign key for the branch where consumption occurred.", example=1)
-    conv_id: str = Field(..., description="The conversation ID associated with this consumption.", example="conv_a1b2c3d4e5")
+    conv_id: Optional[str] = Field(None, description="The conversation ID associated with this consumption, if any.", example="conv_a1b2c3d4e5")
     follow_up_id: Optional[int] = Field(None, description="Foreign key for the follow-up associated with this consumption, if any.", example=51)
     consumption_type: str = Field(..., description="The type of service that was consumed.", example="ELEVEN_LABS")
     credits_consumed: float = Field(..., ge=0, description="The number of credits consumed.", example=0.75)
     cost_in_rupees: float = Field(..., ge=0, description="The total cost of the consumption in Rupees.", example=5.50)
+    reference: Optional[str] = Field(None, description="Source reference, e.g. the PayU txnid or WhatsApp template.", example="txn_9f8e7d")
+    occurred_at: Optional[datetime] = Field(None, description="When the consumption happened.", example="2025-10-01T10:00:00+00:00")
 
 class ConsumptionCreate(ConsumptionBase):
     """Schema for creating a new consumption record."""
@@ -30,6 +34,7 @@ class ConsumptionUpdate(BaseModel):
     consumption_type: Optional[str] = None
     credits_consumed: Optional[float] = Field(None, ge=0)
     cost_in_rupees: Optional[float] = Field(None, ge=0)
+    reference: Optional[str] = None
 
 
 class Consumption(ConsumptionBase):
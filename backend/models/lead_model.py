@@ -3,6 +3,7 @@ from pydantic import BaseModel, Field, EmailStr, ConfigDict
 from typing import Optional
 from datetime import datetime
 from enum import Enum
+from backend.utils.db_utils import partial_model
 
 # --- Enums for Lead Properties ---
 
@@ -64,3 +65,7 @@ class Lead(LeadBase):
     # This configuration allows the model to be created from database objects
     # and correctly handle the aliases for both input and output.
     model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+
+# Response model for ?fields= projections: every field optional
+LeadPartial = partial_model(Lead)
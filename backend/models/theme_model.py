@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional
+from backend.utils.db_utils import partial_model
 
 class ThemeBase(BaseModel):
     theme_id: str = Field(..., description="Unique identifier for the theme.")
@@ -22,3 +23,7 @@ class ThemeUpdate(BaseModel):
 class Theme(ThemeBase):
     class Config:
         from_attributes = True
+
+
+# Response model for ?fields= projections: every field optional
+ThemePartial = partial_model(Theme)
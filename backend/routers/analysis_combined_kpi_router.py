@@ -1,16 +1,18 @@
 # routers/kpi_router.py
 import enum
-from fastapi import FastAPI, APIRouter, HTTPException, Query, status, Depends
+from fastapi import FastAPI, APIRouter, HTTPException, Header, Query, status, Depends
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import timedelta, datetime
 from backend.config.supabase_client import supabase
 from collections import defaultdict
 from backend.services.dashboard_service import (
+    get_data_version,
     get_lead_funnel,
     get_revenue_summary,
     get_payments_status,
     get_time_bounds
 )
+from backend.utils.response_handlers import FastJSONResponse, cache_headers, etag_matches, make_etag, not_modified
 
 
 router = APIRouter(prefix="/kpis", tags=["KPIs"])
@@ -65,268 +67,316 @@ def get_global_time_filter(
 ) -> Tuple[Optional[str], Optional[str]]:
     return compute_date_range(filter, start_date, end_date)
 
+# ------------------------------------------------------------
+# 🧮 COMBINED KPI COMPUTATION (shared with the live dashboard stream)
+# ------------------------------------------------------------
+KPI_SECTIONS = ("bookings", "leads", "customers", "payments", "llmkpi", "charts")
+
+
+def period_date_range(period: TimePeriod) -> Tuple[Optional[str], Optional[str]]:
+    """Same ranges as compute_date_range, without touching GLOBAL_TIME_FILTER."""
+    today = datetime.utcnow().date()
+    if period == TimePeriod.today:
+        return today.isoformat(), today.isoformat()
+    if period == TimePeriod.last_week:
+        return (today - timedelta(days=7)).isoformat(), today.isoformat()
+    if period == TimePeriod.last_month:
+        return (today - timedelta(days=30)).isoformat(), today.isoformat()
+    return None, None
+
+
+def has_failed_section(payload: Dict[str, Any]) -> bool:
+    return any(
+        isinstance(item, dict) and "error" in item
+        for section in KPI_SECTIONS
+        for item in payload.get(section, [])
+    )
+
+
+def compute_all_kpis(start_time: Optional[str], end_time: Optional[str]) -> Dict[str, Any]:
+    """Every KPI group plus the charts; a failing group is reported inside its section."""
+    # ---------------------- BOOKINGS ----------------------
+    booking_data = []
+    try:
+        resp = supabase.rpc("get_booking_metrics", {
+            "p_start_time": start_time,
+            "p_end_time": end_time
+        }).execute()
+        if resp.data:
+            b = resp.data[0]
+            booking_data = [
+                {"name": "total_bookings", "value": b.get("total_bookings", 0)},
+                {"name": "booking_conversion_rate", "value": b.get("booking_conversion_rate", 0), "unit": "%"},
+                {"name": "avg_booking_value", "value": b.get("avg_booking_value", 0), "unit": "currency"},
+                {"name": "cancellation_rate", "value": b.get("cancellation_rate", 0), "unit": "%"},
+                {"name": "repeat_booking_rate", "value": b.get("repeat_booking_rate", 0), "unit": "%"},
+                {"name": "total_gross_revenue", "value": b.get("total_gross_revenue", 0), "unit": "currency"},
+                {"name": "total_collections", "value": b.get("total_collections", 0), "unit": "currency"},
+            ]
+    except Exception as e:
+        booking_data = [{"error": f"Bookings error: {str(e)}"}]
+
+    # ---------------------- LEADS ----------------------
+    leads_data = []
+    try:
+        resp = supabase.rpc("get_all_lead_kpis", {
+            "p_start_time": start_time,
+            "p_end_time": end_time
+        }).execute()
+        if resp.data:
+            l = resp.data[0]
+            leads_data = [
+                {"name": "total_leads_generated", "value": l.get("total_leads_generated", 0)},
+                {"name": "lead_conversion_rate", "value": l.get("lead_conversion_rate", 0), "unit": "%"},
+                {"name": "avg_lead_response_time", "value": l.get("avg_lead_response_time", 0), "unit": "hours"},
+                {"name": "best_lead_source", "value": l.get("best_lead_source", "N/A")},
+                {"name": "qualified_lead_ratio", "value": l.get("qualified_lead_ratio", 0), "unit": "%"},
+            ]
+    except Exception as e:
+        leads_data = [{"error": f"Leads error: {str(e)}"}]
+
+    # ---------------------- CUSTOMERS ----------------------
+    customers_data = []
+    try:
+        resp = supabase.rpc("get_all_cust_kpis", {
+            "p_start_time": start_time,
+            "p_end_time": end_time
+        }).execute()
+        if resp.data:
+            c = resp.data[0]
+            customers_data = [
+                {"name": "total_customers", "value": c.get("total_customers", 0)},
+                {"name": "new_customers", "value": c.get("new_customers", 0)},
+                {"name": "avg_spend_per_customer", "value": c.get("avg_spend_per_customer", 0), "unit": "currency"},
+                {"name": "customer_conversion_rate", "value": c.get("customer_conversion_rate", 0), "unit": "%"},
+            ]
+    except Exception as e:
+        customers_data = [{"error": f"Customers error: {str(e)}"}]
+
+    # ---------------------- PAYMENTS ----------------------
+    payments_data = []
+    try:
+        resp = supabase.rpc("get_all_payment_kpis", {
+            "p_start_time": start_time,
+            "p_end_time": end_time
+        }).execute()
+        if resp.data:
+            p = resp.data[0]
+            payments_data = [
+                {"name": "total_revenue_collected", "value": p.get("total_revenue_collected", 0), "unit": "currency"},
+                {"name": "outstanding_payments", "value": p.get("outstanding_payments", 0), "unit": "currency"},
+                {"name": "avg_payment_value", "value": p.get("avg_payment_value", 0), "unit": "currency"},
+                {"name": "revenue_growth_rate", "value": p.get("revenue_growth_rate", 0), "unit": "%"},
+                {"name": "refund_chargeback_rate", "value": p.get("refund_chargeback_rate", 0), "unit": "%"},
+            ]
+    except Exception as e:
+        payments_data = [{"error": f"Payments error: {str(e)}"}]
+
+    # ---------------------- LLM KPI ----------------------
+    llm_kpis = []
+    try:
+        resp = supabase.rpc(
+            "get_llm_kpis",
+            {
+                "p_start_time": start_time,
+                "p_end_time": end_time
+            }
+        ).execute()
+
+        if resp.data:
+            d = resp.data[0]
+            llm_kpis = [
+                {"name": "AI Detection Rate", "value": d.get("ai_detection_rate", 0)},
+                {"name": "Human Agent Involvement Rate", "value": d.get("human_agent_involvement_rate", 0)},
+                {"name": "Out-of-Scope Rate", "value": d.get("out_of_scope_rate", 0)},
+                {"name": "AI Success Rate", "value": d.get("ai_success_rate", 0)},
+            ]
+        else:
+            llm_kpis = []  # empty if no data in that range
+
+    except Exception as e:
+        llm_kpis = [{"error": f"LLM KPI error: {str(e)}"}]
+
+    # ---------------------- CHARTS ----------------------
+    charts = []
+    try:
+        call_query = supabase.table("call").select("conv_id, date_time")
+        if start_time and end_time:
+            call_query = call_query.gte("date_time", start_time).lte("date_time", end_time)
+        call_resp = call_query.execute()
+        call_data = call_resp.data or []
+        conv_ids = [r["conv_id"] for r in call_data]
+
+        if conv_ids:
+            resp = supabase.table("call_analysis").select("*").in_("conv_id", conv_ids).execute()
+            data = resp.data or []
+            call_map = {r["conv_id"]: r.get("date_time") for r in call_data}
+
+            records = [{**r, "date_time": call_map.get(r["conv_id"])} for r in data if r.get("conv_id") in call_map]
+
+            # Chart 1: Volume
+            vol = defaultdict(int)
+            for r in records:
+                if r.get("date_time"):
+                    vol[r["date_time"].split("T")[0]] += 1
+            chart1 = {"title": "Analysis Volume Over Time", "x_axis": list(vol.keys()), "y_axis": list(vol.values()), "chart_type": "line"}
+
+            # Chart 2: Sentiment
+            sent = defaultdict(list)
+            for r in records:
+                reason = r.get("failed_conversion_reason")
+                if reason:
+                    try:
+                        sent[reason].append(float(r.get("sentiment_score") or 0))
+                    except:
+                        continue
+            avg_sent = {k: round(sum(v) / len(v), 3) for k, v in sent.items() if v}
+            chart2 = {"title": "Average Sentiment by Failed Conversion Reason", "x_axis": list(avg_sent.keys()), "y_axis": list(avg_sent.values()), "chart_type": "bar"}
+
+            # Chart 3: AI Trend
+            ai_by_week = defaultdict(lambda: {"ai": 0, "total": 0})
+            for r in records:
+                if r.get("date_time"):
+                    dt = datetime.fromisoformat(r["date_time"].split("T")[0])
+                    week = dt.strftime("%Y-%W")
+                    ai_by_week[week]["total"] += 1
+                    if r.get("ai_detect_flag"):
+                        ai_by_week[week]["ai"] += 1
+            ai_trend = {w: round((v["ai"] / v["total"]) * 100, 2) for w, v in ai_by_week.items() if v["total"]}
+            chart3 = {"title": "AI Detection Trend Over Time", "x_axis": list(ai_trend.keys()), "y_axis": list(ai_trend.values()), "chart_type": "line"}
+
+            # -------------------
+            # Chart 4: Revenue Summary
+            # -------------------
+            try:
+                query = supabase.table("bookings").select("total_net, total_paid, start_time")
+                if start_time and end_time:
+                    query = query.gte("start_time", start_time).lte("start_time", end_time)
+                rows = query.execute().data or []
+
+                if rows:
+                    total_revenue = sum(float(r.get("total_net") or 0) for r in rows)
+                    total_received = sum(float(r.get("total_paid") or 0) for r in rows)
+                    total_dues = total_revenue - total_received
+                    revenue_data = {
+                        "labels": ["Total Revenue", "Total Received", "Outstanding Dues"],
+                        "values": [total_revenue, total_received, total_dues]
+                    }
+                else:
+                    revenue_data = {"labels": [], "values": []}
+
+                chart4 = {
+                    "title": "Revenue Summary",
+                    "data": revenue_data,
+                    "chart_type": "bar"
+                }
+            except Exception as e:
+                chart4 = {"error": f"Revenue Summary error: {str(e)}"}
+
+            # -------------------
+            # Chart 5: Payments Status Breakdown
+            # -------------------
+            try:
+                query = supabase.table("payment").select("payment_status, payment_amount, creation_time")
+                if start_time and end_time:
+                    query = query.gte("creation_time", start_time).lte("creation_time", end_time)
+                payments = query.execute().data or []
+
+                totals = defaultdict(float)
+                for p in payments:
+                    status = (p.get("payment_status") or "").capitalize() or "Unknown"
+                    totals[status] += float(p.get("payment_amount") or 0)
+
+                payments_data = {
+                    "labels": list(totals.keys()),
+                    "values": list(totals.values())
+                } if totals else {"labels": [], "values": []}
+
+                chart5 = {
+                    "title": "Payments Status Breakdown",
+                    "data": payments_data,
+                    "chart_type": "pie"
+                }
+            except Exception as e:
+                chart5 = {"error": f"Payments Status error: {str(e)}"}
+
+            # -------------------
+            # Chart 6: Lead Conversion Funnel
+            # -------------------
+            try:
+                query = supabase.table("leads").select("status, created_at")
+                if start_time and end_time:
+                    query = query.gte("created_at", start_time).lte("created_at", end_time)
+                leads = query.execute().data or []
+
+                funnel = defaultdict(int)
+                for lead in leads:
+                    status = lead.get("status")
+                    if status:
+                        funnel[status] += 1
+
+                funnel_data = {
+                    "labels": list(funnel.keys()),
+                    "values": list(funnel.values())
+                } if funnel else {"labels": [], "values": []}
+
+                chart6 = {
+                    "title": "Lead Conversion Funnel",
+                    "data": funnel_data,
+                    "chart_type": "funnel"
+                }
+            except Exception as e:
+                chart6 = {"error": f"Lead Funnel error: {str(e)}"}
+
+            # Combine all charts
+            charts = [chart1, chart2, chart3, chart4, chart5, chart6]
+    
+
+    
+    except Exception as e:
+        charts = [{"error": f"Charts error: {str(e)}"}]
+    
+
+    # ---------------------- FINAL COMBINED RESPONSE ----------------------
+    payload = {
+        "filters": {"start_time": start_time, "end_time": end_time},
+        "bookings": booking_data,
+        "leads": leads_data,
+        "customers": customers_data,
+        "payments": payments_data,
+        "llmkpi": llm_kpis,
+        "charts": charts
+    }
+    return payload
+
+
 # ------------------------------------------------------------
 # ✅ SINGLE COMBINED ENDPOINT
 # ------------------------------------------------------------
 @router.get("/all")
-async def get_all_kpis(
-    date_range: Tuple[Optional[str], Optional[str]] = Depends(get_global_time_filter)
+def get_all_kpis(
+    date_range: Tuple[Optional[str], Optional[str]] = Depends(get_global_time_filter),
+    if_none_match: Optional[str] = Header(None),
 ):
+    """
+    All KPI groups and charts in one payload. Sends an ETag over the resolved
+    date range and the data version; a matching If-None-Match gets a 304
+    without recomputing anything. This is also the mounted source of the
+    charts (analysis_router2's /kpis/charts is an optional router).
+
+    A plain `def`: the data version lookup and the KPI queries are blocking
+    Supabase calls, so FastAPI runs this in its thread pool.
+    """
     start_time, end_time = date_range
 
     try:
-        # ---------------------- BOOKINGS ----------------------
-        booking_data = []
-        try:
-            resp = supabase.rpc("get_booking_metrics", {
-                "p_start_time": start_time,
-                "p_end_time": end_time
-            }).execute()
-            if resp.data:
-                b = resp.data[0]
-                booking_data = [
-                    {"name": "total_bookings", "value": b.get("total_bookings", 0)},
-                    {"name": "booking_conversion_rate", "value": b.get("booking_conversion_rate", 0), "unit": "%"},
-                    {"name": "avg_booking_value", "value": b.get("avg_booking_value", 0), "unit": "currency"},
-                    {"name": "cancellation_rate", "value": b.get("cancellation_rate", 0), "unit": "%"},
-                    {"name": "repeat_booking_rate", "value": b.get("repeat_booking_rate", 0), "unit": "%"},
-                    {"name": "total_gross_revenue", "value": b.get("total_gross_revenue", 0), "unit": "currency"},
-                    {"name": "total_collections", "value": b.get("total_collections", 0), "unit": "currency"},
-                ]
-        except Exception as e:
-            booking_data = [{"error": f"Bookings error: {str(e)}"}]
-
-        # ---------------------- LEADS ----------------------
-        leads_data = []
-        try:
-            resp = supabase.rpc("get_all_lead_kpis", {
-                "p_start_time": start_time,
-                "p_end_time": end_time
-            }).execute()
-            if resp.data:
-                l = resp.data[0]
-                leads_data = [
-                    {"name": "total_leads_generated", "value": l.get("total_leads_generated", 0)},
-                    {"name": "lead_conversion_rate", "value": l.get("lead_conversion_rate", 0), "unit": "%"},
-                    {"name": "avg_lead_response_time", "value": l.get("avg_lead_response_time", 0), "unit": "hours"},
-                    {"name": "best_lead_source", "value": l.get("best_lead_source", "N/A")},
-                    {"name": "qualified_lead_ratio", "value": l.get("qualified_lead_ratio", 0), "unit": "%"},
-                ]
-        except Exception as e:
-            leads_data = [{"error": f"Leads error: {str(e)}"}]
-
-        # ---------------------- CUSTOMERS ----------------------
-        customers_data = []
-        try:
-            resp = supabase.rpc("get_all_cust_kpis", {
-                "p_start_time": start_time,
-                "p_end_time": end_time
-            }).execute()
-            if resp.data:
-                c = resp.data[0]
-                customers_data = [
-                    {"name": "total_customers", "value": c.get("total_customers", 0)},
-                    {"name": "new_customers", "value": c.get("new_customers", 0)},
-                    {"name": "avg_spend_per_customer", "value": c.get("avg_spend_per_customer", 0), "unit": "currency"},
-                    {"name": "customer_conversion_rate", "value": c.get("customer_conversion_rate", 0), "unit": "%"},
-                ]
-        except Exception as e:
-            customers_data = [{"error": f"Customers error: {str(e)}"}]
-
-        # ---------------------- PAYMENTS ----------------------
-        payments_data = []
-        try:
-            resp = supabase.rpc("get_all_payment_kpis", {
-                "p_start_time": start_time,
-                "p_end_time": end_time
-            }).execute()
-            if resp.data:
-                p = resp.data[0]
-                payments_data = [
-                    {"name": "total_revenue_collected", "value": p.get("total_revenue_collected", 0), "unit": "currency"},
-                    {"name": "outstanding_payments", "value": p.get("outstanding_payments", 0), "unit": "currency"},
-                    {"name": "avg_payment_value", "value": p.get("avg_payment_value", 0), "unit": "currency"},
-                    {"name": "revenue_growth_rate", "value": p.get("revenue_growth_rate", 0), "unit": "%"},
-                    {"name": "refund_chargeback_rate", "value": p.get("refund_chargeback_rate", 0), "unit": "%"},
-                ]
-        except Exception as e:
-            payments_data = [{"error": f"Payments error: {str(e)}"}]
-
-        # ---------------------- LLM KPI ----------------------
-        llm_kpis = []
-        try:
-            resp = supabase.rpc(
-                "get_llm_kpis",
-                {
-                    "p_start_time": start_time,
-                    "p_end_time": end_time
-                }
-            ).execute()
-
-            if resp.data:
-                d = resp.data[0]
-                llm_kpis = [
-                    {"name": "AI Detection Rate", "value": d.get("ai_detection_rate", 0)},
-                    {"name": "Human Agent Involvement Rate", "value": d.get("human_agent_involvement_rate", 0)},
-                    {"name": "Out-of-Scope Rate", "value": d.get("out_of_scope_rate", 0)},
-                    {"name": "AI Success Rate", "value": d.get("ai_success_rate", 0)},
-                ]
-            else:
-                llm_kpis = []  # empty if no data in that range
-
-        except Exception as e:
-            llm_kpis = [{"error": f"LLM KPI error: {str(e)}"}]
-
-        # ---------------------- CHARTS ----------------------
-        charts = []
-        try:
-            call_query = supabase.table("call").select("conv_id, date_time")
-            if start_time and end_time:
-                call_query = call_query.gte("date_time", start_time).lte("date_time", end_time)
-            call_resp = call_query.execute()
-            call_data = call_resp.data or []
-            conv_ids = [r["conv_id"] for r in call_data]
-
-            if conv_ids:
-                resp = supabase.table("call_analysis").select("*").in_("conv_id", conv_ids).execute()
-                data = resp.data or []
-                call_map = {r["conv_id"]: r.get("date_time") for r in call_data}
-
-                records = [{**r, "date_time": call_map.get(r["conv_id"])} for r in data if r.get("conv_id") in call_map]
-
-                # Chart 1: Volume
-                vol = defaultdict(int)
-                for r in records:
-                    if r.get("date_time"):
-                        vol[r["date_time"].split("T")[0]] += 1
-                chart1 = {"title": "Analysis Volume Over Time", "x_axis": list(vol.keys()), "y_axis": list(vol.values()), "chart_type": "line"}
-
-                # Chart 2: Sentiment
-                sent = defaultdict(list)
-                for r in records:
-                    reason = r.get("failed_conversion_reason")
-                    if reason:
-                        try:
-                            sent[reason].append(float(r.get("sentiment_score") or 0))
-                        except:
-                            continue
-                avg_sent = {k: round(sum(v) / len(v), 3) for k, v in sent.items() if v}
-                chart2 = {"title": "Average Sentiment by Failed Conversion Reason", "x_axis": list(avg_sent.keys()), "y_axis": list(avg_sent.values()), "chart_type": "bar"}
-
-                # Chart 3: AI Trend
-                ai_by_week = defaultdict(lambda: {"ai": 0, "total": 0})
-                for r in records:
-                    if r.get("date_time"):
-                        dt = datetime.fromisoformat(r["date_time"].split("T")[0])
-                        week = dt.strftime("%Y-%W")
-                        ai_by_week[week]["total"] += 1
-                        if r.get("ai_detect_flag"):
-                            ai_by_week[week]["ai"] += 1
-                ai_trend = {w: round((v["ai"] / v["total"]) * 100, 2) for w, v in ai_by_week.items() if v["total"]}
-                chart3 = {"title": "AI Detection Trend Over Time", "x_axis": list(ai_trend.keys()), "y_axis": list(ai_trend.values()), "chart_type": "line"}
-
-                # -------------------
-                # Chart 4: Revenue Summary
-                # -------------------
-                try:
-                    query = supabase.table("bookings").select("total_net, total_paid, start_time")
-                    if start_time and end_time:
-                        query = query.gte("start_time", start_time).lte("start_time", end_time)
-                    rows = query.execute().data or []
-
-                    if rows:
-                        total_revenue = sum(float(r.get("total_net") or 0) for r in rows)
-                        total_received = sum(float(r.get("total_paid") or 0) for r in rows)
-                        total_dues = total_revenue - total_received
-                        revenue_data = {
-                            "labels": ["Total Revenue", "Total Received", "Outstanding Dues"],
-                            "values": [total_revenue, total_received, total_dues]
-                        }
-                    else:
-                        revenue_data = {"labels": [], "values": []}
-
-                    chart4 = {
-                        "title": "Revenue Summary",
-                        "data": revenue_data,
-                        "chart_type": "bar"
-                    }
-                except Exception as e:
-                    chart4 = {"error": f"Revenue Summary error: {str(e)}"}
-
-                # -------------------
-                # Chart 5: Payments Status Breakdown
-                # -------------------
-                try:
-                    query = supabase.table("payment").select("payment_status, payment_amount, creation_time")
-                    if start_time and end_time:
-                        query = query.gte("creation_time", start_time).lte("creation_time", end_time)
-                    payments = query.execute().data or []
-
-                    totals = defaultdict(float)
-                    for p in payments:
-                        status = (p.get("payment_status") or "").capitalize() or "Unknown"
-                        totals[status] += float(p.get("payment_amount") or 0)
-
-                    payments_data = {
-                        "labels": list(totals.keys()),
-                        "values": list(totals.values())
-                    } if totals else {"labels": [], "values": []}
-
-                    chart5 = {
-                        "title": "Payments Status Breakdown",
-                        "data": payments_data,
-                        "chart_type": "pie"
-                    }
-                except Exception as e:
-                    chart5 = {"error": f"Payments Status error: {str(e)}"}
-
-                # -------------------
-                # Chart 6: Lead Conversion Funnel
-                # -------------------
-                try:
-                    query = supabase.table("leads").select("status, created_at")
-                    if start_time and end_time:
-                        query = query.gte("created_at", start_time).lte("created_at", end_time)
-                    leads = query.execute().data or []
-
-                    funnel = defaultdict(int)
-                    for lead in leads:
-                        status = lead.get("status")
-                        if status:
-                            funnel[status] += 1
-
-                    funnel_data = {
-                        "labels": list(funnel.keys()),
-                        "values": list(funnel.values())
-                    } if funnel else {"labels": [], "values": []}
-
-                    chart6 = {
-                        "title": "Lead Conversion Funnel",
-                        "data": funnel_data,
-                        "chart_type": "funnel"
-                    }
-                except Exception as e:
-                    chart6 = {"error": f"Lead Funnel error: {str(e)}"}
-
-                # Combine all charts
-                charts = [chart1, chart2, chart3, chart4, chart5, chart6]
-        
-
-        
-        except Exception as e:
-            charts = [{"error": f"Charts error: {str(e)}"}]
-        
-
-        # ---------------------- FINAL COMBINED RESPONSE ----------------------
-        return {
-            "filters": {"start_time": start_time, "end_time": end_time},
-            "bookings": booking_data,
-            "leads": leads_data,
-            "customers": customers_data,
-            "payments": payments_data,
-            "llmkpi": llm_kpis,
-            "charts": charts
-        }
+        etag = make_etag("kpis_all", start_time, end_time, get_data_version())
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        payload = compute_all_kpis(start_time, end_time)
+        # A section that failed must not be revalidated as current, so no ETag then
+        return FastJSONResponse(payload, headers=None if has_failed_section(payload) else cache_headers(etag))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching all KPIs: {str(e)}")
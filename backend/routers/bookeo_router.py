@@ -8,6 +8,9 @@ import time
 from datetime import datetime, timedelta,timezone
 from backend.config.payu_client import PaymentLinkRequest
 from backend.config.supabase_client import supabase
+from backend.config.reminder_scheduler import reminder_scheduler
+from backend.services.live_dashboard_service import notify_data_changed
+from backend.utils.phone import normalize_phones
 
 # Assume your BookeoAPI class and helper functions are importable
 from backend.config.bookeo import BookeoAPI, create_customer_data, create_participants_data, create_payment_data
@@ -432,6 +435,9 @@ def refresh_customers(bookeo: BookeoAPI = Depends(BookeoAPI)):
             customers_to_upsert.append(row)
 
         if customers_to_upsert:
+            phones = normalize_phones([row["phone_number"] for row in customers_to_upsert])
+            for row, phone in zip(customers_to_upsert, phones):
+                row["phone_number"] = phone or None
             upsert_resp = supabase.table("customers") \
                 .upsert(customers_to_upsert, on_conflict="customer_id") \
                 .execute()
@@ -447,6 +453,7 @@ def refresh_customers(bookeo: BookeoAPI = Depends(BookeoAPI)):
             break
         page_token = token
 
+    notify_data_changed("customers")
     return {"status": "completed", "detail": f"Synced all pages.{len(customers_to_upsert)}"}
 
 def format_iso_for_api(dt: datetime) -> str:
@@ -563,6 +570,8 @@ def refresh_bookings(bookeo: BookeoAPI = Depends(get_bookeo_client)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Supabase upsert failed: {e}")
 # 
+    reminder_scheduler.sync_bookings(formatted_bookings)
+    notify_data_changed("bookings")
     return {"status": "completed", "synced": len(formatted_bookings)}
 
 
@@ -681,4 +690,6 @@ def refresh_payments(
             break
         page_token = token
 
+    if total_synced:
+        notify_data_changed("payment")
     return {"status": "completed", "total_synced": total_synced}
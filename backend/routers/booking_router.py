@@ -1,9 +1,11 @@
 from fastapi import APIRouter, HTTPException, status, Query
-from typing import List
+from typing import List, Optional
 from postgrest import APIError
 
 from backend.services import booking_service
-from backend.models.booking_model import Booking, BookingCreate, BookingUpdate
+from backend.models.booking_model import Booking, BookingCreate, BookingPartial, BookingUpdate
+from backend.utils.db_utils import InvalidCursor, InvalidFields, NEXT_CURSOR_HEADER, parse_fields
+from backend.utils.response_handlers import FastJSONResponse
 
 router = APIRouter(
     prefix="/bookings",
@@ -17,12 +19,25 @@ def create_new_booking(booking_data: BookingCreate):
     except APIError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message)
 
-@router.get("/", response_model=List[Booking])
-def read_all_bookings(skip: int = 0, limit: int = Query(default=100, lte=200)):
+@router.get("/", response_model=List[BookingPartial], response_model_exclude_unset=True)
+def read_all_bookings(
+    skip: int = 0,
+    limit: int = Query(default=100, lte=200),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page."),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. booking_id,start_time,status."),
+):
     try:
-        return booking_service.get_all_bookings(skip=skip, limit=limit)
+        columns = parse_fields(Booking, fields, required=("creation_time", "booking_id"))
+        if skip:
+            # Legacy offset paging
+            return FastJSONResponse(booking_service.get_all_bookings(skip=skip, limit=limit, fields=columns))
+        bookings, next_cursor = booking_service.get_bookings_page(limit=limit, cursor=cursor, fields=columns)
+    except (InvalidCursor, InvalidFields) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except APIError as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message)
+    # Rows come straight from the DB: serialize without a second response_model pass
+    return FastJSONResponse(bookings, headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
 
 @router.get("/customer/{customer_id}", response_model=List[Booking])
 def read_bookings_for_customer(customer_id: str):
@@ -31,9 +46,16 @@ def read_bookings_for_customer(customer_id: str):
     except APIError as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message)
 
-@router.get("/{booking_id}", response_model=Booking)
-def read_booking_by_id(booking_id: str):
-    booking = booking_service.get_booking_by_id(booking_id)
+@router.get("/{booking_id}", response_model=BookingPartial, response_model_exclude_unset=True)
+def read_booking_by_id(
+    booking_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. booking_id,start_time,status."),
+):
+    try:
+        columns = parse_fields(Booking, fields)
+    except InvalidFields as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    booking = booking_service.get_booking_by_id(booking_id, fields=columns)
     if not booking:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Booking not found")
     return booking
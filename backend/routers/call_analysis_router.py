@@ -1,9 +1,11 @@
 from fastapi import APIRouter, HTTPException, Request, status
+from itertools import chain
 from typing import List
 from postgrest import APIError
 
 from backend.services import call_analysis_service
 from backend.models.call_analysis_model import CallAnalysis, CallAnalysisCreate, CallAnalysisUpdate
+from backend.utils.response_handlers import stream_json_array
 
 import json
 
@@ -40,11 +42,14 @@ router = APIRouter(
 
 @router.get("/", response_model=List[CallAnalysis])
 def read_all_call_analyses():
-    """Retrieve all call analysis records."""
+    """Retrieve all call analysis records, streamed as a JSON array one DB page at a time."""
+    rows = call_analysis_service.iter_call_analyses()
     try:
-        return call_analysis_service.get_all_call_analyses()
+        # Pull the first page now so DB errors still map to a 500
+        first = next(rows, None)
     except APIError as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message)
+    return stream_json_array(chain([first], rows) if first is not None else [])
 
 # @router.get("/{analysis_id}", response_model=CallAnalysis)
 # def read_call_analysis_by_id(analysis_id: int):
@@ -1,9 +1,13 @@
 from fastapi import APIRouter, HTTPException, status, Query
-from typing import List
+from typing import List, Optional
+from datetime import date, timedelta
 from postgrest import APIError
 
-from backend.services import call_service
-from backend.models.call_model import Call, CallCreate, CallUpdate
+from backend.services import call_search_service, call_service
+from backend.services.transcript_store import TranscriptMissing
+from backend.models.call_model import Call, CallCreate, CallPartial, CallUpdate
+from backend.utils.db_utils import InvalidCursor, InvalidFields, NEXT_CURSOR_HEADER, parse_fields
+from backend.utils.response_handlers import FastJSONResponse
 
 router = APIRouter(
     prefix="/calls",
@@ -18,13 +22,64 @@ router = APIRouter(
 #     except APIError as e:
 #         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message)
 
-@router.get("/", response_model=List[Call])
-def read_all_calls(skip: int = 0, limit: int = Query(default=100, lte=200)):
-    """Retrieve all call records."""
+@router.get("/", response_model=List[CallPartial], response_model_exclude_unset=True)
+def read_all_calls(
+    skip: int = 0,
+    limit: int = Query(default=100, lte=200),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page."),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. conv_id,date_time,call_intent."),
+):
+    """Retrieve call records, newest first. Pass the X-Next-Cursor header back as `cursor` for the next page."""
     try:
-        return call_service.get_all_calls(skip=skip, limit=limit)
+        columns = parse_fields(Call, fields, required=("date_time", "conv_id"))
+        if skip:
+            # Legacy offset paging
+            return FastJSONResponse(call_service.get_all_calls(skip=skip, limit=limit, fields=columns))
+        calls, next_cursor = call_service.get_calls_page(limit=limit, cursor=cursor, fields=columns)
+    except (InvalidCursor, InvalidFields) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except APIError as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message)
+    # Rows come straight from the DB: serialize without a second response_model pass
+    return FastJSONResponse(calls, headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
+
+@router.get("/search")
+def search_calls(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to look for in call transcripts and summaries."),
+    start_date: Optional[date] = Query(None, description="Only calls on or after this date (YYYY-MM-DD)."),
+    end_date: Optional[date] = Query(None, description="Only calls on or before this date (YYYY-MM-DD)."),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    """Full-text search over calls, best match first. Summary matches rank above transcript matches."""
+    start = start_date.isoformat() if start_date else None
+    end = (end_date + timedelta(days=1)).isoformat() if end_date else None
+    try:
+        results, has_more = call_search_service.search_calls(q, start=start, end=end, limit=limit, offset=offset)
+    except APIError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message)
+    return FastJSONResponse({
+        "query": q,
+        "results": results,
+        "next_offset": offset + limit if has_more else None,
+    })
+
+@router.get("/{conv_id}/transcript")
+def read_call_transcript(conv_id: str):
+    """Retrieve the full transcript of one call (kept out of the call listings)."""
+    try:
+        transcript = call_service.get_call_transcript(conv_id)
+    except APIError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message)
+    except TranscriptMissing as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    if transcript is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Call not found")
+    # A call's transcript never changes once written; an empty one may still be backfilled
+    return FastJSONResponse(
+        {"conv_id": conv_id, "transcript": transcript},
+        headers={"Cache-Control": "private, max-age=86400" if transcript else "no-cache"},
+    )
 
 # @router.get("/conversation/{conv_id}", response_model=Call)
 # def read_call_by_conv_id(conv_id: str):
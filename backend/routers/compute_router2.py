@@ -50,7 +50,8 @@ def compute_kpis(
         start, end = get_date_range(filter, start_date, end_date)
 
         # Step 2️⃣ Base queries
-        calls_query = supabase.table("call").select("*")
+        # Only the columns used below; transcripts live in the transcript store
+        calls_query = supabase.table("call").select("conv_id, date_time, duration, transcript_chars")
         bookings_query = supabase.table("bookings").select("*")
 
         # Step 3️⃣ Apply date filters to call and bookings (if applicable)
@@ -107,7 +108,7 @@ def compute_kpis(
         call_abandon_rate = safe_divide(len(abandoned_calls), total_analysis)
 
         # 5️⃣ Missed Calls
-        missed_calls = [c for c in calls if (c.get("duration", 0) == 0 or not c.get("transcript"))]
+        missed_calls = [c for c in calls if (c.get("duration", 0) == 0 or not c.get("transcript_chars"))]
         missed_call_count = len(missed_calls)
 
         # 6️⃣ Customer Conversion Rate
@@ -0,0 +1,33 @@
+from datetime import UTC, date, datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from backend.services.consumption_ledger import get_cost_summary
+from backend.utils.response_handlers import FastJSONResponse
+
+router = APIRouter(
+    prefix="/costs",
+    tags=["Costs"]
+)
+
+
+@router.get("/summary")
+def cost_summary(
+    start_date: Optional[date] = Query(None, description="First day (inclusive); defaults to 30 days before end_date."),
+    end_date: Optional[date] = Query(None, description="Last day (inclusive); defaults to today (UTC)."),
+    branch_id: Optional[int] = Query(None, description="Only this branch; all branches if omitted."),
+):
+    """
+    Spend on calls, WhatsApp messages and PayU fees for a date range, with
+    cost per call and cost per booking. Served from per-day totals kept by the
+    consumption ledger, not from the raw entries.
+    """
+    end = end_date or datetime.now(UTC).date()
+    start = start_date or end - timedelta(days=30)
+    if start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start_date must not be after end_date")
+    try:
+        return FastJSONResponse(get_cost_summary(start, end, branch_id))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error building cost summary: {str(e)}")
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Query
+from typing import List, Optional
 from backend.services import customer_service
 from backend.models.customer_model import Customer, CustomerCreate, CustomerUpdate
+from backend.utils.db_utils import InvalidCursor
+from backend.utils.response_handlers import FastJSONResponse
 
 router = APIRouter(prefix="/customers", tags=["Customers"])
 
@@ -18,6 +20,22 @@ def read_all_customers(skip: int = 0, limit: int = 100):
     customers = customer_service.get_all_customers(skip=skip, limit=limit)
     return customers
 
+@router.get("/page-data")
+def read_customers_page_data(
+    limit: int = Query(100, ge=1, le=500, description="Rows per list."),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous response."),
+):
+    """
+    Customers, leads and events for the customers page in one response,
+    already joined: customers carry `event_ids`, `event_count` and `lead_id`,
+    events carry `customer_name`, leads carry `customer_id`.
+    """
+    try:
+        page = customer_service.get_customers_page_data(limit=limit, cursor=cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return FastJSONResponse(page)
+
 @router.get("/{customer_id}", response_model=Customer)
 def read_customer_by_id(customer_id: str):
     customer = customer_service.get_customer_by_id(customer_id)
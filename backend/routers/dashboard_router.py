@@ -1,18 +1,40 @@
+import asyncio
 from enum import Enum
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from datetime import datetime, timedelta
 from typing import Optional, Tuple, Dict, Any
 from enum import Enum
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Header
 from backend.config.supabase_client import supabase
 from backend.services.dashboard_service import (
     TimePeriod,
+    get_data_version,
     get_overview,
     get_time_bounds
 )
+from backend.services.live_dashboard_service import live_dashboard
+from backend.routers.analysis_combined_kpi_router import compute_all_kpis, period_date_range
+from backend.utils.response_handlers import (
+    SSE_HEADERS,
+    SSE_KEEPALIVE,
+    FastJSONResponse,
+    cache_headers,
+    etag_matches,
+    make_etag,
+    not_modified,
+    sse_event,
+)
 
 router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
 
+# Sections of the shared live snapshot: the overview and the /kpis/all payload
+live_dashboard.register("overview", get_overview)
+live_dashboard.register("kpis", lambda period: compute_all_kpis(*period_date_range(period)))
+
+# Comment frames keep idle streams open through proxies
+STREAM_KEEPALIVE_SECONDS = 15
+
 class DateRange(str, Enum):
     today = "today"
     last_week = "last_week"
@@ -111,20 +133,76 @@ def tr_param(param: DateRange = Query(default=DateRange.all_time)) -> str:
 # 6️⃣ ROUTER ENDPOINT WITH DROPDOWN FILTER
 # ------------------------------------------------------------
 @router.get("/overview", response_model=Dict[str, Any])
-async def get_dashboard_overview(
-    filter: TimePeriod = Query(default=TimePeriod.all_time, description="Select time filter: today, last_week, last_month, all_time")
+def get_dashboard_overview(
+    filter: TimePeriod = Query(default=TimePeriod.all_time, description="Select time filter: today, last_week, last_month, all_time"),
+    if_none_match: Optional[str] = Header(None),
 ):
-    """Dashboard Overview with dropdown filter support."""
+    """
+    Dashboard Overview with dropdown filter support.
+    Sends an ETag; a matching If-None-Match gets a 304 without running the KPI queries.
+    A plain `def` so the blocking version lookup and KPI queries run in the thread pool.
+    """
     start_time, end_time = get_time_bounds(filter)
 
     try:
+        # start_time is day-aligned, so a new day yields a new tag for rolling windows
+        etag = make_etag("overview", filter.value, start_time, get_data_version())
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
         overview_data = get_overview(filter)
 
-        return {
-            "filters": {"filter": filter, "start_time": start_time, "end_time": end_time},
-            "overview": overview_data
-        }
+        return FastJSONResponse(
+            {
+                "filters": {"filter": filter, "start_time": start_time, "end_time": end_time},
+                "overview": overview_data
+            },
+            headers=cache_headers(etag),
+        )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching dashboard overview: {str(e)}")
 
+
+# ------------------------------------------------------------
+# 7️⃣ LIVE UPDATES (SERVER-SENT EVENTS)
+# ------------------------------------------------------------
+@router.get("/stream")
+async def stream_dashboard(
+    request: Request,
+    filter: TimePeriod = Query(default=TimePeriod.all_time, description="Select time filter: today, last_week, last_month, all_time"),
+):
+    """
+    Server-sent events for live dashboards. The first event ("snapshot") has
+    the overview and the /kpis/all payload; after that, "delta" events carry
+    only the changed sections whenever the underlying data changes. All
+    clients on the same filter share one computation.
+    """
+    subscriber = live_dashboard.subscribe(filter)
+    try:
+        version, snapshot = await live_dashboard.snapshot(filter)
+    except Exception as e:
+        live_dashboard.unsubscribe(subscriber)
+        raise HTTPException(status_code=500, detail=f"Error building dashboard snapshot: {str(e)}")
+
+    async def events():
+        sent_version = version
+        try:
+            yield sse_event("snapshot", snapshot, version)
+            while True:
+                try:
+                    name, event_version, data = await asyncio.wait_for(subscriber.queue.get(), timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield SSE_KEEPALIVE
+                    continue
+                # Deltas queued while the first snapshot was being sent are already in it
+                if name == "delta" and event_version <= sent_version:
+                    continue
+                sent_version = event_version
+                yield sse_event(name, data, event_version)
+        finally:
+            live_dashboard.unsubscribe(subscriber)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -22,9 +22,10 @@ Usage:
 import asyncio
 from datetime import UTC, datetime
 from enum import Enum
-from io import BytesIO
 import json
+import logging
 from fastapi import APIRouter, Depends, HTTPException, Request, status, Query, Body, UploadFile, File
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, field_validator
 from typing import Any, Dict, Optional, List
 import os
@@ -35,21 +36,46 @@ from hashlib import sha256
 import requests
 from backend.config.eleven_labs import ElevenLabsClient, ElevenLabsError
 from backend.config.supabase_client import supabase
+from backend.utils.auth import verify_elevenlabs_webhook
+from backend.utils.structured_logging import log_event
+from backend.utils.response_handlers import SSE_HEADERS, SSE_KEEPALIVE, sse_event
+from backend.utils.upload_spool import UploadTooLarge, check_declared_size, spool_request_body, spool_upload
+from backend.services.live_dashboard_service import notify_data_changed
+from backend.services.call_ingest_service import build_call_analysis_row, build_call_row, extract_call_analysis
+from backend.services.call_search_service import index_call
+from backend.services.consumption_ledger import consumption_ledger
+from backend.services import elevenlabs_cache
+from backend.services.rag_index_jobs import RAG_BATCH_MAX_DOCUMENTS, rag_index_jobs
 # Initialize router
 
 router = APIRouter(prefix="/ElevenLabs")
 
+logger = logging.getLogger(__name__)
+
+# Fraction of routine (INFO) webhook events that are logged; errors are always logged
+WEBHOOK_LOG_SAMPLE_RATE = float(os.getenv("WEBHOOK_LOG_SAMPLE_RATE", "0.1"))
+# Comment frames keep idle job streams open through proxies
+STREAM_KEEPALIVE_SECONDS = 15
+
 # ================== DEPENDENCY ==================
 
+_client: Optional[ElevenLabsClient] = None
+
+
 def get_client() -> ElevenLabsClient:
     """
-    Dependency to provide ElevenLabsClient instance.
+    Dependency to provide the shared ElevenLabsClient instance (one SDK
+    client and connection pool for the whole process).
     
     Raises:
         HTTPException: If client initialization fails
     """
+    global _client
+    if _client is not None:
+        return _client
     try:
-        return ElevenLabsClient()
+        _client = ElevenLabsClient()
+        return _client
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -170,6 +196,12 @@ class ModelName(str, Enum):
     multilingual_e5_large_instruct = "multilingual_e5_large_instruct"
 
 
+class RagIndexBatchRequest(BaseModel):
+    """Request model for computing RAG indexes for several documents"""
+    document_ids: List[str] = Field(..., min_length=1, max_length=RAG_BATCH_MAX_DOCUMENTS, description="Knowledge base document IDs")
+    model: ModelName = Field(..., description="Embedding model")
+
+
 # ================== AGENTS ENDPOINTS ==================
 
 @router.get(
@@ -187,8 +219,9 @@ async def list_agents(
     List all agents with pagination support.
     """
     try:
-        # Offload the blocking SDK call
-        return await asyncio.to_thread(client.list_agents, page_size=page_size, cursor=cursor)
+        return await elevenlabs_cache.cached_call(
+            ("agents", page_size, cursor), client.list_agents, page_size=page_size, cursor=cursor
+        )
     except ElevenLabsError as e:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
     except Exception as e:
@@ -211,12 +244,14 @@ async def create_agent(
     """
     try:
         # Offload the blocking SDK call
-        return await asyncio.to_thread(
+        created = await asyncio.to_thread(
             client.create_agent,
             name=req.name,
             conversation_config=req.conversation_config,
             tags=req.tags,
         )
+        elevenlabs_cache.invalidate("agents")
+        return created
     except ElevenLabsError as e:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
     except Exception as e:
@@ -242,7 +277,7 @@ async def get_agent(
         Agent configuration object
     """
     try:
-        return client.get_agent(agent_id)
+        return await elevenlabs_cache.cached_call(("agent", agent_id), client.get_agent, agent_id)
     except ElevenLabsError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
@@ -270,12 +305,17 @@ async def update_agent(
         Updated agent object
     """
     try:
-        return client.update_agent(
+        updated = await asyncio.to_thread(
+            client.update_agent,
             agent_id=agent_id,
             name=req.name,
             conversation_config=req.conversation_config,
             tags=req.tags
         )
+        # Write through: the response is the updated agent
+        elevenlabs_cache.invalidate("agents", key=("agent", agent_id))
+        elevenlabs_cache.store(("agent", agent_id), updated)
+        return updated
     except ElevenLabsError as e:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
     except Exception as e:
@@ -299,7 +339,8 @@ async def delete_agent(
         agent_id: Agent ID
     """
     try:
-        client.delete_agent(agent_id)
+        await asyncio.to_thread(client.delete_agent, agent_id)
+        elevenlabs_cache.invalidate("agents", key=("agent", agent_id))
         return {"message": "Agent deleted successfully"}
     except ElevenLabsError as e:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
@@ -309,6 +350,14 @@ async def delete_agent(
 
 # ================== KNOWLEDGE BASE ENDPOINTS ==================
 
+KB_ALLOWED_TYPES = [
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/epub+zip",
+    "text/plain",
+    "text/html"
+]
+
 @router.get(
     "/knowledge-base",
     tags=["Knowledge Base"],
@@ -330,7 +379,9 @@ async def list_kb_documents(
         Dictionary with documents list and pagination info
     """
     try:
-        return client.list_knowledge_base_documents(page_size=page_size, cursor=cursor)
+        return await elevenlabs_cache.cached_call(
+            ("kb_docs", page_size, cursor), client.list_knowledge_base_documents, page_size=page_size, cursor=cursor
+        )
     except ElevenLabsError as e:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
     except Exception as e:
@@ -347,11 +398,13 @@ async def create_kb_document_from_url(
     client: ElevenLabsClient = Depends(get_client),
 ):
     try:
-        return await asyncio.to_thread(
+        created = await asyncio.to_thread(
             client.create_knowledge_base_document_from_url,
             url=req.url,
             name=req.name
         )
+        elevenlabs_cache.invalidate("kb_docs")
+        return created
     except ElevenLabsError as e:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
     except Exception as e:
@@ -369,11 +422,13 @@ async def create_kb_document_from_text(
     client: ElevenLabsClient = Depends(get_client),
 ):
     try:
-        return await asyncio.to_thread(
+        created = await asyncio.to_thread(
             client.create_knowledge_base_document_from_text,
             text=req.text,
             name=req.name
         )
+        elevenlabs_cache.invalidate("kb_docs")
+        return created
     except ElevenLabsError as e:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
     except Exception as e:
@@ -388,34 +443,73 @@ async def create_kb_document_from_text(
     description="Upload a file to create a knowledge base document (PDF, DOCX, TXT, HTML, EPUB)"
 )
 async def create_kb_document_from_file(
+    request: Request,
     file: UploadFile = File(..., description="File to upload"),
     name: Optional[str] = Query(None, description="Document name"),
     client: ElevenLabsClient = Depends(get_client),
 ):
-    content = await file.read()
-
-    allowed_types = [
-        "application/pdf",
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        "application/epub+zip",
-        "text/plain",
-        "text/html"
-    ]
-
-    if file.content_type not in allowed_types:
+    if file.content_type not in KB_ALLOWED_TYPES:
         return {
             "error": f"Unsupported file type: {file.content_type}. "
-                     f"Allowed types are {allowed_types}"
+                     f"Allowed types are {KB_ALLOWED_TYPES}"
         }
 
-    buffer = BytesIO(content)
-    buffer.name = file.filename
+    try:
+        check_declared_size(request.headers.get("content-length"))
+        handle = await spool_upload(file, "kb_document")
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+
+    with handle:
+        response = await asyncio.to_thread(
+            client.create_knowledge_base_document_from_file,
+            handle,
+            name or handle.name
+        )
+    elevenlabs_cache.invalidate("kb_docs")
+
+    return {"message": "Uploaded successfully", "response": response}
+
 
-    response = await asyncio.to_thread(
-        client.create_knowledge_base_document_from_file,
-        buffer,
-        buffer.name
+@router.put(
+    "/knowledge-base/from-file/stream",
+    tags=["Knowledge Base"],
+    status_code=status.HTTP_201_CREATED,
+    summary="Create document from a streamed file",
+    description=(
+        "Upload the raw file as the request body (Content-Type set to the file's type). "
+        "The size limit is enforced while the body is received, so oversized uploads "
+        "are cut off early instead of being buffered first."
     )
+)
+async def create_kb_document_from_stream(
+    request: Request,
+    filename: str = Query(..., description="Original file name, e.g. handbook.pdf"),
+    name: Optional[str] = Query(None, description="Document name"),
+    client: ElevenLabsClient = Depends(get_client),
+):
+    content_type = (request.headers.get("content-type") or "").split(";", 1)[0].strip()
+    if content_type not in KB_ALLOWED_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported file type: {content_type or 'none'}. Allowed types are {KB_ALLOWED_TYPES}"
+        )
+
+    try:
+        handle = await spool_request_body(request, filename, "kb_document")
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+
+    try:
+        with handle:
+            response = await asyncio.to_thread(
+                client.create_knowledge_base_document_from_file,
+                handle,
+                name or filename
+            )
+    except ElevenLabsError as e:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
+    elevenlabs_cache.invalidate("kb_docs")
 
     return {"message": "Uploaded successfully", "response": response}
 
@@ -439,7 +533,9 @@ async def get_kb_document(
         Document object
     """
     try:
-        return client.get_knowledge_base_document(document_id)
+        return await elevenlabs_cache.cached_call(
+            ("kb_doc", document_id), client.get_knowledge_base_document, document_id
+        )
     except ElevenLabsError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
@@ -455,13 +551,121 @@ async def compute_rag_index(
     client: ElevenLabsClient = Depends(get_client),
 ):
     try:
-        print("hiello")
-        return client.compute_rag_index(document_id,model)
+        result = await asyncio.to_thread(client.compute_rag_index, document_id, model)
+        elevenlabs_cache.invalidate(key=("kb_doc", document_id))
+        return result
     except ElevenLabsError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
-    
+
+
+# ================== RAG INDEX JOBS ==================
+
+@router.post(
+    "/knowledge-base/{document_id}/rag-index/jobs",
+    tags=["Knowledge Base"],
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Start RAG index computation",
+    description="Queue RAG index computation for a document and return the job immediately"
+)
+async def submit_rag_index_job(
+    document_id: str,
+    model: ModelName,
+    client: ElevenLabsClient = Depends(get_client),
+):
+    return rag_index_jobs.submit(client, document_id, model.value)
+
+
+@router.post(
+    "/knowledge-base/rag-index/batches",
+    tags=["Knowledge Base"],
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Start RAG index computation for many documents",
+    description="Queue one job per document; they run with bounded concurrency"
+)
+async def submit_rag_index_batch(
+    req: RagIndexBatchRequest,
+    client: ElevenLabsClient = Depends(get_client),
+):
+    return rag_index_jobs.submit_batch(client, req.document_ids, req.model.value)
+
+
+@router.get(
+    "/knowledge-base/rag-index/jobs/{job_id}",
+    tags=["Knowledge Base"],
+    summary="RAG index job status"
+)
+async def get_rag_index_job(job_id: str):
+    job = rag_index_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+@router.get(
+    "/knowledge-base/rag-index/batches/{batch_id}",
+    tags=["Knowledge Base"],
+    summary="RAG index batch status"
+)
+async def get_rag_index_batch(batch_id: str):
+    batch = rag_index_jobs.get_batch(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Batch not found")
+    return batch
+
+
+def _rag_job_stream(request: Request, job_ids: List[str]) -> StreamingResponse:
+    """SSE: the current state of each job, then a "job" event per change; ends when all have finished."""
+    watcher = rag_index_jobs.subscribe(job_ids)
+
+    async def events():
+        try:
+            for job_id in job_ids:
+                job = rag_index_jobs.get(job_id)
+                if job is not None:
+                    yield sse_event("job", job)
+            while not rag_index_jobs.all_finished(job_ids):
+                try:
+                    job = await asyncio.wait_for(watcher.queue.get(), timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield SSE_KEEPALIVE
+                    continue
+                yield sse_event("job", job)
+            # Updates queued before the loop noticed the last job finishing
+            while not watcher.queue.empty():
+                yield sse_event("job", watcher.queue.get_nowait())
+            yield sse_event("done", {"job_ids": job_ids})
+        finally:
+            rag_index_jobs.unsubscribe(watcher)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.get(
+    "/knowledge-base/rag-index/jobs/{job_id}/events",
+    tags=["Knowledge Base"],
+    summary="Stream RAG index job updates (SSE)"
+)
+async def stream_rag_index_job(job_id: str, request: Request):
+    if rag_index_jobs.get(job_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return _rag_job_stream(request, [job_id])
+
+
+@router.get(
+    "/knowledge-base/rag-index/batches/{batch_id}/events",
+    tags=["Knowledge Base"],
+    summary="Stream RAG index batch updates (SSE)"
+)
+async def stream_rag_index_batch(batch_id: str, request: Request):
+    job_ids = rag_index_jobs.batch_job_ids(batch_id)
+    if job_ids is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Batch not found")
+    return _rag_job_stream(request, job_ids)
+
 
 
 @router.delete(
@@ -482,7 +686,8 @@ async def delete_kb_document(
         document_id: Document ID
     """
     try:
-        client.delete_knowledge_base_document(document_id)
+        await asyncio.to_thread(client.delete_knowledge_base_document, document_id)
+        elevenlabs_cache.invalidate("kb_docs", key=("kb_doc", document_id))
         return {"message": "Document deleted successfully"}
     except ElevenLabsError as e:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
@@ -515,7 +720,7 @@ async def list_phone_numbers(
         Dictionary with phone numbers list
     """
     try:
-        return client.list_phone_numbers(page_size=page_size, cursor=cursor)
+        return await asyncio.to_thread(client.list_phone_numbers, page_size=page_size, cursor=cursor)
     except ElevenLabsError as e:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
     except Exception as e:
@@ -542,7 +747,7 @@ async def get_phone_number(
         Phone number object
     """
     try:
-        return client.get_phone_number(phone_number_id)
+        return await asyncio.to_thread(client.get_phone_number, phone_number_id)
     except ElevenLabsError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
@@ -572,7 +777,7 @@ async def update_phone_number(
     """
     try:
         update_data = req.dict(exclude_none=True)
-        return client.update_phone_number(phone_number_id, **update_data)
+        return await asyncio.to_thread(client.update_phone_number, phone_number_id, **update_data)
     except ElevenLabsError as e:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
     except Exception as e:
@@ -597,7 +802,7 @@ async def delete_phone_number(
         phone_number_id: Phone number ID
     """
     try:
-        client.delete_phone_number(phone_number_id)
+        await asyncio.to_thread(client.delete_phone_number, phone_number_id)
         return {"message": "Phone number deleted successfully"}
     except ElevenLabsError as e:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
@@ -623,7 +828,7 @@ async def get_workspace_settings(
         Workspace settings object
     """
     try:
-        return client.get_workspace_settings()
+        return await asyncio.to_thread(client.get_workspace_settings)
     except ElevenLabsError as e:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
     except Exception as e:
@@ -650,7 +855,7 @@ async def update_workspace_settings(
         Updated workspace settings
     """
     try:
-        return client.update_workspace_settings(**payload)
+        return await asyncio.to_thread(client.update_workspace_settings, **payload)
     except ElevenLabsError as e:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
     except Exception as e:
@@ -673,7 +878,7 @@ async def get_dashboard_settings(
         Dashboard settings object
     """
     try:
-        return client.get_dashboard_settings()
+        return await asyncio.to_thread(client.get_dashboard_settings)
     except ElevenLabsError as e:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(e))
     except Exception as e:
@@ -902,148 +1107,8 @@ async def get_dashboard_settings(
 #   }
 # }
 
-def extract_transcript_text(transcript_array: list) -> str:
-    """Combine all transcript messages into single string"""
-    try:
-        messages = []
-        for turn in transcript_array:
-            if turn.get("message"):
-                role = turn.get("role", "unknown")
-                message = turn.get("message")
-                messages.append(f"{role}: {message}")
-        return "\n".join(messages)
-    except Exception as e:
-        print(f"❌ Error extracting transcript: {e}")
-        return ""
-
-
-def extract_call_analysis(webhook_payload: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Extract call analysis data from ElevenLabs webhook payload
-    Both sentiment_score and emotional_score are now 0.0-1.0 range
-    """
-    try:
-        data = webhook_payload.get("data", {})
-        analysis = data.get("analysis", {})
-        metadata = data.get("metadata", {})
-        
-        # Get evaluation results (from your 6 criteria)
-        eval_results = analysis.get("evaluation_criteria_results", {})
-        
-        # Get data collection results (from your 3 data fields)
-        collected_data = analysis.get("data_collection_results", {})
-        
-        # Extract transcript
-        transcript_array = data.get("transcript", [])
-        transcript_text = extract_transcript_text(transcript_array)
-        
-        # MAPPING: evaluation_criteria_results → database fields
-        booking_successful_eval = eval_results.get("booking_successful", {})
-        booking_success = (booking_successful_eval.get("result") == "success")
-        
-        human_transfer_eval = eval_results.get("human_transfer_needed", {})
-        human_agent_flag = (human_transfer_eval.get("result") == "failure")
-        human_intervention_reason = ""
-        if human_agent_flag:
-            human_intervention_reason = human_transfer_eval.get("rationale", "")[:100]
-        
-        ai_detected_eval = eval_results.get("ai_detected_by_customer", {})
-        ai_detected_flag = (ai_detected_eval.get("result") == "failure")
-        
-        inquiry_resolved_eval = eval_results.get("inquiry_resolved", {})
-        product_inquiry_resolved = (inquiry_resolved_eval.get("result") == "success")
-        
-        conversation_topic_eval = eval_results.get("out_of_scope", {})
-        out_of_scope = (conversation_topic_eval.get("result") == "failure")
-        
-        conversation_completed_eval = eval_results.get("conversation_completed", {})
-        failed_conversation_reason = ""
-        if conversation_completed_eval.get("result") == "failure":
-            failed_conversation_reason = conversation_completed_eval.get("rationale", "")[:100]
-        
-        # MAPPING: data_collection_results → database fields
-        # Both sentiment_score and emotional_score are now 0.0-1.0 from ElevenLabs
-        
-        sentiment_data = collected_data.get("sentiment_score", {})
-        sentiment_score = sentiment_data.get("value")
-        
-        emotional_data = collected_data.get("emotional_score", {})
-        emotional_score = emotional_data.get("value")
-        
-        customer_rating_data = collected_data.get("customer_satisfaction_rating", {})
-        customer_rating = customer_rating_data.get("value")
-        
-        customer_type_data = collected_data.get("customer_type", {})
-        customer_type = customer_type_data.get("value")
-        
-        customer_id_data = collected_data.get("customer_id",{})
-        customer_id = customer_id_data.get("value")
-
-        call_intent_data= collected_data.get("call_intent",{})
-        call_intent = call_intent_data.get("value") 
-
-        caller_name_data= collected_data.get("caller_name",{})
-        caller_name = caller_name_data.get("value") 
-
-        caller_number_data= collected_data.get("caller_number",{})
-        caller_number = caller_number_data.get("value") 
-
-        # Metadata - safe extraction with defaults
-        call_duration = metadata.get("call_duration_secs", 0) if metadata else 0
-        cost = metadata.get("cost", 0) if metadata else 0
-        summary = analysis.get("transcript_summary", "") if analysis else ""
-        
-        # Safe normalization for sentiment_score (0.0-1.0 range)
-        if sentiment_score is not None and isinstance(sentiment_score, (int, float)):
-            # Clamp to 0.0-1.0 range
-            sentiment_score = max(0.0, min(1.0, float(sentiment_score)))
-        else:
-            sentiment_score = 0.5  # Default neutral
-        
-        # Safe normalization for emotional_score (0.0-1.0 range)
-        if emotional_score is not None and isinstance(emotional_score, (int, float)):
-            # Clamp to 0.0-1.0 range
-            emotional_score = max(0.0, min(1.0, float(emotional_score)))
-        else:
-            emotional_score = 0.5  # Default moderate
-        
-        # Safe normalization for customer_rating (handle None/null)
-        if customer_rating is None or not isinstance(customer_rating, (int, float)):
-            customer_rating = 3  # Default neutral
-        
-        return {
-            "conv_id": data.get("conversation_id"),
-            "customer_rating": customer_rating,
-            "human_agent_flag": human_agent_flag,
-            "ai_detected_flag": ai_detected_flag,
-            "summary": summary,
-            "sentiment_score": sentiment_score,  # Now 0.0-1.0
-            "emotional_score": emotional_score,  # Now 0.0-1.0
-            "human_intervention_reason": human_intervention_reason,
-            "failed_conversation_reason": failed_conversation_reason,
-            "out_of_scope": out_of_scope,
-            "transcript": transcript_text,
-            "booking_successful": booking_success,
-            "product_inquiry_resolved": product_inquiry_resolved,
-            "agent_id": data.get("agent_id"),
-            "duration": call_duration,
-            "cost": cost,
-            "status": data.get("status"),
-            "customer_type": customer_type,
-            "customer_id":customer_id,
-            "call_intent":call_intent,
-            "caller_name":caller_name,
-            "caller_number":caller_number
-        }
-        
-    except Exception as e:
-        print(f"❌ Error extracting call analysis: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return {}
-
 @router.post("/elevenlabs/post-call")
-async def elevenlabs_webhook(request: Request, client: ElevenLabsClient = Depends(get_client)):
+async def elevenlabs_webhook(payload_body: bytes = Depends(verify_elevenlabs_webhook)):
     """
     Handle ElevenLabs post-call webhook
     
@@ -1055,36 +1120,19 @@ async def elevenlabs_webhook(request: Request, client: ElevenLabsClient = Depend
     }
     """
     try:
-        # Step 1: Get RAW body
-        payload_body = await request.body()  # bytes
-
-        # Step 2: Get signature header
-        signature_header = request.headers.get("elevenlabs-signature")
-
-        if not signature_header:
-            return {"status": "error", "message": "Invalid request: Cannot authorize"}
-
-        # Step 3: Verify signature (with raw bytes!)
-        if not client.verify_elevenlabs_signature(
-            payload_body=payload_body,
-            signature_header=signature_header
-        ):
-            return {"status": "error", "message": "Invalid signature"}
-
-        # Step 4: NOW parse JSON
+        # Raw body has already been signature-checked by verify_elevenlabs_webhook
         webhook_payload = json.loads(payload_body)
         
         # Optional: Forward to webhook.site for debugging
         # requests.post("https://webhook.site/cd1995bf-d2c7-4f5d-88f7-0d649c83e07e", json=webhook_payload)
         
-        # Log compact version
-        print("\n" + "="*80)
-        print("🔔 ELEVENLABS WEBHOOK RECEIVED")
-        print("="*80)
-        print(f"Type: {webhook_payload.get('type')}")
-        print(f"Timestamp: {webhook_payload.get('event_timestamp')}")
-        print(f"Conversation ID: {webhook_payload.get('data', {}).get('conversation_id')}")
-        print("="*80 + "\n")
+        log_event(
+            logger, logging.INFO, "elevenlabs_webhook_received",
+            sample=WEBHOOK_LOG_SAMPLE_RATE,
+            type=webhook_payload.get("type"),
+            event_timestamp=webhook_payload.get("event_timestamp"),
+            conversation_id=webhook_payload.get("data", {}).get("conversation_id"),
+        )
         
         # Extract the 'data' field
         data = webhook_payload.get("data", {})
@@ -1109,62 +1157,51 @@ async def elevenlabs_webhook(request: Request, client: ElevenLabsClient = Depend
         )
         
         if existing.data:
-            print(f"⏭️ Conversation {conv_id} already processed. Skipping...")
+            log_event(logger, logging.INFO, "elevenlabs_webhook_duplicate", conversation_id=conv_id)
             return {
                 "status": "skipped",
                 "conversation_id": conv_id,
                 "reason": "Already exists in database"
             }
         
-        # Step 2: Save to call table
-        call_response = supabase.table("call").insert({
-            "conv_id": conv_id,
-            "customer_id": call_analysis.get("customer_id",""),
-            "call_intent": call_analysis.get("summary", ""),
-            "transcript": call_analysis.get("transcript", ""),
-            "duration" : call_analysis.get("duration"),
-            "call_intent":call_analysis.get("call_intent"),
-            "credits_consumed":call_analysis.get("cost"),
-            "date_time": datetime.now(UTC).isoformat(),
-            "caller_name" : call_analysis.get("caller_name"),
-            "caller_number": call_analysis.get("caller_number")
-        }).execute()
+        # Step 2: Save to call table; the transcript goes to the compressed store
+        call_time = datetime.now(UTC).isoformat()
+        call_response = supabase.table("call").insert(build_call_row(call_analysis, call_time)).execute()
         
         if not call_response.data:
-            print(f"❌ Failed to save call: {conv_id}")
+            log_event(logger, logging.ERROR, "call_save_failed", conversation_id=conv_id)
             return {"status": "error", "message": "Failed to save call"}
         
         # call_id = call_response.data[0]["id"]
         # print(f"✅ Call saved: {call_id}")
         
         # Step 3: Save to call_analysis table
-        # Ensure scores are properly formatted as floats
-        sentiment_score = call_analysis.get("sentiment_score", 0.5)
-        emotional_score = call_analysis.get("emotional_score", 0.5)
-        
-        # Convert to float and clamp to 0.0-1.0 range as final safety check
-        sentiment_score = max(0.0, min(1.0, float(sentiment_score)))
-        emotional_score = max(0.0, min(1.0, float(emotional_score)))
-        
-        analysis_response = supabase.table("call_analysis").insert({
-            "conv_id": conv_id,
-            "customer_rating": call_analysis.get("customer_rating", 3),
-            "human_agent_flag": call_analysis.get("human_agent_flag", False),
-            "ai_detect_flag": call_analysis.get("ai_detected_flag", False),
-            "summary": call_analysis.get("summary", ""),
-            "sentiment_score": sentiment_score,  # 0.0-1.0 range
-            "emotional_score": emotional_score,  # 0.0-1.0 range
-            "human_intervention_reason": call_analysis.get("human_intervention_reason", ""),
-            "failed_conversation_reason": call_analysis.get("failed_conversation_reason", ""),
-            "out_of_scope": call_analysis.get("out_of_scope", False)
-        }).execute()
+        analysis_row = build_call_analysis_row(call_analysis)
+        sentiment_score = analysis_row["sentiment_score"]
+        emotional_score = analysis_row["emotional_score"]
+        analysis_response = supabase.table("call_analysis").insert(analysis_row).execute()
         
         if not analysis_response.data:
-            print(f"❌ Failed to save call analysis: {conv_id}")
+            log_event(logger, logging.ERROR, "call_analysis_save_failed", conversation_id=conv_id)
             return {"status": "error", "message": "Failed to save call analysis"}
         
+        consumption_ledger.record_call(conv_id, call_analysis.get("cost"), call_time)
+        
+        # Step 4: Make the call searchable; a failure here must not fail the webhook
+        try:
+            index_call(conv_id, call_time, call_analysis.get("summary"), call_analysis.get("transcript"))
+        except Exception:
+            log_event(logger, logging.ERROR, "call_search_index_failed", exc_info=True, conversation_id=conv_id)
+        
         # Enhanced success response with more details
-        print(f"📊 Scores - Sentiment: {sentiment_score:.2f}, Emotional: {emotional_score:.2f}")
+        notify_data_changed("call")
+        log_event(
+            logger, logging.INFO, "elevenlabs_webhook_processed",
+            sample=WEBHOOK_LOG_SAMPLE_RATE,
+            conversation_id=conv_id,
+            sentiment_score=sentiment_score,
+            emotional_score=emotional_score,
+        )
         
         return {
             "status": "success",
@@ -1176,13 +1213,11 @@ async def elevenlabs_webhook(request: Request, client: ElevenLabsClient = Depend
         }
         
     except json.JSONDecodeError as e:
-        print(f"❌ Invalid JSON in webhook: {str(e)}")
+        log_event(logger, logging.WARNING, "elevenlabs_webhook_invalid_json", error=str(e))
         return {"status": "error", "message": "Invalid JSON"}
         
     except Exception as e:
-        print(f"❌ Error processing webhook: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log_event(logger, logging.ERROR, "elevenlabs_webhook_failed", exc_info=True)
         return {"status": "error", "message": str(e)}
 
 
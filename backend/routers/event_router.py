@@ -1,9 +1,10 @@
-from fastapi import APIRouter, HTTPException, status, Query
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Query, Response
+from typing import List, Optional
 from postgrest import APIError
 
 from backend.services import event_service
 from backend.models.event_model import Event, EventCreate, EventUpdate
+from backend.utils.db_utils import InvalidCursor, NEXT_CURSOR_HEADER
 
 
 # file: routers/event.py
@@ -24,9 +25,22 @@ def create_new_event(event: EventCreate):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.get("/", response_model=List[Event])
-def read_all_events(skip: int = 0, limit: int = 100):
-    """Endpoint to retrieve all events."""
-    events = event_service.get_all_events(skip=skip, limit=limit)
+def read_all_events(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page."),
+):
+    """Endpoint to retrieve events, newest first. Pass the X-Next-Cursor header back as `cursor` for the next page."""
+    if skip:
+        # Legacy offset paging
+        return event_service.get_all_events(skip=skip, limit=limit)
+    try:
+        events, next_cursor = event_service.get_events_page(limit=limit, cursor=cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return events
 
 @router.get("/{event_id}", response_model=Event)
@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from postgrest import APIError
+
+from backend.services.export_service import (
+    EXPORTS,
+    ExportDataset,
+    ExportFormat,
+    encode_csv,
+    encode_ndjson,
+    iter_rows,
+)
+from backend.utils.db_utils import InvalidFields, parse_fields
+
+router = APIRouter(
+    prefix="/exports",
+    tags=["Exports"]
+)
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv; charset=utf-8",
+}
+
+
+@router.get("/{dataset}")
+def export_dataset(
+    dataset: ExportDataset,
+    format: ExportFormat = Query(ExportFormat.ndjson, description="ndjson (one JSON object per line) or csv."),
+    date_from: Optional[datetime] = Query(None, description="Only rows at or after this time (inclusive)."),
+    date_to: Optional[datetime] = Query(None, description="Only rows before this time (exclusive)."),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to export; defaults to all."),
+):
+    """
+    Stream a whole table, newest first. Rows are read from the database in
+    pages and written out as they arrive, so exports of any size use constant memory.
+    """
+    spec = EXPORTS[dataset]
+    if (date_from or date_to) and not spec.date_column:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{dataset.value} has no timestamp column; date filters are not supported",
+        )
+    try:
+        columns = parse_fields(spec.model, fields, required=spec.required_columns)
+    except InvalidFields as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    rows = iter_rows(spec, columns=columns, date_from=date_from, date_to=date_to)
+    try:
+        # Pull the first page now so DB errors still map to a 500
+        first = next(rows, None)
+    except APIError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message)
+    if first is not None:
+        rows = chain([first], rows)
+    else:
+        rows = iter(())
+
+    body = encode_csv(rows, columns) if format == ExportFormat.csv else encode_ndjson(rows)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    filename = f"{dataset.value}_{stamp}.{format.value}"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
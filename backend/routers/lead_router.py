@@ -1,9 +1,11 @@
 from fastapi import APIRouter, HTTPException, status, Query
-from typing import List
+from typing import List, Optional
 from postgrest import APIError
 
 from backend.services import lead_service
-from backend.models.lead_model import Lead, LeadCreate, LeadUpdate
+from backend.models.lead_model import Lead, LeadCreate, LeadPartial, LeadUpdate
+from backend.utils.db_utils import InvalidCursor, InvalidFields, NEXT_CURSOR_HEADER, parse_fields
+from backend.utils.response_handlers import FastJSONResponse
 
 from fastapi import APIRouter, HTTPException, status
 from typing import List
@@ -22,16 +24,36 @@ def create_new_lead(lead: LeadCreate):
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-@router.get("/", response_model=List[Lead])
-def read_all_leads(skip: int = 0, limit: int = 100):
-    """Endpoint to retrieve all leads."""
-    leads = lead_service.get_all_leads(skip=skip, limit=limit)
-    return leads
+@router.get("/", response_model=List[LeadPartial], response_model_exclude_unset=True)
+def read_all_leads(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page."),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. lead_id,name,status."),
+):
+    """Endpoint to retrieve leads, newest first. Pass the X-Next-Cursor header back as `cursor` for the next page."""
+    try:
+        columns = parse_fields(Lead, fields, required=("created_at", "lead_id"))
+        if skip:
+            # Legacy offset paging
+            return FastJSONResponse(lead_service.get_all_leads(skip=skip, limit=limit, fields=columns))
+        leads, next_cursor = lead_service.get_leads_page(limit=limit, cursor=cursor, fields=columns)
+    except (InvalidCursor, InvalidFields) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # Rows come straight from the DB: serialize without a second response_model pass
+    return FastJSONResponse(leads, headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
 
-@router.get("/{lead_id}", response_model=Lead)
-def read_lead_by_id(lead_id: int):
+@router.get("/{lead_id}", response_model=LeadPartial, response_model_exclude_unset=True)
+def read_lead_by_id(
+    lead_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. lead_id,name,status."),
+):
     """Endpoint to retrieve a specific lead by their ID."""
-    lead = lead_service.get_lead_by_id(lead_id)
+    try:
+        columns = parse_fields(Lead, fields)
+    except InvalidFields as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    lead = lead_service.get_lead_by_id(lead_id, fields=columns)
     if not lead:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lead not found")
     return lead
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, HTTPException, status, Query
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Query, Response
+from typing import List, Optional
 from postgrest import APIError
 
 from backend.services import payment_service
 from backend.models.payment_model import Payment, PaymentCreate, PaymentUpdate
+from backend.utils.db_utils import InvalidCursor, NEXT_CURSOR_HEADER
 
 router = APIRouter(
     prefix="/payments",
@@ -20,14 +21,24 @@ router = APIRouter(
 
 @router.get("/", response_model=List[Payment])
 def read_all_payments(
+    response: Response,
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, le=200)
+    limit: int = Query(100, le=200),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page."),
 ):
-    """Retrieve all payments."""
+    """Retrieve payments, newest first. Pass the X-Next-Cursor header back as `cursor` for the next page."""
     try:
-        return payment_service.get_all_payments(skip=skip, limit=limit)
+        if skip:
+            # Legacy offset paging
+            return payment_service.get_all_payments(skip=skip, limit=limit)
+        payments, next_cursor = payment_service.get_payments_page(limit=limit, cursor=cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except APIError as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return payments
 
 # @router.get("/{payment_id}", response_model=Payment)
 # def read_payment_by_id(payment_id: str):
@@ -3,11 +3,15 @@ import logging
 from fastapi import APIRouter, HTTPException, Depends, status
 from typing import Optional
 from fastapi import Request, Response
-import hashlib, os
+import os
 import hmac
 from hashlib import sha256
 
 from backend.config.bookeo import BookeoAPI
+from backend.utils.auth import verify_payu_hash
+from backend.utils.structured_logging import log_event
+from backend.services.live_dashboard_service import notify_data_changed
+from backend.services.consumption_ledger import consumption_ledger
 
 
 from backend.config.payu_client import (
@@ -25,6 +29,11 @@ def get_bookeo_client() -> BookeoAPI:
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
+logger = logging.getLogger(__name__)
+
+# Fraction of accepted webhooks whose (redacted) form is logged; rejections are always logged
+WEBHOOK_LOG_SAMPLE_RATE = float(os.getenv("WEBHOOK_LOG_SAMPLE_RATE", "0.1"))
+
 @router.get(
     "/transaction-details",
     response_model=TransactionPage,
@@ -61,48 +70,29 @@ async def check_transaction_details(
 
 
 PAYU_SALT = os.getenv("PAYU_SALT")
-def payu_reverse_hash(p: dict, salt: str) -> str:
-    # Reverse-hash per PayU:
-    # SALT|status||||||udf5|udf4|udf3|udf2|udf1|email|firstname|productinfo|amount|txnid|key
-    # If additionalCharges is present, prepend it: additionalCharges|SALT|status|... (same tail) 
-    seq = [
-        salt,
-        p.get("status", ""),
-        "", "", "", "", "",  # six empty pipes
-        p.get("udf5", ""),
-        p.get("udf4", ""),
-        p.get("udf3", ""),
-        p.get("udf2", ""),
-        p.get("udf1", ""),
-        p.get("email", ""),
-        p.get("firstname", ""),
-        p.get("productinfo", ""),
-        p.get("amount", ""),
-        p.get("txnid", ""),
-        p.get("key", ""),
-    ]
-    base = "|".join(seq)
-    if p.get("additionalCharges"):
-        base = f"{p['additionalCharges']}|{base}"
-    return hashlib.sha512(base.encode("utf-8")).hexdigest()
 
 
 @router.post("/webhooks/payu")
 async def payu_webhook(request: Request) -> Response:
     form = await request.form()
-    print("\n\n")
-    logging.info(f"Received PayU Webhook payload: {form}")
     payload = {k: (v.strip() if isinstance(v, str) else v) for k, v in form.items()}
     received = payload.get("hash", "")
-    print("Payload received:", payload)
-    get_bookeo_client().create_booking_after_payment_from_payu(payload)
-    
+    txn = {"txnid": payload.get("txnid"), "mihpayid": payload.get("mihpayid"), "payu_status": payload.get("status")}
 
     if not PAYU_SALT or not received:
+        log_event(logger, logging.WARNING, "payu_webhook_rejected", reason="missing salt or hash", **txn)
         return Response(content="invalid configuration or payload", status_code=status.HTTP_400_BAD_REQUEST)
-    computed = payu_reverse_hash(payload, PAYU_SALT)
-    if computed != received:
+    # Verify before acting on the payload
+    if not verify_payu_hash(payload, PAYU_SALT):
+        log_event(logger, logging.WARNING, "payu_webhook_rejected", reason="invalid signature", **txn)
         return Response(content="invalid signature", status_code=status.HTTP_400_BAD_REQUEST)
+
+    log_event(logger, logging.INFO, "payu_webhook_received", sample=WEBHOOK_LOG_SAMPLE_RATE, payload=payload, **txn)
+
+    get_bookeo_client().create_booking_after_payment_from_payu(payload)
+    if (payload.get("status") or "").lower() == "success":
+        consumption_ledger.record_payu_fee(payload.get("amount") or payload.get("net_amount_debit"), payload.get("txnid"))
+    notify_data_changed("payment")
     return Response(content="ok", status_code=status.HTTP_200_OK)
 
 
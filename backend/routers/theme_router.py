@@ -1,9 +1,10 @@
 from fastapi import APIRouter, HTTPException, status, Query
-from typing import List
+from typing import List, Optional
 from postgrest import APIError
 
 from backend.services import theme_service
-from backend.models.theme_model import Theme, ThemeCreate, ThemeUpdate
+from backend.models.theme_model import Theme, ThemeCreate, ThemePartial, ThemeUpdate
+from backend.utils.db_utils import InvalidFields, parse_fields
 
 router = APIRouter(
     prefix="/themes",
@@ -18,18 +19,31 @@ def create_new_theme(theme_data: ThemeCreate):
     except APIError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message)
 
-@router.get("/", response_model=List[Theme])
-def read_all_themes(skip: int = 0, limit: int = Query(default=100, lte=200)):
+@router.get("/", response_model=List[ThemePartial], response_model_exclude_unset=True)
+def read_all_themes(
+    skip: int = 0,
+    limit: int = Query(default=100, lte=200),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. theme_id,name."),
+):
     """Retrieve all themed packages."""
     try:
-        return theme_service.get_all_themes(skip=skip, limit=limit)
+        return theme_service.get_all_themes(skip=skip, limit=limit, fields=parse_fields(Theme, fields))
+    except InvalidFields as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except APIError as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.message)
 
-@router.get("/{theme_id}", response_model=Theme)
-def read_theme_by_id(theme_id: str):
+@router.get("/{theme_id}", response_model=ThemePartial, response_model_exclude_unset=True)
+def read_theme_by_id(
+    theme_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. theme_id,name."),
+):
     """Retrieve a specific theme by its ID."""
-    theme = theme_service.get_theme_by_id(theme_id)
+    try:
+        columns = parse_fields(Theme, fields)
+    except InvalidFields as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    theme = theme_service.get_theme_by_id(theme_id, fields=columns)
     if not theme:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Theme not found")
     return theme
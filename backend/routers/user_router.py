@@ -1,9 +1,10 @@
 # routers/user_router.py
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from backend.models.user_model import UserCreate, UserUpdate, UserOut,ValidationRequest, ValidationResponse
 from backend.services.user_service import UserService, DatabaseError
 from backend.config.supabase_client import supabase
+from backend.utils.db_utils import InvalidCursor, NEXT_CURSOR_HEADER
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -13,11 +14,22 @@ def get_user_service() -> UserService:
 
 @router.get("", response_model=List[UserOut], status_code=status.HTTP_200_OK)
 def list_users(
+    response: Response,
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page."),
     svc: UserService = Depends(get_user_service),
 ) -> List[UserOut]:
-    rows = svc.list_users(limit=limit, offset=offset)
+    if offset:
+        # Legacy offset paging
+        rows = svc.list_users(limit=limit, offset=offset)
+        return [UserOut(**row) for row in rows]
+    try:
+        rows, next_cursor = svc.list_users_page(limit=limit, cursor=cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [UserOut(**row) for row in rows]
 
 @router.get("/by-email", response_model=UserOut, status_code=status.HTTP_200_OK)
@@ -1,8 +1,12 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from postgrest import APIError
 
 from backend.config.supabase_client import supabase
-from backend.models.booking_model import Booking,BookingCreate,BookingUpdate
+from backend.models.booking_model import Booking,BookingCreate,BookingPartial,BookingUpdate
+from backend.config.reminder_scheduler import reminder_scheduler
+from backend.services.live_dashboard_service import notify_data_changed
+from backend.utils.db_utils import keyset_page, select_columns
+from backend.utils.response_handlers import construct_rows
 
 def create_booking(booking_data: BookingCreate) -> Booking:
     """Creates a new booking record with a 'pending' status."""
@@ -12,23 +16,38 @@ def create_booking(booking_data: BookingCreate) -> Booking:
         booking_dict["status"] = "Incomplete"
 
         response = supabase.table("bookings").insert(booking_dict).execute()
+        reminder_scheduler.sync_bookings(response.data)
+        notify_data_changed("bookings")
         return Booking(**response.data[0])
     except APIError as e:
         raise e
 
-def get_all_bookings(skip: int = 0, limit: int = 100) -> List[Booking]:
-    """Retrieves a list of all bookings with pagination."""
+def get_all_bookings(skip: int = 0, limit: int = 100, fields: Optional[List[str]] = None) -> List[Booking]:
+    """Retrieves a list of all bookings with pagination. `fields` limits the selected columns."""
     try:
-        response = supabase.table("bookings").select("*").order("creation_time", desc=True).range(skip, skip + limit - 1).execute()
-        return [Booking(**item) for item in response.data] if response.data else []
+        response = supabase.table("bookings").select(select_columns(fields)).order("creation_time", desc=True).order("booking_id", desc=True).range(skip, skip + limit - 1).execute()
+        # Trusted DB rows: skip validation (the route serializes them directly)
+        return construct_rows(BookingPartial if fields else Booking, response.data)
+    except APIError as e:
+        raise e
+
+def get_bookings_page(
+    limit: int = 100, cursor: Optional[str] = None, fields: Optional[List[str]] = None
+) -> Tuple[List[Booking], Optional[str]]:
+    """Retrieves one page of bookings, newest first, plus the cursor for the next page."""
+    try:
+        query = supabase.table("bookings").select(select_columns(fields))
+        rows, next_cursor = keyset_page(query, "creation_time", "booking_id", limit, cursor)
+        return construct_rows(BookingPartial if fields else Booking, rows), next_cursor
     except APIError as e:
         raise e
 
-def get_booking_by_id(booking_id: int) -> Optional[Booking]:
+def get_booking_by_id(booking_id: int, fields: Optional[List[str]] = None) -> Optional[Booking]:
     """Retrieves a single booking by its ID."""
     try:
-        response = supabase.table("bookings").select("*").eq("booking_id", booking_id).single().execute()
-        return Booking(**response.data) if response.data else None
+        response = supabase.table("bookings").select(select_columns(fields)).eq("booking_id", booking_id).single().execute()
+        model = BookingPartial if fields else Booking
+        return model(**response.data) if response.data else None
     except APIError as e:
         print(f"Error getting booking by ID {booking_id}: {e.message}")
         return None
@@ -49,6 +68,8 @@ def update_booking(booking_id: int, booking_data: BookingUpdate) -> Optional[Boo
             return get_booking_by_id(booking_id)
 
         response = supabase.table("bookings").update(update_dict).eq("booking_id", booking_id).execute()
+        reminder_scheduler.sync_bookings(response.data or [])
+        notify_data_changed("bookings")
         return Booking(**response.data[0]) if response.data else None
     except APIError as e:
         raise e
@@ -57,6 +78,8 @@ def delete_booking(booking_id: int) -> Optional[Booking]:
     """Deletes a booking from the database."""
     try:
         response = supabase.table("bookings").delete().eq("booking_id", booking_id).execute()
+        reminder_scheduler.cancel_booking(booking_id)
+        notify_data_changed("bookings")
         return Booking(**response.data[0]) if response.data else None
     except APIError as e:
         raise e
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""
+call_analysis_extractor.py
+--------------------------
+Declarative mapping from an ElevenLabs conversation (post-call webhook body,
+or a conversation fetched for a backfill) to the flat dict the `call` and
+`call_analysis` inserts read from.
+
+Each output column is one `FieldSpec` in CALL_ANALYSIS_SPEC: where the value
+sits in the payload, what to use when it is missing, and how to normalize
+it. Adding an evaluation criterion or data collection field is one line.
+
+`compile_extractor(spec)` prepares a spec once, at import time: every
+intermediate dict on a path gets one lookup step shared by all columns under
+it, and each column becomes a small closure reading its key from that dict.
+Extracting a payload runs the lookup steps, then the column readers.
+
+Usage:
+    from backend.services.call_analysis_extractor import extract_call_fields
+
+    row = extract_call_fields(webhook_payload)   # raises on malformed input
+"""
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from backend.utils.phone import normalize_phone_or_none
+
+_EMPTY: Dict[str, Any] = {}
+
+EVALUATION = ("data", "analysis", "evaluation_criteria_results")
+COLLECTED = ("data", "analysis", "data_collection_results")
+
+
+class FieldSpec(NamedTuple):
+    column: str
+    path: Tuple[str, ...]
+    default: Any = None
+    normalize: Optional[Callable[[Any], Any]] = None
+
+
+# ================== NORMALIZERS ==================
+
+def result_is(expected: str) -> Callable[[Any], bool]:
+    """Evaluation criterion dict -> whether its result is `expected`."""
+    def normalize(criterion: Any) -> bool:
+        return isinstance(criterion, dict) and criterion.get("result") == expected
+    return normalize
+
+
+def rationale_if(expected: str, max_chars: int = 100) -> Callable[[Any], str]:
+    """Evaluation criterion dict -> its rationale (truncated) when the result is `expected`, else ""."""
+    def normalize(criterion: Any) -> str:
+        if not isinstance(criterion, dict) or criterion.get("result") != expected:
+            return ""
+        return (criterion.get("rationale") or "")[:max_chars]
+    return normalize
+
+
+def unit_score(default: float) -> Callable[[Any], float]:
+    """A 0.0-1.0 score: numbers are clamped, anything else becomes `default`."""
+    def normalize(value: Any) -> float:
+        if isinstance(value, (int, float)):
+            return max(0.0, min(1.0, float(value)))
+        return default
+    return normalize
+
+
+def number_or(default: int) -> Callable[[Any], Any]:
+    def normalize(value: Any) -> Any:
+        return value if isinstance(value, (int, float)) else default
+    return normalize
+
+
+def transcript_text(turns: Any) -> str:
+    """Transcript turns -> "role: message" lines (turns without a message are skipped)."""
+    if not isinstance(turns, list):
+        return ""
+    return "\n".join([
+        f"{turn.get('role', 'unknown')}: {message}"
+        for turn in turns
+        if isinstance(turn, dict) and (message := turn.get("message"))
+    ])
+
+
+# ================== SPEC ==================
+
+def _criterion(name: str) -> Tuple[str, ...]:
+    return (*EVALUATION, name)
+
+
+def _collected(name: str) -> Tuple[str, ...]:
+    return (*COLLECTED, name, "value")
+
+
+CALL_ANALYSIS_SPEC: List[FieldSpec] = [
+    FieldSpec("conv_id", ("data", "conversation_id")),
+    FieldSpec("agent_id", ("data", "agent_id")),
+    FieldSpec("status", ("data", "status")),
+    FieldSpec("transcript", ("data", "transcript"), [], transcript_text),
+    FieldSpec("summary", ("data", "analysis", "transcript_summary"), ""),
+    FieldSpec("duration", ("data", "metadata", "call_duration_secs"), 0),
+    FieldSpec("cost", ("data", "metadata", "cost"), 0),
+
+    # evaluation_criteria_results
+    FieldSpec("booking_successful", _criterion("booking_successful"), None, result_is("success")),
+    FieldSpec("human_agent_flag", _criterion("human_transfer_needed"), None, result_is("failure")),
+    FieldSpec("human_intervention_reason", _criterion("human_transfer_needed"), None, rationale_if("failure")),
+    FieldSpec("ai_detected_flag", _criterion("ai_detected_by_customer"), None, result_is("failure")),
+    FieldSpec("product_inquiry_resolved", _criterion("inquiry_resolved"), None, result_is("success")),
+    FieldSpec("out_of_scope", _criterion("out_of_scope"), None, result_is("failure")),
+    FieldSpec("failed_conversation_reason", _criterion("conversation_completed"), None, rationale_if("failure")),
+
+    # data_collection_results
+    FieldSpec("sentiment_score", _collected("sentiment_score"), None, unit_score(0.5)),
+    FieldSpec("emotional_score", _collected("emotional_score"), None, unit_score(0.5)),
+    FieldSpec("customer_rating", _collected("customer_satisfaction_rating"), None, number_or(3)),
+    FieldSpec("customer_type", _collected("customer_type")),
+    FieldSpec("customer_id", _collected("customer_id")),
+    FieldSpec("call_intent", _collected("call_intent")),
+    FieldSpec("caller_name", _collected("caller_name")),
+    FieldSpec("caller_number", _collected("caller_number"), None, normalize_phone_or_none),
+]
+
+
+# ================== EXTRACTOR ==================
+
+def _column_reader(parent: int, key: str, default: Any, normalize: Optional[Callable[[Any], Any]]):
+    if normalize is None:
+        return lambda containers: containers[parent].get(key, default)
+    return lambda containers: normalize(containers[parent].get(key, default))
+
+
+def compile_extractor(spec: Sequence[FieldSpec]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Build `extract(payload) -> dict` for `spec`. Missing or non-dict
+    intermediate levels count as empty, so a leaf falls back to its default.
+    """
+    # Container paths, parents first; index 0 is the payload itself
+    slots: Dict[Tuple[str, ...], int] = {(): 0}
+    steps: List[Tuple[int, str]] = []  # (parent slot, key) for slots 1..n
+
+    def container(path: Tuple[str, ...]) -> int:
+        if path not in slots:
+            parent = container(path[:-1])
+            steps.append((parent, path[-1]))
+            slots[path] = len(steps)
+        return slots[path]
+
+    readers = [
+        (field.column, _column_reader(container(field.path[:-1]), field.path[-1], field.default, field.normalize))
+        for field in spec
+    ]
+
+    def extract(payload: Dict[str, Any]) -> Dict[str, Any]:
+        containers = [payload if isinstance(payload, dict) else _EMPTY]
+        for parent, key in steps:
+            value = containers[parent].get(key)
+            containers.append(value if isinstance(value, dict) else _EMPTY)
+        return {column: read(containers) for column, read in readers}
+
+    return extract
+
+
+extract_call_fields = compile_extractor(CALL_ANALYSIS_SPEC)
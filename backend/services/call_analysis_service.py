@@ -1,7 +1,8 @@
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 from postgrest import APIError
 
 from backend.config.supabase_client import supabase
+from backend.utils.db_utils import keyset_page
 from backend.models.call_analysis_model import CallAnalysis, CallAnalysisCreate, CallAnalysisUpdate
 
 def create_call_analysis(analysis_data: CallAnalysisCreate) -> CallAnalysis:
@@ -21,6 +22,15 @@ def get_all_call_analyses() -> List[CallAnalysis]:
     except APIError as e:
         raise e
 
+def iter_call_analyses(page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """Yields every call analysis row as a raw dict, one keyset page at a time."""
+    cursor = None
+    while True:
+        rows, cursor = keyset_page(supabase.table("call_analysis").select("*"), None, "analysis_id", page_size, cursor)
+        yield from rows
+        if not cursor:
+            return
+
 def get_call_analysis_by_id(analysis_id: int) -> Optional[CallAnalysis]:
     """Retrieves a single call analysis by its ID."""
     try:
@@ -0,0 +1,70 @@
+"""
+call_ingest_service.py
+----------------------
+Turns an ElevenLabs conversation into `call` / `call_analysis` rows.
+Shared by the post-call webhook (routers/elevenlabs_router.py) and the
+conversation backfill (services/conversation_backfill.py) so both write
+exactly the same columns.
+"""
+
+import logging
+from typing import Any, Dict
+
+from backend.services.call_analysis_extractor import extract_call_fields
+from backend.services.transcript_store import offload_transcript
+from backend.utils.structured_logging import log_event
+
+logger = logging.getLogger(__name__)
+
+
+def extract_call_analysis(webhook_payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract call analysis data from ElevenLabs webhook payload (the column
+    mapping is CALL_ANALYSIS_SPEC in services/call_analysis_extractor.py).
+    Both sentiment_score and emotional_score are in the 0.0-1.0 range.
+    Returns {} if the payload cannot be read.
+    """
+    try:
+        return extract_call_fields(webhook_payload)
+    except Exception:
+        log_event(
+            logger, logging.ERROR, "call_analysis_extraction_failed",
+            exc_info=True,
+            conversation_id=(webhook_payload.get("data") or {}).get("conversation_id") if isinstance(webhook_payload, dict) else None,
+        )
+        return {}
+
+
+def build_call_row(call_analysis: Dict[str, Any], date_time: str) -> Dict[str, Any]:
+    """`call` row for an extracted conversation. Writes the transcript to the transcript store."""
+    conv_id = call_analysis["conv_id"]
+    return {
+        "conv_id": conv_id,
+        "customer_id": call_analysis.get("customer_id", ""),
+        **offload_transcript(conv_id, call_analysis.get("transcript", "")),
+        "duration": call_analysis.get("duration"),
+        "call_intent": call_analysis.get("call_intent"),
+        "credits_consumed": call_analysis.get("cost"),
+        "date_time": date_time,
+        "caller_name": call_analysis.get("caller_name"),
+        "caller_number": call_analysis.get("caller_number"),
+    }
+
+
+def build_call_analysis_row(call_analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """`call_analysis` row for an extracted conversation."""
+    # Convert to float and clamp to 0.0-1.0 range as final safety check
+    sentiment_score = max(0.0, min(1.0, float(call_analysis.get("sentiment_score", 0.5))))
+    emotional_score = max(0.0, min(1.0, float(call_analysis.get("emotional_score", 0.5))))
+    return {
+        "conv_id": call_analysis["conv_id"],
+        "customer_rating": call_analysis.get("customer_rating", 3),
+        "human_agent_flag": call_analysis.get("human_agent_flag", False),
+        "ai_detect_flag": call_analysis.get("ai_detected_flag", False),
+        "summary": call_analysis.get("summary", ""),
+        "sentiment_score": sentiment_score,  # 0.0-1.0 range
+        "emotional_score": emotional_score,  # 0.0-1.0 range
+        "human_intervention_reason": call_analysis.get("human_intervention_reason", ""),
+        "failed_conversation_reason": call_analysis.get("failed_conversation_reason", ""),
+        "out_of_scope": call_analysis.get("out_of_scope", False),
+    }
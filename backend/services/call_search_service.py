@@ -0,0 +1,250 @@
+"""
+call_search_service.py
+----------------------
+Full-text search over what was said on calls: the transcript and the
+call_analysis summary. Backs GET /calls/search.
+
+Documents are indexed when the post-call webhook stores a call (and in bulk
+with `--reindex`), so a search is one indexed lookup instead of pulling and
+scanning transcripts. Summary matches rank above transcript matches.
+
+Backends (CALL_SEARCH_BACKEND):
+    postgres  (default) a GIN-indexed tsvector table, written and queried
+              through two RPCs. Only the tsvector is stored; the text stays in
+              the transcript store / call_analysis.
+
+        create table call_search (
+            conv_id   text primary key,
+            date_time timestamptz not null,
+            document  tsvector not null
+        );
+        create index call_search_document_idx on call_search using gin (document);
+        create index call_search_date_time_idx on call_search (date_time desc);
+
+        create or replace function index_call_search(
+            p_conv_id text, p_date_time timestamptz, p_summary text, p_transcript text
+        ) returns void language sql as $$
+            insert into call_search (conv_id, date_time, document)
+            values (p_conv_id, p_date_time,
+                    setweight(to_tsvector('english', coalesce(p_summary, '')), 'A') ||
+                    setweight(to_tsvector('english', coalesce(p_transcript, '')), 'B'))
+            on conflict (conv_id) do update
+                set date_time = excluded.date_time, document = excluded.document;
+        $$;
+
+        create or replace function search_calls(
+            p_query text, p_start_time timestamptz, p_end_time timestamptz,
+            p_limit int, p_offset int
+        ) returns table (conv_id text, date_time timestamptz, rank real)
+        language sql stable as $$
+            select s.conv_id, s.date_time, ts_rank_cd(s.document, q) as rank
+            from call_search s, websearch_to_tsquery('english', p_query) q
+            where s.document @@ q
+              and (p_start_time is null or s.date_time >= p_start_time)
+              and (p_end_time is null or s.date_time < p_end_time)
+            order by rank desc, s.date_time desc
+            limit p_limit offset p_offset;
+        $$;
+
+    sqlite    an FTS5 index in CALL_SEARCH_SQLITE_PATH, for local development
+              and single-instance deployments.
+
+Rebuild the index from existing calls with:
+    python -m backend.services.call_search_service --reindex
+"""
+
+import os
+import re
+import sqlite3
+import logging
+import argparse
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.config.supabase_client import supabase
+from backend.services import transcript_store
+
+logger = logging.getLogger(__name__)
+
+CALL_SEARCH_BACKEND = os.getenv("CALL_SEARCH_BACKEND", "postgres").lower()
+CALL_SEARCH_SQLITE_PATH = os.getenv("CALL_SEARCH_SQLITE_PATH", "call_search.db")
+# bm25 column weights (summary, transcript) for the sqlite backend
+SQLITE_WEIGHTS = (4.0, 1.0)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+# ================== SQLITE BACKEND ==================
+
+_sqlite: Optional[sqlite3.Connection] = None
+_sqlite_lock = threading.Lock()
+
+
+def _sqlite_conn() -> sqlite3.Connection:
+    global _sqlite
+    if _sqlite is None:
+        conn = sqlite3.connect(CALL_SEARCH_SQLITE_PATH, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS call_search USING fts5("
+            "conv_id UNINDEXED, date_time UNINDEXED, summary, transcript, "
+            "tokenize='porter unicode61')"
+        )
+        _sqlite = conn
+    return _sqlite
+
+
+def _fts_query(query: str) -> str:
+    """User input as an FTS5 query: every word must match (prefix match on the last one)."""
+    tokens = _TOKEN.findall(query)
+    if not tokens:
+        return ""
+    quoted = [f'"{t}"' for t in tokens]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _sqlite_index(conv_id: str, date_time: str, summary: str, transcript: str) -> None:
+    with _sqlite_lock:
+        conn = _sqlite_conn()
+        with conn:
+            conn.execute("DELETE FROM call_search WHERE conv_id = ?", (conv_id,))
+            conn.execute(
+                "INSERT INTO call_search (conv_id, date_time, summary, transcript) VALUES (?, ?, ?, ?)",
+                (conv_id, date_time, summary, transcript),
+            )
+
+
+def _sqlite_search(
+    query: str, start: Optional[str], end: Optional[str], limit: int, offset: int
+) -> List[Dict[str, Any]]:
+    match = _fts_query(query)
+    if not match:
+        return []
+    sql = (
+        "SELECT conv_id, date_time, -bm25(call_search, ?, ?) AS rank, "
+        "snippet(call_search, -1, '[', ']', '...', 12) AS snippet "
+        "FROM call_search WHERE call_search MATCH ?"
+    )
+    params: List[Any] = [*SQLITE_WEIGHTS, match]
+    # ISO-8601 strings in UTC compare in time order
+    if start:
+        sql += " AND date_time >= ?"
+        params.append(start)
+    if end:
+        sql += " AND date_time < ?"
+        params.append(end)
+    sql += " ORDER BY rank DESC, date_time DESC LIMIT ? OFFSET ?"
+    params += [limit, offset]
+    with _sqlite_lock:
+        rows = _sqlite_conn().execute(sql, params).fetchall()
+    return [{"conv_id": r[0], "date_time": r[1], "rank": r[2], "snippet": r[3]} for r in rows]
+
+
+# ================== POSTGRES BACKEND ==================
+
+def _pg_index(conv_id: str, date_time: str, summary: str, transcript: str) -> None:
+    supabase.rpc("index_call_search", {
+        "p_conv_id": conv_id,
+        "p_date_time": date_time,
+        "p_summary": summary,
+        "p_transcript": transcript,
+    }).execute()
+
+
+def _pg_search(
+    query: str, start: Optional[str], end: Optional[str], limit: int, offset: int
+) -> List[Dict[str, Any]]:
+    resp = supabase.rpc("search_calls", {
+        "p_query": query,
+        "p_start_time": start,
+        "p_end_time": end,
+        "p_limit": limit,
+        "p_offset": offset,
+    }).execute()
+    return resp.data or []
+
+
+# ================== PUBLIC API ==================
+
+def index_call(conv_id: str, date_time: str, summary: Optional[str], transcript: Optional[str]) -> None:
+    """Add or replace one call's search document."""
+    if CALL_SEARCH_BACKEND == "sqlite":
+        _sqlite_index(conv_id, date_time, summary or "", transcript or "")
+    else:
+        _pg_index(conv_id, date_time, summary or "", transcript or "")
+
+
+def _attach_call_details(results: List[Dict[str, Any]]) -> None:
+    """Add summary, caller and intent to each hit (two IN queries for the whole page)."""
+    conv_ids = [r["conv_id"] for r in results]
+    if not conv_ids:
+        return
+    calls = supabase.table("call").select("conv_id, caller_name, call_intent, duration").in_("conv_id", conv_ids).execute().data or []
+    summaries = supabase.table("call_analysis").select("conv_id, summary").in_("conv_id", conv_ids).execute().data or []
+    calls_by_id = {c["conv_id"]: c for c in calls}
+    summary_by_id = {a["conv_id"]: a.get("summary") for a in summaries}
+    for result in results:
+        call = calls_by_id.get(result["conv_id"], {})
+        result["caller_name"] = call.get("caller_name")
+        result["call_intent"] = call.get("call_intent")
+        result["duration"] = call.get("duration")
+        result["summary"] = summary_by_id.get(result["conv_id"])
+
+
+def search_calls(
+    query: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Ranked calls matching `query` (best first), optionally within
+    [start, end). Returns (results, has_more).
+    """
+    search = _sqlite_search if CALL_SEARCH_BACKEND == "sqlite" else _pg_search
+    # One extra row tells us whether another page exists
+    results = search(query, start, end, limit + 1, offset)
+    has_more = len(results) > limit
+    results = results[:limit]
+    _attach_call_details(results)
+    return results, has_more
+
+
+def reindex_all(batch: int = 200) -> int:
+    """Rebuild the index from every stored call. Returns the number indexed."""
+    indexed = 0
+    offset = 0
+    while True:
+        calls = (
+            supabase.table("call")
+            .select("conv_id, date_time, transcript, transcript_chars")
+            .order("conv_id")
+            .range(offset, offset + batch - 1)
+            .execute()
+        ).data or []
+        if not calls:
+            return indexed
+        conv_ids = [c["conv_id"] for c in calls]
+        summaries = supabase.table("call_analysis").select("conv_id, summary").in_("conv_id", conv_ids).execute().data or []
+        summary_by_id = {a["conv_id"]: a.get("summary") for a in summaries}
+        for call in calls:
+            transcript = call.get("transcript")
+            if not transcript and call.get("transcript_chars"):
+                transcript = transcript_store.get_transcript(call["conv_id"])
+            index_call(call["conv_id"], call["date_time"], summary_by_id.get(call["conv_id"]), transcript)
+            indexed += 1
+        offset += batch
+        logger.info(f"Indexed {indexed} calls so far.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Call search index maintenance.")
+    parser.add_argument("--reindex", action="store_true", help="Index every call in the database.")
+    parser.add_argument("--batch", type=int, default=200)
+    args = parser.parse_args()
+    if not args.reindex:
+        parser.error("nothing to do (pass --reindex)")
+    logging.basicConfig(level=logging.INFO)
+    print(f"indexed {reindex_all(args.batch)} calls into {CALL_SEARCH_BACKEND}")
@@ -1,8 +1,11 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from postgrest import APIError
 
 from backend.config.supabase_client import supabase
-from backend.models.call_model import Call, CallCreate, CallUpdate
+from backend.services import transcript_store
+from backend.utils.db_utils import keyset_page, select_columns
+from backend.utils.response_handlers import construct_rows
+from backend.models.call_model import Call, CallCreate, CallPartial, CallUpdate
 
 def create_call(call_data: CallCreate) -> Call:
     """Creates a new call record."""
@@ -13,12 +16,23 @@ def create_call(call_data: CallCreate) -> Call:
     except APIError as e:
         raise e
 
-def get_all_calls(skip: int = 0, limit: int = 100) -> List[Call]:
-    """Retrieves a list of all calls."""
+def get_all_calls(skip: int = 0, limit: int = 100, fields: Optional[List[str]] = None) -> List[Call]:
+    """Retrieves a list of all calls. `fields` limits the selected columns."""
     try:
-        response = supabase.table("call").select("*").order("date_time", desc=True).range(skip, skip + limit - 1).execute()
-        # print(response)
-        return [Call(**item) for item in response.data] if response.data else []
+        response = supabase.table("call").select(select_columns(fields)).order("date_time", desc=True).order("conv_id", desc=True).range(skip, skip + limit - 1).execute()
+        # Trusted DB rows: skip validation (the route serializes them directly)
+        return construct_rows(CallPartial if fields else Call, response.data)
+    except APIError as e:
+        raise e
+
+def get_calls_page(
+    limit: int = 100, cursor: Optional[str] = None, fields: Optional[List[str]] = None
+) -> Tuple[List[Call], Optional[str]]:
+    """Retrieves one page of calls, newest first, plus the cursor for the next page."""
+    try:
+        query = supabase.table("call").select(select_columns(fields))
+        rows, next_cursor = keyset_page(query, "date_time", "conv_id", limit, cursor)
+        return construct_rows(CallPartial if fields else Call, rows), next_cursor
     except APIError as e:
         raise e
 
@@ -31,6 +45,26 @@ def get_call_by_conv_id(conv_id: str) -> Optional[Call]:
         print(f"Error fetching call by conv_id {conv_id}: {e.message}")
         return None
 
+def get_call_transcript(conv_id: str) -> Optional[str]:
+    """
+    Retrieves a call's transcript: from the transcript store, or inline on
+    the call row for calls not migrated yet. Returns None if the call does
+    not exist, "" if it has no transcript. Raises TranscriptMissing if the
+    row records a transcript that the store does not have.
+    """
+    response = supabase.table("call").select("conv_id, transcript, transcript_chars").eq("conv_id", conv_id).limit(1).execute()
+    if not response.data:
+        return None
+    row = response.data[0]
+    if row.get("transcript"):
+        return row["transcript"]
+    if not row.get("transcript_chars"):
+        return ""
+    transcript = transcript_store.get_transcript(conv_id)
+    if transcript is None:
+        raise transcript_store.TranscriptMissing(conv_id)
+    return transcript
+
 def get_calls_by_customer_id(customer_id: str) -> List[Call]:
     """Retrieves all calls for a specific customer."""
     try:
@@ -55,6 +89,8 @@ def delete_call(conv_id: str) -> Optional[Call]:
     """Deletes a call from the database."""
     try:
         response = supabase.table("call").delete().eq("conv_id", conv_id).execute()
+        if response.data:
+            transcript_store.delete_transcript(conv_id)
         return Call(**response.data[0]) if response.data else None
     except APIError as e:
         raise e
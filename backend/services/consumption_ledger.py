@@ -0,0 +1,340 @@
+"""
+consumption_ledger.py
+---------------------
+Append-only ledger of what the business spends per call, WhatsApp message
+and PayU payment, with per-branch, per-day totals that GET /costs/summary
+reads instead of scanning the raw entries.
+
+Writers call one of the `record_*` helpers; it only appends to an in-memory
+batch and bumps the running totals for (branch, day, type), so it is cheap
+enough for webhook paths. A background thread flushes every
+CONSUMPTION_FLUSH_SECONDS (sooner once CONSUMPTION_BATCH_SIZE entries are
+waiting): one RPC inserts the batch into "Consumption" and adds the rows it
+actually inserted to `consumption_daily` in the same transaction. A failed
+flush keeps the batch for the next attempt.
+
+Summaries add this process's unflushed totals, so costs show up before they
+reach the database. While a flush is in flight its entries are in neither
+place, so a summary taken at that moment can briefly come up short; it never
+counts an entry twice.
+
+PayU retries webhooks, so PayU fees are unique per txnid: the partial index
+below makes the RPC skip a fee whose txnid is already recorded, and the
+daily totals only grow by inserted rows. Until the batch is flushed, a
+retried webhook does show up twice in this process's unflushed totals.
+
+Rupee costs come from configured rates; counts and ElevenLabs credits are
+always exact:
+    ELEVENLABS_RUPEES_PER_CREDIT   call cost = credits * rate
+    WHATSAPP_RUPEES_PER_MESSAGE    per template message sent
+    PAYU_FEE_PERCENT               of each successful payment's amount
+Entries without a branch (reminders, PayU) go to DEFAULT_BRANCH_ID.
+
+Schema (run once in Supabase):
+
+    alter table "Consumption"
+        alter column conv_id drop not null,
+        add column if not exists reference text,
+        add column if not exists occurred_at timestamptz not null default now();
+
+    create unique index if not exists consumption_payu_fee_txnid
+        on "Consumption" (reference) where consumption_type = 'payu_fee';
+
+    create table if not exists consumption_daily (
+        branch_id        int     not null,
+        day              date    not null,
+        consumption_type text    not null,
+        entries          bigint  not null default 0,
+        credits          numeric not null default 0,
+        cost_in_rupees   numeric not null default 0,
+        primary key (branch_id, day, consumption_type)
+    );
+
+    drop function if exists record_consumption_batch(jsonb, jsonb);
+
+    create or replace function record_consumption_batch(p_entries jsonb)
+    returns void language sql as $$
+        with inserted as (
+            insert into "Consumption" (branch_id, conv_id, follow_up_id, consumption_type,
+                                       credits_consumed, cost_in_rupees, reference, occurred_at)
+            select branch_id, conv_id, follow_up_id, consumption_type,
+                   credits_consumed, cost_in_rupees, reference, occurred_at
+            from jsonb_to_recordset(p_entries) as e(
+                branch_id int, conv_id text, follow_up_id int, consumption_type text,
+                credits_consumed numeric, cost_in_rupees numeric, reference text, occurred_at timestamptz)
+            on conflict do nothing
+            returning branch_id, occurred_at, consumption_type, credits_consumed, cost_in_rupees
+        )
+        insert into consumption_daily as d (branch_id, day, consumption_type, entries, credits, cost_in_rupees)
+        select branch_id, (occurred_at at time zone 'UTC')::date, consumption_type,
+               count(*), sum(credits_consumed), sum(cost_in_rupees)
+        from inserted
+        group by 1, 2, 3
+        on conflict (branch_id, day, consumption_type) do update set
+            entries = d.entries + excluded.entries,
+            credits = d.credits + excluded.credits,
+            cost_in_rupees = d.cost_in_rupees + excluded.cost_in_rupees;
+    $$;
+"""
+
+import os
+import logging
+import threading
+from datetime import UTC, date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from backend.config.supabase_client import supabase
+from backend.models.consumption_model import ConsumptionType
+from backend.utils.structured_logging import log_event
+
+logger = logging.getLogger(__name__)
+
+CONSUMPTION_FLUSH_SECONDS = float(os.getenv("CONSUMPTION_FLUSH_SECONDS", "30"))
+CONSUMPTION_BATCH_SIZE = int(os.getenv("CONSUMPTION_BATCH_SIZE", "200"))
+DEFAULT_BRANCH_ID = int(os.getenv("DEFAULT_BRANCH_ID", "1"))
+
+ELEVENLABS_RUPEES_PER_CREDIT = float(os.getenv("ELEVENLABS_RUPEES_PER_CREDIT", "0"))
+WHATSAPP_RUPEES_PER_MESSAGE = float(os.getenv("WHATSAPP_RUPEES_PER_MESSAGE", "0"))
+PAYU_FEE_PERCENT = float(os.getenv("PAYU_FEE_PERCENT", "0"))
+
+# Unflushed entries above this are kept but reported (the database is likely down)
+BACKLOG_WARNING_ENTRIES = 10000
+
+TotalsKey = Tuple[int, str, str]  # (branch_id, day, consumption_type)
+
+
+def _as_datetime(value: Union[datetime, str, None]) -> datetime:
+    if value is None:
+        return datetime.now(UTC)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value if value.tzinfo else value.replace(tzinfo=UTC)
+
+
+def _add(totals: Dict[TotalsKey, List[float]], key: TotalsKey, entries: float, credits: float, cost: float) -> None:
+    current = totals.get(key)
+    if current is None:
+        totals[key] = [entries, credits, cost]
+    else:
+        current[0] += entries
+        current[1] += credits
+        current[2] += cost
+
+
+class ConsumptionLedger:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: List[Dict[str, Any]] = []
+        self._totals: Dict[TotalsKey, List[float]] = {}
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Recording (any thread)
+    # ------------------------------------------------------------------
+
+    def record(
+        self,
+        consumption_type: str,
+        cost_in_rupees: float = 0.0,
+        credits_consumed: float = 0.0,
+        branch_id: Optional[int] = None,
+        conv_id: Optional[str] = None,
+        follow_up_id: Optional[int] = None,
+        reference: Optional[str] = None,
+        occurred_at: Union[datetime, str, None] = None,
+    ) -> None:
+        occurred = _as_datetime(occurred_at)
+        branch = branch_id if branch_id is not None else DEFAULT_BRANCH_ID
+        entry = {
+            "branch_id": branch,
+            "conv_id": conv_id,
+            "follow_up_id": follow_up_id,
+            "consumption_type": consumption_type,
+            "credits_consumed": credits_consumed,
+            "cost_in_rupees": round(cost_in_rupees, 4),
+            "reference": reference,
+            "occurred_at": occurred.isoformat(),
+        }
+        key = (branch, occurred.astimezone(UTC).date().isoformat(), consumption_type)
+        with self._lock:
+            self._pending.append(entry)
+            _add(self._totals, key, 1, credits_consumed, entry["cost_in_rupees"])
+            full = len(self._pending) >= CONSUMPTION_BATCH_SIZE
+        self._ensure_thread()
+        if full:
+            self._wake.set()
+
+    def record_call(self, conv_id: str, credits: Any, occurred_at: Union[datetime, str, None] = None) -> None:
+        credits = float(credits) if isinstance(credits, (int, float)) else 0.0
+        self.record(
+            ConsumptionType.ELEVEN_LABS.value,
+            cost_in_rupees=credits * ELEVENLABS_RUPEES_PER_CREDIT,
+            credits_consumed=credits,
+            conv_id=conv_id,
+            occurred_at=occurred_at,
+        )
+
+    def record_whatsapp_messages(self, count: int, reference: Optional[str] = None) -> None:
+        for _ in range(count):
+            self.record(ConsumptionType.WHATSAPP.value, cost_in_rupees=WHATSAPP_RUPEES_PER_MESSAGE, reference=reference)
+
+    def record_payu_fee(self, amount: Any, txnid: Optional[str] = None) -> None:
+        try:
+            amount = float(amount)
+        except (TypeError, ValueError):
+            amount = 0.0
+        self.record(ConsumptionType.PAYU_FEE.value, cost_in_rupees=amount * PAYU_FEE_PERCENT / 100, reference=txnid)
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    def flush(self) -> int:
+        """Write everything recorded so far; returns the number of entries written."""
+        with self._flush_lock:
+            with self._lock:
+                entries, self._pending = self._pending, []
+                totals, self._totals = self._totals, {}
+            if not entries:
+                return 0
+            try:
+                # The RPC derives the daily totals from the rows it inserts, skipping duplicates
+                supabase.rpc("record_consumption_batch", {"p_entries": entries}).execute()
+            except Exception:
+                with self._lock:
+                    self._pending[:0] = entries
+                    for key, (n, c, r) in totals.items():
+                        _add(self._totals, key, n, c, r)
+                    backlog = len(self._pending)
+                log_event(
+                    logger, logging.ERROR if backlog > BACKLOG_WARNING_ENTRIES else logging.WARNING,
+                    "consumption_flush_failed", exc_info=True, entries=len(entries), backlog=backlog,
+                )
+                return 0
+            log_event(logger, logging.INFO, "consumption_flushed", entries=len(entries), totals=len(totals))
+            return len(entries)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None or self._stopping.is_set():
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="consumption-ledger", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(CONSUMPTION_FLUSH_SECONDS)
+            self._wake.clear()
+            self.flush()
+
+    def stop(self) -> None:
+        """Stop the flush thread and write what is left (app shutdown)."""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=CONSUMPTION_FLUSH_SECONDS)
+        self.flush()
+
+    def unflushed_totals(self) -> Dict[TotalsKey, List[float]]:
+        """
+        Totals recorded in this process that no flush has picked up yet. A batch
+        being flushed is left out: it may already be committed, and counting it
+        here as well would add it twice.
+        """
+        with self._lock:
+            return {key: list(values) for key, values in self._totals.items()}
+
+
+consumption_ledger = ConsumptionLedger()
+
+
+# ================== SUMMARY ==================
+
+def _per(total: float, count: float) -> Optional[float]:
+    return round(total / count, 4) if count else None
+
+
+def count_bookings(start: date, end: date) -> int:
+    """Bookings created in [start, end]; an exact count, no rows transferred."""
+    response = (
+        supabase.table("bookings")
+        .select("booking_id", count="exact")
+        .gte("creation_time", start.isoformat())
+        .lt("creation_time", (end + timedelta(days=1)).isoformat())
+        .limit(1)
+        .execute()
+    )
+    return response.count or 0
+
+
+def get_cost_summary(start: date, end: date, branch_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Spend per consumption type and per day for [start, end], plus cost per
+    call and per booking. Reads consumption_daily (one row per branch, day and
+    type) and adds this process's unflushed totals.
+
+    Bookings have no branch, so cost_per_booking is only given for all
+    branches together.
+    """
+    query = (
+        supabase.table("consumption_daily")
+        .select("branch_id, day, consumption_type, entries, credits, cost_in_rupees")
+        .gte("day", start.isoformat())
+        .lte("day", end.isoformat())
+    )
+    if branch_id is not None:
+        query = query.eq("branch_id", branch_id)
+    rows = query.execute().data or []
+
+    totals: Dict[TotalsKey, List[float]] = {}
+    for row in rows:
+        _add(
+            totals, (row["branch_id"], row["day"], row["consumption_type"]),
+            row["entries"], float(row["credits"] or 0), float(row["cost_in_rupees"] or 0),
+        )
+    start_day, end_day = start.isoformat(), end.isoformat()
+    for key, (n, c, r) in consumption_ledger.unflushed_totals().items():
+        branch, day, _ = key
+        if start_day <= day <= end_day and (branch_id is None or branch == branch_id):
+            _add(totals, key, n, c, r)
+
+    by_type: Dict[str, Dict[str, float]] = {}
+    by_day: Dict[str, Dict[str, float]] = {}
+    for (_, day, consumption_type), (n, c, r) in totals.items():
+        t = by_type.setdefault(consumption_type, {"entries": 0, "credits": 0.0, "cost_in_rupees": 0.0})
+        t["entries"] += int(n)
+        t["credits"] += c
+        t["cost_in_rupees"] += r
+        d = by_day.setdefault(day, {"day": day, "cost_in_rupees": 0.0, "calls": 0})
+        d["cost_in_rupees"] += r
+        if consumption_type == ConsumptionType.ELEVEN_LABS.value:
+            d["calls"] += int(n)
+
+    total_cost = sum(t["cost_in_rupees"] for t in by_type.values())
+    calls = by_type.get(ConsumptionType.ELEVEN_LABS.value, {"entries": 0, "credits": 0.0, "cost_in_rupees": 0.0})
+    bookings = count_bookings(start, end) if branch_id is None else None
+
+    return {
+        "start_date": start_day,
+        "end_date": end_day,
+        "branch_id": branch_id,
+        "total_cost_in_rupees": round(total_cost, 2),
+        "by_type": {
+            k: {"entries": v["entries"], "credits": round(v["credits"], 2), "cost_in_rupees": round(v["cost_in_rupees"], 2)}
+            for k, v in sorted(by_type.items())
+        },
+        "calls": calls["entries"],
+        "cost_per_call": _per(calls["cost_in_rupees"], calls["entries"]),
+        "credits_per_call": _per(calls["credits"], calls["entries"]),
+        "bookings": bookings,
+        "cost_per_booking": _per(total_cost, bookings) if bookings is not None else None,
+        "by_day": [
+            {**d, "cost_in_rupees": round(d["cost_in_rupees"], 2)}
+            for _, d in sorted(by_day.items())
+        ],
+    }
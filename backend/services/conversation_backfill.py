@@ -0,0 +1,232 @@
+"""
+conversation_backfill.py
+------------------------
+Recovers calls whose post-call webhook never arrived (outages, bad deploys)
+by paging through the ElevenLabs conversation history.
+
+For each page of conversations (newest first):
+- conversations already stored are skipped using a set of conv_ids loaded
+  once at start (no per-conversation lookup);
+- the rest are fetched with bounded parallelism (--concurrency) while the
+  next page is already being listed;
+- each one goes through the same extraction and row building as the
+  webhook (services/call_ingest_service.py), and the page is written with
+  one bulk upsert into `call` and one insert into `call_analysis`;
+- each stored call is also recorded in the consumption ledger;
+- a checkpoint (next cursor + counters) is written after every page, so an
+  interrupted run resumes where it stopped.
+
+"Already stored" means present in `call_analysis`, the last table written:
+a call whose webhook died between the two inserts is repaired, not skipped.
+
+Run from the repo root:
+    python -m backend.services.conversation_backfill [--since 2025-10-01] [--agent-id ...]
+        [--concurrency 8] [--page-size 100] [--checkpoint backfill_checkpoint.json]
+        [--restart] [--dry-run]
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import UTC, datetime
+from typing import Any, Dict, List, Optional, Set
+
+from backend.config.eleven_labs import ElevenLabsClient
+from backend.config.supabase_client import supabase
+from backend.services.call_ingest_service import build_call_analysis_row, build_call_row, extract_call_analysis
+from backend.services.call_search_service import index_call
+from backend.services.consumption_ledger import consumption_ledger
+from backend.utils.structured_logging import log_event, setup_logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT = "backfill_checkpoint.json"
+ID_PRELOAD_BATCH = 1000
+
+
+# ================== STATE ==================
+
+def load_stored_ids() -> Set[str]:
+    """Every conv_id with a call_analysis row, read in keyset-ordered batches."""
+    ids: Set[str] = set()
+    last: Optional[str] = None
+    while True:
+        query = supabase.table("call_analysis").select("conv_id").order("conv_id")
+        if last is not None:
+            query = query.gt("conv_id", last)
+        rows = query.limit(ID_PRELOAD_BATCH).execute().data or []
+        ids.update(r["conv_id"] for r in rows)
+        if len(rows) < ID_PRELOAD_BATCH:
+            return ids
+        last = rows[-1]["conv_id"]
+
+
+def load_checkpoint(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    state["updated_at"] = datetime.now(UTC).isoformat()
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+# ================== PER CONVERSATION ==================
+
+def _call_time(conversation: Dict[str, Any]) -> str:
+    started = (conversation.get("metadata") or {}).get("start_time_unix_secs") or conversation.get("start_time_unix_secs")
+    if started:
+        return datetime.fromtimestamp(started, UTC).isoformat()
+    return datetime.now(UTC).isoformat()
+
+
+def fetch_rows(client: ElevenLabsClient, conv_id: str, dry_run: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Fetch one conversation and build its rows (None if it cannot be used).
+    Runs in a worker thread, so the transcript store write happens here too
+    (skipped on a dry run).
+    """
+    conversation = client.get_conversation(conv_id)
+    # Same shape as the webhook's "data" field
+    call_analysis = extract_call_analysis({"type": "post_call_transcription", "data": conversation})
+    if not call_analysis or not call_analysis.get("conv_id"):
+        return None
+    date_time = _call_time(conversation)
+    if dry_run:
+        return {"conv_id": call_analysis["conv_id"]}
+    return {
+        "conv_id": call_analysis["conv_id"],
+        "call": build_call_row(call_analysis, date_time),
+        "call_analysis": build_call_analysis_row(call_analysis),
+        "search": (call_analysis["conv_id"], date_time, call_analysis.get("summary"), call_analysis.get("transcript")),
+    }
+
+
+def write_page(results: List[Dict[str, Any]]) -> None:
+    supabase.table("call").upsert([r["call"] for r in results], on_conflict="conv_id").execute()
+    supabase.table("call_analysis").insert([r["call_analysis"] for r in results]).execute()
+    for r in results:
+        consumption_ledger.record_call(r["conv_id"], r["call"]["credits_consumed"], r["call"]["date_time"])
+        try:
+            index_call(*r["search"])
+        except Exception:
+            log_event(logger, logging.ERROR, "call_search_index_failed", exc_info=True, conversation_id=r["search"][0])
+
+
+# ================== RUN ==================
+
+def run_backfill(
+    checkpoint_path: str = DEFAULT_CHECKPOINT,
+    since: Optional[datetime] = None,
+    agent_id: Optional[str] = None,
+    concurrency: int = 8,
+    page_size: int = 100,
+    restart: bool = False,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    state = {} if restart else load_checkpoint(checkpoint_path)
+    if state.get("done"):
+        logger.info("Checkpoint says the backfill already finished; pass --restart to run again.")
+        return state
+    state.setdefault("cursor", None)
+    for counter in ("pages", "seen", "inserted", "skipped", "failed"):
+        state.setdefault(counter, 0)
+    state.setdefault("failed_ids", [])
+
+    client = ElevenLabsClient()
+    stored = load_stored_ids()
+    logger.info(f"Backfill: {len(stored)} conversations already stored; resuming from cursor {state['cursor']!r}.")
+    since_ts = since.timestamp() if since else None
+
+    def list_page(cursor: Optional[str]) -> Dict[str, Any]:
+        return client.list_conversations(agent_id=agent_id, page_size=page_size, cursor=cursor) or {}
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency + 1, thread_name_prefix="backfill") as pool:
+        page_future: Future = pool.submit(list_page, state["cursor"])
+        while True:
+            page = page_future.result()
+            conversations = page.get("conversations") or []
+            next_cursor = page.get("next_cursor") if page.get("has_more") else None
+            # Overlap listing the next page with fetching this one
+            if next_cursor:
+                page_future = pool.submit(list_page, next_cursor)
+
+            reached_since = False
+            todo: List[str] = []
+            for item in conversations:
+                if since_ts and (item.get("start_time_unix_secs") or 0) < since_ts:
+                    reached_since = True
+                    continue
+                conv_id = item.get("conversation_id")
+                state["seen"] += 1
+                if not conv_id or conv_id in stored or item.get("status") != "done":
+                    state["skipped"] += 1
+                    continue
+                todo.append(conv_id)
+
+            futures = {conv_id: pool.submit(fetch_rows, client, conv_id, dry_run) for conv_id in todo}
+            results = []
+            for conv_id, future in futures.items():
+                try:
+                    rows = future.result()
+                except Exception as e:
+                    rows = None
+                    logger.error(f"Backfill: fetching {conv_id} failed: {e}")
+                if rows is None:
+                    state["failed"] += 1
+                    state["failed_ids"].append(conv_id)
+                    continue
+                results.append(rows)
+
+            if results and not dry_run:
+                write_page(results)
+            stored.update(r["conv_id"] for r in results)
+            state["inserted"] += len(results)
+            state["pages"] += 1
+            state["cursor"] = next_cursor
+            state["done"] = not next_cursor or reached_since
+            if not dry_run:
+                save_checkpoint(checkpoint_path, state)
+
+            log_event(
+                logger, logging.INFO, "conversation_backfill_page",
+                page=state["pages"], inserted=len(results), seen=state["seen"],
+                total_inserted=state["inserted"], elapsed_s=round(time.perf_counter() - started, 1),
+            )
+            if state["done"]:
+                consumption_ledger.flush()
+                return state
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill calls missed by the ElevenLabs post-call webhook.")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Stop at conversations older than this (ISO date).")
+    parser.add_argument("--agent-id", help="Only this agent's conversations.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Conversations fetched in parallel.")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint.")
+    parser.add_argument("--dry-run", action="store_true", help="Fetch and extract, but write nothing.")
+    args = parser.parse_args()
+
+    setup_logging()
+    since = args.since.replace(tzinfo=args.since.tzinfo or UTC) if args.since else None
+    result = run_backfill(
+        checkpoint_path=args.checkpoint,
+        since=since,
+        agent_id=args.agent_id,
+        concurrency=args.concurrency,
+        page_size=args.page_size,
+        restart=args.restart,
+        dry_run=args.dry_run,
+    )
+    print(json.dumps({k: v for k, v in result.items() if k != "failed_ids"}, indent=2))
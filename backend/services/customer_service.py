@@ -1,8 +1,18 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from postgrest import APIResponse
 from datetime import datetime
 from backend.config.supabase_client import supabase
 from backend.models.customer_model import CustomerCreate, CustomerUpdate
+from backend.services import event_service, lead_service
+from backend.utils.db_utils import decode_cursor, encode_cursor, keyset_page
+
+# One thread per query on the customers page: three list pages, then four lookups
+_page_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="customers-page")
+# Values per in_() filter, which keeps the request URL short
+IN_FILTER_CHUNK = 200
+# Rows per request when reading lookup results (PostgREST's default max-rows)
+LOOKUP_PAGE_SIZE = 1000
 
 def create_customer(customer: CustomerCreate) -> Dict[str, Any]:
     customer_dict = customer.model_dump(by_alias=True)
@@ -23,6 +33,142 @@ def get_all_customers(skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
         return response.data
     return []
 
+def get_customers_page(limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Retrieves one page of customers, newest first, plus the cursor for the next page."""
+    return keyset_page(supabase.table("customers").select("*"), "customer_since", "customer_id", limit, cursor)
+
+def _email_key(row: Dict[str, Any]) -> Optional[str]:
+    email = row.get("email")
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+def _email_variants(rows: List[Dict[str, Any]]) -> List[str]:
+    """Emails of `rows` as stored and lower-cased, for an exact in_() match."""
+    emails: Dict[str, None] = {}
+    for row in rows:
+        email = row.get("email")
+        if isinstance(email, str) and email.strip():
+            emails[email.strip()] = None
+            emails[email.strip().lower()] = None
+    return list(emails)
+
+def _rows_in(table: str, columns: str, column: str, values: List[Any], order: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    """
+    All rows of `table` whose `column` is one of `values`, newest first by
+    `order` within each chunk of values. Reads past PostgREST's row cap.
+    """
+    rows: List[Dict[str, Any]] = []
+    for i in range(0, len(values), IN_FILTER_CHUNK):
+        query = supabase.table(table).select(columns).in_(column, values[i:i + IN_FILTER_CHUNK])
+        for order_column in order:
+            query = query.order(order_column, desc=True)
+        start = 0
+        while True:
+            batch = query.range(start, start + LOOKUP_PAGE_SIZE - 1).execute().data or []
+            rows.extend(batch)
+            if len(batch) < LOOKUP_PAGE_SIZE:
+                break
+            start += LOOKUP_PAGE_SIZE
+    return rows
+
+def join_customer_records(
+    customers: List[Dict[str, Any]],
+    leads: List[Dict[str, Any]],
+    events: List[Dict[str, Any]],
+    customer_events: List[Dict[str, Any]],
+    customer_leads: List[Dict[str, Any]],
+    other_customers: List[Dict[str, Any]],
+) -> None:
+    """
+    Link the three page lists in place, using rows looked up for them, so a
+    match does not depend on both sides landing on the same page:
+    - each customer gets `event_ids` and `event_count` (from `customer_events`,
+      all events with its customer_id) and `lead_id` (the newest lead in
+      `customer_leads` with the same email);
+    - each event gets `customer_name` and each lead gets `customer_id`, looked
+      up among `customers` and `other_customers`.
+    customer_id is text on customers and an integer on events, so keys are
+    compared as strings.
+    """
+    by_id: Dict[str, Dict[str, Any]] = {}
+    for customer in customers:
+        customer["event_ids"] = []
+        customer["lead_id"] = None
+        by_id[str(customer.get("customer_id"))] = customer
+
+    for event in customer_events:
+        customer = by_id.get(str(event.get("customer_id")))
+        if customer:
+            customer["event_ids"].append(event.get("event_id"))
+
+    by_email: Dict[str, Dict[str, Any]] = {}
+    for customer in customers:
+        email = _email_key(customer)
+        if email:
+            by_email.setdefault(email, customer)
+    for lead in customer_leads:
+        email = _email_key(lead)
+        customer = by_email.get(email) if email else None
+        if customer and customer["lead_id"] is None:
+            customer["lead_id"] = lead.get("lead_id")
+
+    for customer in other_customers:
+        by_id.setdefault(str(customer.get("customer_id")), customer)
+        email = _email_key(customer)
+        if email:
+            by_email.setdefault(email, customer)
+
+    for event in events:
+        customer = by_id.get(str(event.get("customer_id")))
+        event["customer_name"] = customer.get("name") if customer else None
+
+    for lead in leads:
+        email = _email_key(lead)
+        customer = by_email.get(email) if email else None
+        lead["customer_id"] = customer.get("customer_id") if customer else None
+
+    for customer in customers:
+        customer["event_count"] = len(customer["event_ids"])
+
+def get_customers_page_data(limit: int = 100, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Everything the customers page shows, in one call: a page each of
+    customers, leads and events (fetched concurrently), joined on customer id
+    and email. The join looks the matching rows up in the database (by
+    customer id, and by email as stored or lower-cased), not just within the
+    other two pages. `next_cursor` packs the three list cursors; a list that
+    has no more pages comes back empty on later pages. Raises InvalidCursor.
+    """
+    cursors: List[Optional[str]] = decode_cursor(cursor, 3) if cursor else [None, None, None]
+    fetchers = (get_customers_page, lead_service.get_leads_page, event_service.get_events_page)
+
+    futures = []
+    for fetch, list_cursor in zip(fetchers, cursors):
+        # On later pages a None cursor means that list is already exhausted
+        futures.append(_page_pool.submit(fetch, limit=limit, cursor=list_cursor) if list_cursor or not cursor else None)
+    (customers, customers_next), (leads, leads_next), (events, events_next) = [
+        future.result() if future else ([], None) for future in futures
+    ]
+
+    # events.customer_id is an integer, so only numeric customer ids can match
+    customer_ids = [str(c["customer_id"]) for c in customers if str(c.get("customer_id")).isdigit()]
+    event_customer_ids = list({str(e["customer_id"]) for e in events if e.get("customer_id") is not None})
+    lookups = [
+        _page_pool.submit(_rows_in, "events", "event_id, customer_id", "customer_id", customer_ids, ("event_id",)),
+        _page_pool.submit(_rows_in, "leads", "lead_id, email", "email", _email_variants(customers), ("created_at", "lead_id")),
+        _page_pool.submit(_rows_in, "customers", "customer_id, name, email", "customer_id", event_customer_ids, ("customer_id",)),
+        _page_pool.submit(_rows_in, "customers", "customer_id, name, email", "email", _email_variants(leads), ("customer_since", "customer_id")),
+    ]
+    customer_events, customer_leads, event_customers, lead_customers = [future.result() for future in lookups]
+
+    join_customer_records(customers, leads, events, customer_events, customer_leads, event_customers + lead_customers)
+    next_cursors = [customers_next, leads_next, events_next]
+    return {
+        "customers": customers,
+        "leads": leads,
+        "events": events,
+        "next_cursor": encode_cursor(next_cursors) if any(next_cursors) else None,
+    }
+
 def update_customer(customer_id: str, customer_update: CustomerUpdate) -> Optional[Dict[str, Any]]:
     update_data = customer_update.model_dump(exclude_unset=True)
     response: APIResponse = supabase.table("customers").update(update_data).eq("customer_id", customer_id).execute()
@@ -1,7 +1,11 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from collections import defaultdict
 from enum import Enum
-from typing import Optional, Tuple
+from typing import Dict, Optional, Sequence, Tuple
 from zoneinfo import ZoneInfo
 
 from backend.config.supabase_client import supabase
@@ -124,3 +128,62 @@ def get_overview(time_range: TimePeriod = TimePeriod.all_time):
         "sentiment_summary": get_sentiment_summary(time_range),
         "call_intent": get_call_intent_summary(time_range),
     }
+
+# ------------------------------------------------------------
+# 6️⃣ DATA VERSION (FOR ETAG / 304 ON POLLED ENDPOINTS)
+# ------------------------------------------------------------
+# (table, timestamp column) pairs the overview and KPI endpoints aggregate.
+# call_analysis rows are written together with their call row, so call covers both.
+ANALYTICS_SOURCES: Tuple[Tuple[str, str], ...] = (
+    ("call", "date_time"),
+    ("bookings", "creation_time"),
+    ("leads", "created_at"),
+    ("payment", "creation_time"),
+    ("customers", "customer_since"),
+)
+CALL_SOURCES: Tuple[Tuple[str, str], ...] = (("call", "date_time"),)
+
+# Polls within this window share one lookup
+DATA_VERSION_TTL_SECONDS = float(os.getenv("DATA_VERSION_TTL_SECONDS", "5"))
+# Edits that leave the timestamps alone (e.g. a booking status change) show up within this window
+DATA_VERSION_MAX_STALENESS_SECONDS = int(os.getenv("DATA_VERSION_MAX_STALENESS_SECONDS", "300"))
+
+_version_cache: Dict[Tuple[Tuple[str, str], ...], Tuple[float, str]] = {}
+_version_lock = threading.Lock()
+_version_pool = ThreadPoolExecutor(max_workers=len(ANALYTICS_SOURCES), thread_name_prefix="data-version")
+
+
+def _latest_timestamp(table: str, column: str) -> Optional[str]:
+    resp = (
+        supabase.table(table)
+        .select(column)
+        .not_.is_(column, "null")
+        .order(column, desc=True)
+        .limit(1)
+        .execute()
+    )
+    return resp.data[0][column] if resp.data else None
+
+
+def get_data_version(sources: Sequence[Tuple[str, str]] = ANALYTICS_SOURCES) -> str:
+    """
+    Cheap version token for the data behind an analytics endpoint: the newest
+    timestamp of each source table (one indexed single-row read each, run
+    concurrently), plus a coarse time bucket. Cached for DATA_VERSION_TTL_SECONDS.
+    """
+    key = tuple(sources)
+    now = time.monotonic()
+    cached = _version_cache.get(key)
+    if cached and now - cached[0] < DATA_VERSION_TTL_SECONDS:
+        return cached[1]
+
+    with _version_lock:
+        cached = _version_cache.get(key)
+        if cached and now - cached[0] < DATA_VERSION_TTL_SECONDS:
+            return cached[1]
+        latest = list(_version_pool.map(lambda source: _latest_timestamp(*source), key))
+        bucket = int(time.time() // DATA_VERSION_MAX_STALENESS_SECONDS)
+        version = "|".join(str(v) for v in latest) + f"|{bucket}"
+        _version_cache[key] = (time.monotonic(), version)
+        return version
+
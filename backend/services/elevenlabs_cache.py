@@ -0,0 +1,106 @@
+"""
+elevenlabs_cache.py
+-------------------
+In-process cache for ElevenLabs agent and knowledge-base reads.
+
+The agents and knowledge-base tabs re-request the same listings on every
+render, and each one was a round trip to ElevenLabs. Reads now go through
+`cached_call()`:
+- a hit is served from memory for ELEVENLABS_CACHE_TTL_SECONDS;
+- concurrent misses for the same key share one SDK call;
+- the SDK call runs in a worker thread, never on the event loop.
+
+Writes made through this API keep the cache correct: the routes call
+`invalidate()` for the affected kind (and `store()` when the write returns the
+new object, e.g. an agent update). A fetch that was in flight while an
+invalidation happened is returned to its caller but not cached. Changes made
+elsewhere (the ElevenLabs dashboard, another worker process) show up after
+the TTL.
+
+Keys are tuples whose first element is the kind:
+    ("agents", page_size, cursor)   ("agent", agent_id)
+    ("kb_docs", page_size, cursor)  ("kb_doc", document_id)
+"""
+
+import os
+import time
+import asyncio
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+ELEVENLABS_CACHE_TTL_SECONDS = float(os.getenv("ELEVENLABS_CACHE_TTL_SECONDS", "300"))
+# Listings and single objects; keeps memory bounded if many cursors are requested
+ELEVENLABS_CACHE_MAX_ENTRIES = 512
+
+Key = Tuple[Hashable, ...]
+
+_entries: Dict[Key, Tuple[float, Any]] = {}
+_generations: Dict[Hashable, int] = {}
+_inflight: Dict[Key, "asyncio.Future[Any]"] = {}
+
+
+def _fresh(key: Key) -> Tuple[bool, Any]:
+    entry = _entries.get(key)
+    if entry is None:
+        return False, None
+    stored_at, value = entry
+    if time.monotonic() - stored_at > ELEVENLABS_CACHE_TTL_SECONDS:
+        _entries.pop(key, None)
+        return False, None
+    return True, value
+
+
+def store(key: Key, value: Any) -> None:
+    if len(_entries) >= ELEVENLABS_CACHE_MAX_ENTRIES:
+        # Drop the oldest entry (dicts keep insertion order)
+        _entries.pop(next(iter(_entries)))
+    _entries[key] = (time.monotonic(), value)
+
+
+def invalidate(*kinds: Hashable, key: Optional[Key] = None) -> None:
+    """Drop every entry of the given kinds, plus one exact `key`."""
+    for kind in kinds:
+        _generations[kind] = _generations.get(kind, 0) + 1
+        for cached_key in [k for k in _entries if k[0] == kind]:
+            _entries.pop(cached_key, None)
+    if key is not None:
+        _generations[key[0]] = _generations.get(key[0], 0) + 1
+        _entries.pop(key, None)
+
+
+async def cached_call(key: Key, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """`fn(*args, **kwargs)` in a thread, cached under `key`."""
+    hit, value = _fresh(key)
+    if hit:
+        return value
+
+    pending = _inflight.get(key)
+    if pending is not None:
+        try:
+            return await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            # Only our own cancellation propagates; if the request we were
+            # waiting on was cancelled instead, start over (and maybe lead)
+            if not pending.cancelled() or asyncio.current_task().cancelling():
+                raise
+        return await cached_call(key, fn, *args, **kwargs)
+
+    generation = _generations.get(key[0], 0)
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        value = await asyncio.to_thread(fn, *args, **kwargs)
+    except Exception as e:
+        future.set_exception(e)
+        # Mark retrieved so an error with no other waiters is not reported as unhandled
+        future.exception()
+        raise
+    else:
+        future.set_result(value)
+        if _generations.get(key[0], 0) == generation:
+            store(key, value)
+        return value
+    finally:
+        _inflight.pop(key, None)
+        if not future.done():
+            # This request was cancelled; its waiters fetch for themselves
+            future.cancel()
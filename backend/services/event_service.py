@@ -2,12 +2,13 @@ from typing import List, Optional
 from postgrest import APIError
 
 from backend.config.supabase_client import supabase
+from backend.utils.db_utils import keyset_page
 from backend.models.event_model import Event, EventCreate, EventUpdate
 
 
 # file: services/event_service.py
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from postgrest import APIResponse
 
 def create_event(event: EventCreate) -> Dict[str, Any]:
@@ -25,10 +26,15 @@ def get_event_by_id(event_id: int) -> Dict[str, Any] | None:
     return response.data if response.data else None
 
 def get_all_events(skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
-    """Retrieves a list of all events with pagination."""
-    response: APIResponse = supabase.table("events").select("*").range(skip, skip + limit - 1).execute()
+    """Retrieves a list of all events with pagination, newest first (same order as get_events_page)."""
+    response: APIResponse = supabase.table("events").select("*").order("event_id", desc=True).range(skip, skip + limit - 1).execute()
     return response.data if response.data else []
 
+def get_events_page(limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Retrieves one page of events, newest first, plus the cursor for the next page."""
+    # events has no creation timestamp; the serial event_id gives the same order
+    return keyset_page(supabase.table("events").select("*"), None, "event_id", limit, cursor)
+
 def update_event(event_id: int, event_update: EventUpdate) -> Dict[str, Any] | None:
     """Updates an existing event's information."""
     update_data = event_update.model_dump(by_alias=True, exclude_unset=True,mode="json")
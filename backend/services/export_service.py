@@ -0,0 +1,127 @@
+"""
+export_service.py
+-----------------
+Bulk export of the main tables as NDJSON or CSV.
+
+Rows are read with keyset pagination (see backend/utils/db_utils.py) and
+encoded page by page, so memory stays constant no matter how many rows the
+table holds.
+"""
+
+import csv
+import io
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from backend.config.supabase_client import supabase
+from backend.models.booking_model import Booking
+from backend.models.call_analysis_model import CallAnalysis
+from backend.models.call_model import Call
+from backend.models.lead_model import Lead
+from backend.models.payment_model import Payment
+from backend.utils.db_utils import keyset_page, select_columns
+from backend.utils.response_handlers import dumps
+
+EXPORT_PAGE_SIZE = 1000
+
+
+class ExportDataset(str, Enum):
+    calls = "calls"
+    call_analysis = "call_analysis"
+    bookings = "bookings"
+    payments = "payments"
+    leads = "leads"
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class ExportSpec:
+    def __init__(self, table: str, model: Type[BaseModel], date_column: Optional[str], key_column: str):
+        self.table = table
+        self.model = model
+        self.date_column = date_column  # None: no timestamp column, date filters unsupported
+        self.key_column = key_column
+
+    @property
+    def required_columns(self) -> Tuple[str, ...]:
+        return tuple(c for c in (self.date_column, self.key_column) if c)
+
+
+EXPORTS: Dict[ExportDataset, ExportSpec] = {
+    ExportDataset.calls: ExportSpec("call", Call, "date_time", "conv_id"),
+    ExportDataset.call_analysis: ExportSpec("call_analysis", CallAnalysis, None, "analysis_id"),
+    ExportDataset.bookings: ExportSpec("bookings", Booking, "creation_time", "booking_id"),
+    ExportDataset.payments: ExportSpec("payment", Payment, "creation_time", "payment_id"),
+    ExportDataset.leads: ExportSpec("leads", Lead, "created_at", "lead_id"),
+}
+
+
+def iter_rows(
+    spec: ExportSpec,
+    columns: Optional[List[str]] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    page_size: int = EXPORT_PAGE_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """Yields matching rows, newest first, one keyset page at a time."""
+    cursor = None
+    while True:
+        query = supabase.table(spec.table).select(select_columns(columns))
+        if date_from:
+            query = query.gte(spec.date_column, date_from.isoformat())
+        if date_to:
+            query = query.lt(spec.date_column, date_to.isoformat())
+        rows, cursor = keyset_page(query, spec.date_column, spec.key_column, page_size, cursor)
+        yield from rows
+        if not cursor:
+            return
+
+
+def encode_ndjson(rows: Iterator[Dict[str, Any]], page_size: int = EXPORT_PAGE_SIZE) -> Iterator[bytes]:
+    chunk: List[bytes] = []
+    for row in rows:
+        chunk.append(dumps(row))
+        if len(chunk) >= page_size:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return dumps(value).decode("utf-8")
+    return value
+
+
+def encode_csv(
+    rows: Iterator[Dict[str, Any]],
+    columns: Optional[List[str]] = None,
+    page_size: int = EXPORT_PAGE_SIZE,
+) -> Iterator[bytes]:
+    """CSV with a header row; without explicit columns the first row's keys are used."""
+    buffer = io.StringIO()
+    writer = None
+    count = 0
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=columns or list(row), extrasaction="ignore", restval="")
+            writer.writeheader()
+        writer.writerow({k: _csv_value(v) for k, v in row.items()})
+        count += 1
+        if count % page_size == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if writer is None and columns:
+        csv.writer(buffer).writerow(columns)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
@@ -1,9 +1,10 @@
 # file: services/lead_service.py
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from postgrest import APIResponse
 
 from backend.config.supabase_client import supabase
+from backend.utils.db_utils import keyset_page, select_columns
 from backend.models.lead_model import LeadCreate,LeadUpdate
 
 def create_lead(lead: LeadCreate) -> Dict[str, Any]:
@@ -15,16 +16,27 @@ def create_lead(lead: LeadCreate) -> Dict[str, Any]:
         return response.data[0]
     raise Exception("Could not create lead.")
 
-def get_lead_by_id(lead_id: int) -> Dict[str, Any] | None:
+def get_lead_by_id(lead_id: int, fields: Optional[List[str]] = None) -> Dict[str, Any] | None:
     """Retrieves a single lead by their ID."""
-    response: APIResponse = supabase.table("leads").select("*").eq("lead_id", lead_id).single().execute()
+    response: APIResponse = supabase.table("leads").select(select_columns(fields)).eq("lead_id", lead_id).single().execute()
     return response.data if response.data else None
 
-def get_all_leads(skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
-    """Retrieves a list of all leads with pagination."""
-    response: APIResponse = supabase.table("leads").select("*").range(skip, skip + limit - 1).execute()
+def get_all_leads(skip: int = 0, limit: int = 100, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Retrieves a list of all leads with pagination, newest first (same order as get_leads_page)."""
+    response: APIResponse = (
+        supabase.table("leads").select(select_columns(fields))
+        .order("created_at", desc=True).order("lead_id", desc=True)
+        .range(skip, skip + limit - 1).execute()
+    )
     return response.data if response.data else []
 
+def get_leads_page(
+    limit: int = 100, cursor: Optional[str] = None, fields: Optional[List[str]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Retrieves one page of leads, newest first, plus the cursor for the next page."""
+    query = supabase.table("leads").select(select_columns(fields))
+    return keyset_page(query, "created_at", "lead_id", limit, cursor)
+
 def update_lead(lead_id: int, lead_update: LeadUpdate) -> Dict[str, Any] | None:
     """Updates an existing lead's information."""
     update_data = lead_update.model_dump(by_alias=True, exclude_unset=True,mode="json")
@@ -0,0 +1,185 @@
+"""
+live_dashboard_service.py
+-------------------------
+One shared KPI snapshot per time range, pushed to every open dashboard over
+server-sent events (GET /api/dashboard/stream).
+
+Writers call `notify_data_changed()` after they change analytics data
+(post-call webhook, Bookeo syncs, booking CRUD). Bursts are debounced, then
+each time range that has at least one subscriber is recomputed once and
+only the sections that changed are sent as a "delta" event. N open
+dashboards cost one computation instead of N polls.
+
+Snapshots are also refreshed every LIVE_REFRESH_SECONDS while anyone is
+subscribed. That covers writes made by other processes (another worker,
+Supabase directly) and rolling windows like "today" moving on.
+
+Sections are registered by name with a builder `fn(period) -> dict`
+(see routers/dashboard_router.py), so this module does not depend on routers.
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from backend.services.dashboard_service import TimePeriod
+
+logger = logging.getLogger(__name__)
+
+# Coalesce a burst of writes into one recompute
+LIVE_DEBOUNCE_SECONDS = float(os.getenv("LIVE_DEBOUNCE_SECONDS", "1.0"))
+# Recompute even without notifications, while anyone is subscribed
+LIVE_REFRESH_SECONDS = float(os.getenv("LIVE_REFRESH_SECONDS", "60"))
+# Events buffered per client; a client that falls further behind gets a full snapshot instead
+SUBSCRIBER_QUEUE_SIZE = 16
+
+Event = Tuple[str, int, Dict[str, Any]]  # (event name, version, data)
+
+
+def diff_snapshot(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Changed second-level entries, e.g. {"overview": {"calls_trend": {...}}}."""
+    delta: Dict[str, Any] = {}
+    for section, value in new.items():
+        previous = old.get(section)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            changed = {k: v for k, v in value.items() if previous.get(k) != v}
+            if changed:
+                delta[section] = changed
+        elif previous != value:
+            delta[section] = value
+    return delta
+
+
+class _Subscriber:
+    __slots__ = ("period", "queue")
+
+    def __init__(self, period: TimePeriod):
+        self.period = period
+        self.queue: "asyncio.Queue[Event]" = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+
+class LiveDashboardHub:
+    def __init__(self):
+        self._builders: Dict[str, Callable[[TimePeriod], Dict[str, Any]]] = {}
+        self._snapshots: Dict[TimePeriod, Dict[str, Any]] = {}
+        self._versions: Dict[TimePeriod, int] = {}
+        self._subscribers: Set[_Subscriber] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dirty: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._period_locks: Dict[TimePeriod, asyncio.Lock] = {}
+        self._state_lock = threading.Lock()
+
+    def register(self, section: str, builder: Callable[[TimePeriod], Dict[str, Any]]) -> None:
+        self._builders[section] = builder
+
+    # ------------------------------------------------------------------
+    # Change notifications (any thread)
+    # ------------------------------------------------------------------
+
+    def notify_data_changed(self, source: str = "") -> None:
+        """Schedule a recompute; cheap and a no-op when nobody is subscribed."""
+        with self._state_lock:
+            loop, dirty = self._loop, self._dirty
+        if loop is None or dirty is None or not self._subscribers:
+            return
+        logger.debug(f"Live dashboard: data changed ({source or 'unknown'}).")
+        try:
+            loop.call_soon_threadsafe(dirty.set)
+        except RuntimeError:
+            pass  # loop already closed (shutdown)
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def _build(self, period: TimePeriod) -> Dict[str, Any]:
+        return {section: builder(period) for section, builder in self._builders.items()}
+
+    async def _refresh(self, period: TimePeriod, only_if_missing: bool = False) -> Optional[Dict[str, Any]]:
+        """Recompute one period off the event loop; returns the delta (None if unchanged)."""
+        lock = self._period_locks.setdefault(period, asyncio.Lock())
+        async with lock:
+            if only_if_missing and period in self._snapshots:
+                return None
+            snapshot = await asyncio.to_thread(self._build, period)
+            previous = self._snapshots.get(period)
+            self._snapshots[period] = snapshot
+            if previous is None:
+                self._versions[period] = 1
+                return None
+            delta = diff_snapshot(previous, snapshot)
+            if delta:
+                self._versions[period] += 1
+                return delta
+            return None
+
+    async def snapshot(self, period: TimePeriod) -> Tuple[int, Dict[str, Any]]:
+        if period not in self._snapshots:
+            await self._refresh(period, only_if_missing=True)
+        return self._versions[period], self._snapshots[period]
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            with self._state_lock:
+                self._loop = asyncio.get_running_loop()
+                self._dirty = asyncio.Event()
+            self._worker = asyncio.create_task(self._run(), name="live-dashboard")
+
+    def subscribe(self, period: TimePeriod) -> _Subscriber:
+        self._ensure_worker()
+        subscriber = _Subscriber(period)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: _Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    def _publish(self, period: TimePeriod, event: Event) -> None:
+        for subscriber in list(self._subscribers):
+            if subscriber.period != period:
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too far behind for deltas to be useful: replace the backlog with the full state
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait(("snapshot", self._versions[period], self._snapshots[period]))
+
+    async def _run(self) -> None:
+        """Background task: wait for a change (or the refresh interval), then recompute subscribed periods."""
+        while True:
+            try:
+                await asyncio.wait_for(self._dirty.wait(), timeout=LIVE_REFRESH_SECONDS)
+                await asyncio.sleep(LIVE_DEBOUNCE_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._dirty.clear()
+
+            periods = {s.period for s in self._subscribers}
+            if not periods:
+                # Nobody listening: drop the snapshots so the next subscriber gets fresh data
+                self._snapshots.clear()
+                continue
+            for period in periods:
+                try:
+                    delta = await self._refresh(period)
+                except Exception as e:
+                    logger.error(f"Live dashboard: refresh of {period.value} failed: {e}")
+                    continue
+                if delta:
+                    self._publish(period, ("delta", self._versions[period], delta))
+
+
+live_dashboard = LiveDashboardHub()
+
+
+def notify_data_changed(source: str = "") -> None:
+    live_dashboard.notify_data_changed(source)
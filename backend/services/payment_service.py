@@ -1,8 +1,9 @@
 # backend/services/payment_service.py
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from postgrest import APIError
 from backend.config.supabase_client import supabase
+from backend.utils.db_utils import keyset_page
 from backend.models.payment_model import PaymentCreate, PaymentUpdate, Payment
 
 payment_table = "payment"
@@ -20,6 +21,7 @@ def get_all_payments(skip: int = 0, limit: int = 100) -> List[Payment]:
         .table(payment_table)
         .select("*")
         .order("creation_time", desc=True)
+        .order("payment_id", desc=True)
         .range(skip, skip + limit - 1)
         .execute()
     )
@@ -27,6 +29,16 @@ def get_all_payments(skip: int = 0, limit: int = 100) -> List[Payment]:
         raise APIError(resp.get("error", {}))
     return [Payment(**row) for row in resp.data or []]
 
+def get_payments_page(limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[Payment], Optional[str]]:
+    rows, next_cursor = keyset_page(
+        supabase.table(payment_table).select("*"),
+        "creation_time",
+        "payment_id",
+        limit,
+        cursor,
+    )
+    return [Payment(**row) for row in rows], next_cursor
+
 def get_payment_by_id(payment_id: str) -> Optional[Payment]:
     resp = (
         supabase
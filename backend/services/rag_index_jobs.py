@@ -0,0 +1,277 @@
+"""
+rag_index_jobs.py
+-----------------
+Background RAG index computation for knowledge-base documents.
+
+Building an index takes ElevenLabs anywhere from seconds to many minutes, so
+routes no longer wait on it. `rag_index_jobs.submit()` returns a job at once
+and a background task:
+- triggers the build (`compute_rag_index`), then keeps calling it, which
+  returns the current status, with exponential backoff between polls
+  (RAG_POLL_INITIAL_SECONDS doubling up to RAG_POLL_MAX_SECONDS) until
+  the status is terminal or RAG_JOB_TIMEOUT_SECONDS has passed since the
+  job started running (time queued behind the concurrency limit is logged
+  separately and does not count);
+- retries transient ElevenLabs errors up to RAG_JOB_MAX_ERRORS in a row;
+- drops the cached document afterwards so its new index status is visible.
+
+At most RAG_JOB_CONCURRENCY jobs talk to ElevenLabs at a time; batches just
+queue behind the limit. Submitting a document/model pair that already has an
+unfinished job returns that job instead of starting a second one.
+
+Clients poll GET .../jobs/{job_id} (or .../batches/{batch_id}), or subscribe
+to the matching /events stream, which sends a "job" event for every change
+and closes once all its jobs have finished.
+
+Jobs live in this process's memory, like the ElevenLabs cache: finished jobs
+are kept for RAG_JOB_RETENTION_SECONDS, and with several workers a job is
+visible only on the worker that accepted it.
+"""
+
+import os
+import time
+import uuid
+import random
+import asyncio
+import logging
+from datetime import UTC, datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from backend.config.eleven_labs import ElevenLabsClient, ElevenLabsError
+from backend.services import elevenlabs_cache
+from backend.utils.structured_logging import log_event
+
+logger = logging.getLogger(__name__)
+
+RAG_JOB_CONCURRENCY = int(os.getenv("RAG_JOB_CONCURRENCY", "4"))
+RAG_POLL_INITIAL_SECONDS = float(os.getenv("RAG_POLL_INITIAL_SECONDS", "2"))
+RAG_POLL_MAX_SECONDS = float(os.getenv("RAG_POLL_MAX_SECONDS", "30"))
+RAG_JOB_TIMEOUT_SECONDS = float(os.getenv("RAG_JOB_TIMEOUT_SECONDS", "1800"))
+RAG_JOB_RETENTION_SECONDS = float(os.getenv("RAG_JOB_RETENTION_SECONDS", "3600"))
+# Consecutive failed ElevenLabs calls before a job gives up
+RAG_JOB_MAX_ERRORS = 3
+# Largest batch accepted in one request
+RAG_BATCH_MAX_DOCUMENTS = 200
+
+# ElevenLabs index statuses after which polling stops; only "succeeded" is a success
+TERMINAL_STATUSES = {"succeeded", "failed", "rag_limit_exceeded", "document_too_small", "cannot_index_folder"}
+FINISHED_STATES = {"succeeded", "failed"}
+
+
+def _now() -> str:
+    return datetime.now(UTC).isoformat()
+
+
+class _Job:
+    __slots__ = (
+        "id", "document_id", "model", "batch_id", "state", "rag_status", "progress",
+        "error", "result", "created_at", "updated_at", "finished_at", "version",
+    )
+
+    def __init__(self, document_id: str, model: str, batch_id: Optional[str]):
+        self.id = uuid.uuid4().hex
+        self.document_id = document_id
+        self.model = model
+        self.batch_id = batch_id
+        self.state = "queued"  # queued -> running -> succeeded | failed
+        self.rag_status: Optional[str] = None
+        self.progress: Optional[float] = None
+        self.error: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.created_at = self.updated_at = _now()
+        self.finished_at: Optional[float] = None  # monotonic, for retention
+        self.version = 1
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "document_id": self.document_id,
+            "model": self.model,
+            "batch_id": self.batch_id,
+            "state": self.state,
+            "rag_status": self.rag_status,
+            "progress_percentage": self.progress,
+            "error": self.error,
+            "result": self.result,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class _Watcher:
+    __slots__ = ("job_ids", "queue")
+
+    def __init__(self, job_ids: Iterable[str]):
+        self.job_ids = set(job_ids)
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+
+class RagIndexJobs:
+    def __init__(self):
+        self._jobs: Dict[str, _Job] = {}
+        self._batches: Dict[str, List[str]] = {}
+        self._active: Dict[tuple, str] = {}  # (document_id, model) -> unfinished job id
+        self._watchers: Set[_Watcher] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+
+    def submit(self, client: ElevenLabsClient, document_id: str, model: str, batch_id: Optional[str] = None) -> Dict[str, Any]:
+        self._prune()
+        existing = self._active.get((document_id, model))
+        if existing is not None:
+            return self._jobs[existing].to_dict()
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(RAG_JOB_CONCURRENCY)
+        job = _Job(document_id, model, batch_id)
+        self._jobs[job.id] = job
+        self._active[(document_id, model)] = job.id
+        task = asyncio.create_task(self._run(client, job), name=f"rag-index-{job.id}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job.to_dict()
+
+    def submit_batch(self, client: ElevenLabsClient, document_ids: List[str], model: str) -> Dict[str, Any]:
+        batch_id = uuid.uuid4().hex
+        # dict.fromkeys drops duplicate ids but keeps the order
+        jobs = [self.submit(client, document_id, model, batch_id) for document_id in dict.fromkeys(document_ids)]
+        self._batches[batch_id] = [j["job_id"] for j in jobs]
+        return {"batch_id": batch_id, "jobs": jobs}
+
+    # ------------------------------------------------------------------
+    # Status
+    # ------------------------------------------------------------------
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    def batch_job_ids(self, batch_id: str) -> Optional[List[str]]:
+        return self._batches.get(batch_id)
+
+    def get_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        job_ids = self._batches.get(batch_id)
+        if job_ids is None:
+            return None
+        jobs = [self._jobs[j].to_dict() for j in job_ids if j in self._jobs]
+        counts: Dict[str, int] = {}
+        for job in jobs:
+            counts[job["state"]] = counts.get(job["state"], 0) + 1
+        return {
+            "batch_id": batch_id,
+            "total": len(jobs),
+            "counts": counts,
+            "finished": all(job["state"] in FINISHED_STATES for job in jobs),
+            "jobs": jobs,
+        }
+
+    def all_finished(self, job_ids: Iterable[str]) -> bool:
+        return all(self._jobs[j].finished for j in job_ids if j in self._jobs)
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def subscribe(self, job_ids: Iterable[str]) -> _Watcher:
+        watcher = _Watcher(job_ids)
+        self._watchers.add(watcher)
+        return watcher
+
+    def unsubscribe(self, watcher: _Watcher) -> None:
+        self._watchers.discard(watcher)
+
+    def _update(self, job: _Job, **changes: Any) -> None:
+        for name, value in changes.items():
+            setattr(job, name, value)
+        job.updated_at = _now()
+        job.version += 1
+        if job.finished:
+            job.finished_at = time.monotonic()
+            self._active.pop((job.document_id, job.model), None)
+        snapshot = job.to_dict()
+        for watcher in list(self._watchers):
+            if job.id in watcher.job_ids:
+                watcher.queue.put_nowait(snapshot)
+
+    def _prune(self) -> None:
+        """Forget finished jobs (and emptied batches) past the retention period."""
+        cutoff = time.monotonic() - RAG_JOB_RETENTION_SECONDS
+        expired = [j.id for j in self._jobs.values() if j.finished_at is not None and j.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+        if expired:
+            for batch_id in [b for b, ids in self._batches.items() if not any(j in self._jobs for j in ids)]:
+                del self._batches[batch_id]
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    async def _run(self, client: ElevenLabsClient, job: _Job) -> None:
+        submitted = time.monotonic()
+        started: Optional[float] = None
+        try:
+            async with self._semaphore:
+                # The timeout covers the build, not the wait behind RAG_JOB_CONCURRENCY
+                started = time.monotonic()
+                self._update(job, state="running")
+                delay = RAG_POLL_INITIAL_SECONDS
+                errors = 0
+                while True:
+                    try:
+                        result = await asyncio.to_thread(client.compute_rag_index, job.document_id, job.model)
+                    except ElevenLabsError as e:
+                        errors += 1
+                        if errors >= RAG_JOB_MAX_ERRORS:
+                            self._update(job, state="failed", error=str(e))
+                            break
+                        log_event(logger, logging.WARNING, "rag_index_poll_failed", job_id=job.id, document_id=job.document_id, attempt=errors, error=str(e))
+                    else:
+                        errors = 0
+                        result = result if isinstance(result, dict) else {}
+                        rag_status = result.get("status")
+                        if rag_status in TERMINAL_STATUSES:
+                            self._update(
+                                job,
+                                state="succeeded" if rag_status == "succeeded" else "failed",
+                                rag_status=rag_status,
+                                progress=result.get("progress_percentage"),
+                                result=result,
+                                error=None if rag_status == "succeeded" else f"Index computation ended with status {rag_status}",
+                            )
+                            break
+                        if rag_status != job.rag_status or result.get("progress_percentage") != job.progress:
+                            self._update(job, rag_status=rag_status, progress=result.get("progress_percentage"))
+
+                    if time.monotonic() - started + delay > RAG_JOB_TIMEOUT_SECONDS:
+                        self._update(job, state="failed", error=f"Timed out after {RAG_JOB_TIMEOUT_SECONDS:g}s")
+                        break
+                    # Jitter keeps a batch from polling in lockstep
+                    await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+                    delay = min(delay * 2, RAG_POLL_MAX_SECONDS)
+        except asyncio.CancelledError:
+            self._update(job, state="failed", error="Cancelled (server shutting down)")
+            raise
+        except Exception as e:
+            logger.exception(f"RAG index job {job.id} crashed")
+            self._update(job, state="failed", error=str(e))
+        finally:
+            elevenlabs_cache.invalidate(key=("kb_doc", job.document_id))
+            log_event(
+                logger, logging.INFO if job.state == "succeeded" else logging.WARNING, "rag_index_job_finished",
+                job_id=job.id, document_id=job.document_id, model=job.model, state=job.state,
+                rag_status=job.rag_status,
+                queued_s=round((started or time.monotonic()) - submitted, 1),
+                elapsed_s=round(time.monotonic() - started, 1) if started is not None else 0.0,
+            )
+
+
+rag_index_jobs = RagIndexJobs()
@@ -2,7 +2,8 @@ from typing import List, Optional
 from postgrest import APIError
 
 from backend.config.supabase_client import supabase
-from backend.models.theme_model import Theme, ThemeCreate, ThemeUpdate
+from backend.models.theme_model import Theme, ThemeCreate, ThemePartial, ThemeUpdate
+from backend.utils.db_utils import select_columns
 
 def create_theme(theme_data: ThemeCreate) -> Theme:
     """Creates a new theme record."""
@@ -14,19 +15,21 @@ def create_theme(theme_data: ThemeCreate) -> Theme:
     except APIError as e:
         raise e
 
-def get_all_themes(skip: int = 0, limit: int = 100) -> List[Theme]:
-    """Retrieves a list of all themes."""
+def get_all_themes(skip: int = 0, limit: int = 100, fields: Optional[List[str]] = None) -> List[Theme]:
+    """Retrieves a list of all themes. `fields` limits the selected columns."""
     try:
-        response = supabase.table("themes").select("*").range(skip, skip + limit - 1).execute()
-        return [Theme(**item) for item in response.data] if response.data else []
+        response = supabase.table("themes").select(select_columns(fields)).range(skip, skip + limit - 1).execute()
+        model = ThemePartial if fields else Theme
+        return [model(**item) for item in response.data] if response.data else []
     except APIError as e:
         raise e
 
-def get_theme_by_id(theme_id: int) -> Optional[Theme]:
+def get_theme_by_id(theme_id: int, fields: Optional[List[str]] = None) -> Optional[Theme]:
     """Retrieves a single theme by its ID."""
     try:
-        response = supabase.table("themes").select("*").eq("theme_id", theme_id).single().execute()
-        return Theme(**response.data) if response.data else None
+        response = supabase.table("themes").select(select_columns(fields)).eq("theme_id", theme_id).single().execute()
+        model = ThemePartial if fields else Theme
+        return model(**response.data) if response.data else None
     except APIError as e:
         print(f"Error fetching theme by ID {theme_id}: {e.message}")
         return None
@@ -0,0 +1,214 @@
+"""
+transcript_store.py
+-------------------
+Compressed storage for call transcripts, kept out of the `call` table.
+
+A transcript is written once (post-call webhook) and read rarely (someone
+opens a call), but inline in `call` it rode along with every `select("*")`.
+Here it is compressed (zstd when the `zstandard` package is installed,
+gzip otherwise) and stored under its conv_id; `call` only keeps
+`transcript_chars` so listings and KPIs can tell whether a call had one.
+Transcripts are served by GET /calls/{conv_id}/transcript.
+
+Backends (TRANSCRIPT_STORE):
+    supabase    side table (default):
+                    create table call_transcripts (
+                        conv_id    text primary key,
+                        codec      text not null,
+                        data       text not null,        -- base64 of the compressed bytes
+                        size       integer not null,     -- uncompressed UTF-8 bytes
+                        created_at timestamptz not null default now()
+                    );
+                    alter table call add column transcript_chars integer;
+    filesystem  one file per call under TRANSCRIPT_STORE_DIR (local development,
+                or a mounted bucket)
+
+The blob is written before the `call` row (hence no foreign key), so a
+failed store write can fall back to keeping the transcript inline.
+The codec is stored with each blob, so changing TRANSCRIPT_CODEC only affects
+new writes.
+
+Existing inline transcripts are moved with:
+    python -m backend.services.transcript_store --migrate [--batch 200]
+"""
+
+import os
+import gzip
+import base64
+import logging
+import argparse
+from typing import Any, Dict, Optional, Tuple
+
+from backend.config.supabase_client import supabase
+
+try:
+    import zstandard
+except ImportError:  # optional; gzip is used without it
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPT_STORE = os.getenv("TRANSCRIPT_STORE", "supabase").lower()
+TRANSCRIPT_STORE_DIR = os.getenv("TRANSCRIPT_STORE_DIR", "transcripts")
+TRANSCRIPT_CODEC = os.getenv("TRANSCRIPT_CODEC", "zstd" if zstandard else "gzip").lower()
+TRANSCRIPT_TABLE = "call_transcripts"
+
+_EXTENSIONS = {"zstd": ".zst", "gzip": ".gz"}
+
+
+# ================== CODECS ==================
+
+def compress(text: str, codec: str = TRANSCRIPT_CODEC) -> Tuple[str, bytes]:
+    """(codec actually used, compressed bytes)."""
+    raw = text.encode("utf-8")
+    if codec == "zstd" and zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=10).compress(raw)
+    return "gzip", gzip.compress(raw, compresslevel=6)
+
+
+def decompress(codec: str, blob: bytes) -> str:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Transcript is zstd-compressed but the zstandard package is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(blob)
+    elif codec == "gzip":
+        raw = gzip.decompress(blob)
+    else:
+        raise ValueError(f"Unknown transcript codec: {codec}")
+    return raw.decode("utf-8")
+
+
+# ================== BACKENDS ==================
+
+def _safe_name(conv_id: str) -> str:
+    # conv_ids are "conv_<hex>", but never let one escape the directory
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in conv_id)
+
+
+def _path(conv_id: str, codec: str) -> str:
+    return os.path.join(TRANSCRIPT_STORE_DIR, _safe_name(conv_id) + _EXTENSIONS[codec])
+
+
+def _fs_put(conv_id: str, codec: str, blob: bytes) -> None:
+    os.makedirs(TRANSCRIPT_STORE_DIR, exist_ok=True)
+    path = _path(conv_id, codec)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(blob)
+    os.replace(tmp, path)
+
+
+def _fs_get(conv_id: str) -> Optional[Tuple[str, bytes]]:
+    for codec in _EXTENSIONS:
+        path = _path(conv_id, codec)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                return codec, f.read()
+    return None
+
+
+def _db_put(conv_id: str, codec: str, blob: bytes, size: int) -> None:
+    supabase.table(TRANSCRIPT_TABLE).upsert({
+        "conv_id": conv_id,
+        "codec": codec,
+        "data": base64.b64encode(blob).decode("ascii"),
+        "size": size,
+    }).execute()
+
+
+def _db_get(conv_id: str) -> Optional[Tuple[str, bytes]]:
+    resp = supabase.table(TRANSCRIPT_TABLE).select("codec, data").eq("conv_id", conv_id).limit(1).execute()
+    if not resp.data:
+        return None
+    row = resp.data[0]
+    return row["codec"], base64.b64decode(row["data"])
+
+
+# ================== PUBLIC API ==================
+
+def put_transcript(conv_id: str, text: str) -> Dict[str, Any]:
+    """Compress and store a transcript (overwrites). Returns size stats."""
+    codec, blob = compress(text)
+    size = len(text.encode("utf-8"))
+    if TRANSCRIPT_STORE == "filesystem":
+        _fs_put(conv_id, codec, blob)
+    else:
+        _db_put(conv_id, codec, blob, size)
+    return {"codec": codec, "size": size, "compressed_size": len(blob)}
+
+
+class TranscriptMissing(LookupError):
+    """The call row says it has a transcript, but the store has no blob for it."""
+
+    def __init__(self, conv_id: str):
+        self.conv_id = conv_id
+        super().__init__(f"Transcript for call {conv_id} is missing from the transcript store")
+
+
+def get_transcript(conv_id: str) -> Optional[str]:
+    """The stored transcript, or None if this call has none in the store."""
+    found = _fs_get(conv_id) if TRANSCRIPT_STORE == "filesystem" else _db_get(conv_id)
+    if found is None:
+        return None
+    return decompress(*found)
+
+
+def delete_transcript(conv_id: str) -> None:
+    if TRANSCRIPT_STORE == "filesystem":
+        for codec in _EXTENSIONS:
+            path = _path(conv_id, codec)
+            if os.path.exists(path):
+                os.remove(path)
+    else:
+        supabase.table(TRANSCRIPT_TABLE).delete().eq("conv_id", conv_id).execute()
+
+
+def offload_transcript(conv_id: str, text: Optional[str]) -> Dict[str, Any]:
+    """
+    Columns to write on the `call` row for this transcript: the text goes to
+    the store and the row keeps only its length. If the store is unavailable
+    the transcript stays inline so it is not lost.
+    """
+    if not text:
+        return {"transcript": None, "transcript_chars": 0}
+    try:
+        put_transcript(conv_id, text)
+    except Exception as e:
+        logger.error(f"Transcript offload failed for {conv_id}, keeping it inline: {e}")
+        return {"transcript": text, "transcript_chars": len(text)}
+    return {"transcript": None, "transcript_chars": len(text)}
+
+
+def migrate_inline_transcripts(batch: int = 200) -> int:
+    """Move transcripts still stored inline in `call` to the store. Returns the number moved."""
+    moved = 0
+    while True:
+        resp = (
+            supabase.table("call")
+            .select("conv_id, transcript")
+            .not_.is_("transcript", "null")
+            .limit(batch)
+            .execute()
+        )
+        rows = resp.data or []
+        if not rows:
+            return moved
+        for row in rows:
+            columns = offload_transcript(row["conv_id"], row["transcript"])
+            if columns["transcript"] is not None:
+                # Store failed; stop rather than re-reading the same rows forever
+                return moved
+            supabase.table("call").update(columns).eq("conv_id", row["conv_id"]).execute()
+            moved += 1
+        logger.info(f"Moved {moved} transcripts so far.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Call transcript store maintenance.")
+    parser.add_argument("--migrate", action="store_true", help="Move inline call.transcript values to the store.")
+    parser.add_argument("--batch", type=int, default=200)
+    args = parser.parse_args()
+    if not args.migrate:
+        parser.error("nothing to do (pass --migrate)")
+    logging.basicConfig(level=logging.INFO)
+    print(f"moved {migrate_inline_transcripts(args.batch)} transcripts to {TRANSCRIPT_STORE}")
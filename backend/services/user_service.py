@@ -1,9 +1,10 @@
 # services/employee_service.py
 import logging
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from backend.models.user_model import UserCreate, UserOut, ValidationRequest, UserUpdate, ValidationResponse
 from fastapi import HTTPException, status 
+from backend.utils.db_utils import keyset_page
 
 
 logger = logging.getLogger("user_service")
@@ -53,12 +54,22 @@ class UserService:
             self.client
             .table(self.table_name)
             .select("id, name, email, phone_number, branch_id, role")
+            # Same order as list_users_page, so offset pages line up with the keyset first page
+            .order("id", desc=True)
             .limit(limit)
             .offset(offset)
             .execute()
         )
         return getattr(resp, "data", []) or []
 
+    def list_users_page(self, limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        query = (
+            self.client
+            .table(self.table_name)
+            .select("id, name, email, phone_number, branch_id, role")
+        )
+        return keyset_page(query, None, "id", limit, cursor)
+
     def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         resp = (
             self.client
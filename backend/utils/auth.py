@@ -0,0 +1,163 @@
+"""
+auth.py
+-------
+Webhook signature verification shared by the ElevenLabs and PayU routers.
+
+Everything here is pure CPU work with no I/O: HMAC keys and hash prefixes
+are computed once per secret and cloned with `.copy()` per request, the
+timestamp window is checked before any hashing, and digests are compared
+in constant time.
+
+Usage:
+    from backend.utils.auth import verify_elevenlabs_webhook
+
+    @router.post("/post-call")
+    async def webhook(payload_body: bytes = Depends(verify_elevenlabs_webhook)):
+        ...
+"""
+
+import os
+import hmac
+import time
+import hashlib
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request, status
+
+logger = logging.getLogger(__name__)
+
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', 'config', 'keys.env'))
+
+# ElevenLabs: accept signatures up to 30 minutes old and at most 1 minute in the future
+ELEVENLABS_TOLERANCE_SECONDS = 30 * 60
+ELEVENLABS_FUTURE_SKEW_SECONDS = 60
+
+
+# ================== HMAC ==================
+
+class HmacKey:
+    """An HMAC keyed once; each digest clones the keyed state instead of re-deriving the pads."""
+
+    def __init__(self, secret: str, digestmod: Callable = hashlib.sha256):
+        self._base = hmac.new(secret.encode("utf-8"), digestmod=digestmod)
+
+    def hexdigest(self, *parts: bytes) -> str:
+        mac = self._base.copy()
+        for part in parts:
+            mac.update(part)
+        return mac.hexdigest()
+
+
+_hmac_keys: Dict[str, HmacKey] = {}
+
+
+def get_hmac_key(secret: str) -> HmacKey:
+    key = _hmac_keys.get(secret)
+    if key is None:
+        key = _hmac_keys[secret] = HmacKey(secret)
+    return key
+
+
+# ================== ELEVENLABS ==================
+
+def parse_elevenlabs_signature(signature_header: Optional[str]) -> Optional[Tuple[int, str]]:
+    """Parse "t=<timestamp>,v0=<hex>" into (timestamp, "v0=<hex>"), or None if malformed."""
+    if not signature_header:
+        return None
+    timestamp_part, sep, signature_part = signature_header.partition(",")
+    if not sep or "," in signature_part:
+        return None
+    if not timestamp_part.startswith("t=") or not signature_part.startswith("v0="):
+        return None
+    try:
+        return int(timestamp_part[2:]), signature_part
+    except ValueError:
+        return None
+
+
+def verify_elevenlabs_signature(
+    payload_body: bytes,
+    signature_header: Optional[str],
+    secret: Optional[str],
+    timestamp_tolerance_seconds: int = ELEVENLABS_TOLERANCE_SECONDS,
+    now: Optional[float] = None,
+) -> bool:
+    """
+    Verify an ElevenLabs webhook. The signed message is "<timestamp>.<raw body>";
+    stale or future timestamps are rejected before hashing.
+    """
+    if not secret:
+        return False
+    parsed = parse_elevenlabs_signature(signature_header)
+    if parsed is None:
+        logger.warning("ElevenLabs webhook: malformed signature header.")
+        return False
+    timestamp, received = parsed
+
+    current_time = int(time.time() if now is None else now)
+    if timestamp < current_time - timestamp_tolerance_seconds:
+        logger.warning("ElevenLabs webhook: timestamp too old.")
+        return False
+    if timestamp > current_time + ELEVENLABS_FUTURE_SKEW_SECONDS:
+        logger.warning("ElevenLabs webhook: timestamp in the future.")
+        return False
+
+    expected = "v0=" + get_hmac_key(secret).hexdigest(str(timestamp).encode("ascii"), b".", payload_body)
+    # Compare bytes: compare_digest raises TypeError on non-ASCII str, and the header is attacker-controlled
+    if not hmac.compare_digest(received.encode("utf-8"), expected.encode("ascii")):
+        logger.warning("ElevenLabs webhook: signature mismatch.")
+        return False
+    return True
+
+
+async def verify_elevenlabs_webhook(request: Request) -> bytes:
+    """
+    FastAPI dependency for ElevenLabs webhooks. Returns the raw body once the
+    'elevenlabs-signature' header checks out, otherwise responds 401.
+    """
+    payload_body = await request.body()
+    if not verify_elevenlabs_signature(
+        payload_body,
+        request.headers.get("elevenlabs-signature"),
+        os.getenv("POST_CALL_WEBHOOK_SECRET"),
+    ):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid signature")
+    return payload_body
+
+
+# ================== PAYU ==================
+
+# Reverse-hash tail per PayU, after SALT|status:
+# ||||||udf5|udf4|udf3|udf2|udf1|email|firstname|productinfo|amount|txnid|key
+_PAYU_REVERSE_FIELDS = ("udf5", "udf4", "udf3", "udf2", "udf1",
+                        "email", "firstname", "productinfo", "amount", "txnid", "key")
+
+_payu_prefixes: Dict[str, Any] = {}
+
+
+def payu_reverse_hash(p: dict, salt: str) -> str:
+    """
+    SHA-512 of SALT|status||||||udf5|...|txnid|key. If additionalCharges is
+    present it is prepended (additionalCharges|SALT|...), otherwise the hash
+    state for "SALT|" is computed once per salt and cloned.
+    """
+    tail = p.get("status", "") + "||||||" + "|".join(p.get(f, "") for f in _PAYU_REVERSE_FIELDS)
+    if p.get("additionalCharges"):
+        base = f"{p['additionalCharges']}|{salt}|{tail}"
+        return hashlib.sha512(base.encode("utf-8")).hexdigest()
+
+    prefix = _payu_prefixes.get(salt)
+    if prefix is None:
+        prefix = _payu_prefixes[salt] = hashlib.sha512(f"{salt}|".encode("utf-8"))
+    h = prefix.copy()
+    h.update(tail.encode("utf-8"))
+    return h.hexdigest()
+
+
+def verify_payu_hash(p: dict, salt: Optional[str]) -> bool:
+    received = p.get("hash") or ""
+    if not salt or not received:
+        return False
+    return hmac.compare_digest(payu_reverse_hash(p, salt).encode("ascii"), received.lower().encode("utf-8"))
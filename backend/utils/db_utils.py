@@ -0,0 +1,161 @@
+"""
+db_utils.py
+-----------
+Query helpers shared by the services.
+
+Keyset (cursor) pagination: instead of `.range(skip, skip + limit - 1)`, which
+makes Postgres walk and discard every skipped row, each page filters on the
+last row of the previous page, e.g. for calls ordered by (date_time, conv_id)
+descending:
+
+    WHERE date_time < :last_ts OR (date_time = :last_ts AND conv_id < :last_id)
+
+so page 5000 costs the same as page 1 given an index on the sort columns.
+The position is handed to clients as an opaque, URL-safe cursor string.
+
+Column projection: `parse_fields` turns a `?fields=a,b,c` query parameter into
+a validated column list for `.select()`, and `partial_model` builds the
+all-optional response model used when only some columns are returned.
+
+Usage:
+    rows, next_cursor = keyset_page(
+        supabase.table("call").select("*"), "date_time", "conv_id", limit, cursor
+    )
+"""
+
+import json
+import base64
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ConfigDict, Field, create_model
+
+# Response header carrying the cursor for the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor that was not produced by encode_cursor."""
+    pass
+
+
+def encode_cursor(values: List[Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Malformed cursor")
+    return values
+
+
+def _quote(value: Any) -> str:
+    """Quote a value for a PostgREST or=(...) filter (handles commas, dots and parens)."""
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def _after(query, sort_column: Optional[str], key_column: str, last_sort: Any, last_key: Any):
+    """Restrict `query` to rows strictly after (last_sort, last_key) in descending order."""
+    if sort_column is None:
+        return query.lt(key_column, last_key)
+    key = _quote(last_key)
+    if last_sort is None:
+        # Descending order puts NULLs first: continue within the NULLs, then everything else
+        return query.or_(f"and({sort_column}.is.null,{key_column}.lt.{key}),{sort_column}.not.is.null")
+    sort = _quote(last_sort)
+    return query.or_(f"{sort_column}.lt.{sort},and({sort_column}.eq.{sort},{key_column}.lt.{key})")
+
+
+def keyset_page(
+    query,
+    sort_column: Optional[str],
+    key_column: str,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Fetch one page of `query` (a select builder) ordered by (sort_column, key_column)
+    descending. `sort_column` may be None to page on the primary key alone.
+    The selected columns must include both keys.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    if cursor:
+        last_sort, last_key = decode_cursor(cursor, 2)
+        query = _after(query, sort_column, key_column, last_sort, last_key)
+
+    if sort_column is not None:
+        query = query.order(sort_column, desc=True)
+    query = query.order(key_column, desc=True)
+
+    # One extra row tells us whether another page exists without a count query
+    rows = getattr(query.limit(limit + 1).execute(), "data", None) or []
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    next_cursor = encode_cursor([last.get(sort_column) if sort_column else None, last[key_column]])
+    return rows, next_cursor
+
+
+# ================== PROJECTION ==================
+
+class InvalidFields(ValueError):
+    """Raised when `fields=` names a column the model does not expose."""
+    pass
+
+
+def parse_fields(
+    model: Type[BaseModel],
+    fields: Optional[str],
+    required: Iterable[str] = (),
+) -> Optional[List[str]]:
+    """
+    Validate a comma-separated `fields` parameter against `model`. Returns None
+    (select everything) when no fields were requested; otherwise the requested
+    columns plus `required` (e.g. the pagination keys), in a stable order.
+    """
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in model.model_fields]
+    if unknown:
+        raise InvalidFields(f"Unknown field(s): {', '.join(unknown)}")
+    columns = list(dict.fromkeys([*required, *requested]))
+    return columns or None
+
+
+def select_columns(columns: Optional[List[str]]) -> str:
+    """PostgREST select string for a parse_fields result."""
+    return ",".join(columns) if columns else "*"
+
+
+_partial_models: Dict[Type[BaseModel], Type[BaseModel]] = {}
+
+
+def partial_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    """
+    Same fields as `model`, all optional and unconstrained, so a row holding
+    only the selected columns validates. Routes using it should set
+    `response_model_exclude_unset=True` so unselected fields are omitted.
+    """
+    partial = _partial_models.get(model)
+    if partial is None:
+        definitions = {
+            name: (Optional[info.annotation], Field(None, description=info.description))
+            for name, info in model.model_fields.items()
+        }
+        partial = create_model(
+            f"{model.__name__}Partial",
+            __config__=ConfigDict(from_attributes=True),
+            **definitions,
+        )
+        _partial_models[model] = partial
+    return partial
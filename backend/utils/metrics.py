@@ -0,0 +1,182 @@
+"""
+metrics.py
+----------
+In-process request timing and external-dependency spans, exposed in the
+Prometheus text format on /metrics (see routers/metrics_router.py).
+
+Four histograms are kept:
+- http_request_duration_seconds{method, route, status}: end-to-end latency per route
+- dependency_call_duration_seconds{dependency, operation}: every Supabase /
+  Bookeo / PayU / ElevenLabs call
+- http_request_dependency_seconds{route, dependency}: per request, the total
+  time spent in each dependency, which shows what dominates a route's p99
+- upload_throughput_mb_per_second{target}: file uploads spooled to disk
+
+Usage:
+    from backend.utils.metrics import span
+
+    with span("payu", "create_payment_link"):
+        conn.request(...)
+"""
+
+import re
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Seconds; covers fast cached reads up to slow third-party calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_API_VERSION = re.compile(r"v\d+")
+
+# Per-request accumulator: dependency -> seconds (None outside a request)
+_request_breakdown: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_breakdown", default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # counts per bucket + [+Inf, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, labels))
+            sep = "," if base else ""
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {cumulative:g}'
+            cumulative += series[len(self.buckets)]
+            yield f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {cumulative:g}'
+            yield f"{self.name}_sum{{{base}}} {series[-1]:.6f}"
+            yield f"{self.name}_count{{{base}}} {cumulative:g}"
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route.",
+    ("method", "route", "status"),
+)
+DEPENDENCY_LATENCY = Histogram(
+    "dependency_call_duration_seconds",
+    "Latency of individual calls to external dependencies.",
+    ("dependency", "operation"),
+)
+REQUEST_DEPENDENCY_TIME = Histogram(
+    "http_request_dependency_seconds",
+    "Total time a single request spent in each external dependency.",
+    ("route", "dependency"),
+)
+UPLOAD_THROUGHPUT = Histogram(
+    "upload_throughput_mb_per_second",
+    "Throughput of file uploads spooled to disk (utils/upload_spool.py).",
+    ("target",),
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0),
+)
+
+
+# ================== SPANS ==================
+
+def record(dependency: str, operation: str, seconds: float) -> None:
+    """Record one external call (use when the duration is measured elsewhere, e.g. response.elapsed)."""
+    DEPENDENCY_LATENCY.observe((dependency, operation), seconds)
+    breakdown = _request_breakdown.get()
+    if breakdown is not None:
+        breakdown[dependency] = breakdown.get(dependency, 0.0) + seconds
+
+
+@contextmanager
+def span(dependency: str, operation: str = "call"):
+    """Time the enclosed block as one call to `dependency`. Do not nest spans of the same dependency."""
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        record(dependency, operation, perf_counter() - start)
+
+
+def path_label(path: str, depth: int = 2) -> str:
+    """Low-cardinality operation label: the first `depth` path segments, IDs dropped."""
+    segments = []
+    for segment in path.split("?", 1)[0].strip("/").split("/"):
+        if not segment or (any(c.isdigit() for c in segment) and not _API_VERSION.fullmatch(segment)):
+            break
+        segments.append(segment)
+        if len(segments) >= depth:
+            break
+    return "/" + "/".join(segments)
+
+
+# ================== MIDDLEWARE ==================
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    # Unmatched paths collapse into one series instead of one per URL
+    return path or "<unmatched>"
+
+
+class MetricsMiddleware:
+    """Plain ASGI middleware: times every HTTP request and collects its dependency breakdown."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        breakdown: Dict[str, float] = {}
+        token = _request_breakdown.set(breakdown)
+        status_code = 500
+        start = perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = perf_counter() - start
+            _request_breakdown.reset(token)
+            route = _route_label(scope)
+            REQUEST_LATENCY.observe((scope["method"], route, str(status_code)), elapsed)
+            for dependency, seconds in breakdown.items():
+                REQUEST_DEPENDENCY_TIME.observe((route, dependency), seconds)
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for histogram in (REQUEST_LATENCY, DEPENDENCY_LATENCY, REQUEST_DEPENDENCY_TIME, UPLOAD_THROUGHPUT):
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,71 @@
+"""
+phone.py
+--------
+Shared phone number normalization for WATI sends, customer upserts and
+call ingestion.
+
+Normalization matches the original WATI rule: keep one leading '+' if
+present and drop every other non-digit. Anything that normalizes to nothing
+(None, non-strings, no digits) becomes "".
+
+Usage:
+    from backend.utils.phone import normalize_phone, normalize_phones
+
+    normalize_phone(" +91 98765-43210 ")     # "+919876543210"
+    normalize_phones(["98765 43210", None])  # ["9876543210", ""]
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional
+
+_NON_DIGITS = re.compile(r"\D+")
+# Most numbers from Bookeo / ElevenLabs are already clean; skip the substitution for them
+_CLEAN = re.compile(r"\+?\d+")
+
+PHONE_CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=PHONE_CACHE_SIZE)
+def _normalize(p: str) -> str:
+    p = p.strip()
+    if _CLEAN.fullmatch(p):
+        return p
+    if p.startswith("+"):
+        digits = _NON_DIGITS.sub("", p[1:])
+        return "+" + digits if digits else ""
+    return _NON_DIGITS.sub("", p)
+
+
+def normalize_phone(p: Any) -> str:
+    """Normalize a single phone number; returns "" when it has no digits."""
+    if not isinstance(p, str):
+        return ""
+    return _normalize(p)
+
+
+def normalize_phones(values: Iterable[Any]) -> List[str]:
+    """
+    Normalize a whole column (e.g. one customer sync page) in one pass.
+    Duplicates are normalized once and the output keeps the input order.
+    """
+    seen = {}
+    out = []
+    for p in values:
+        if not isinstance(p, str):
+            out.append("")
+            continue
+        n = seen.get(p)
+        if n is None:
+            n = seen[p] = _normalize(p)
+        out.append(n)
+    return out
+
+
+def normalize_phone_or_none(p: Any) -> Optional[str]:
+    """Same as normalize_phone, but None instead of "" for DB columns."""
+    return normalize_phone(p) or None
+
+
+def cache_info():
+    return _normalize.cache_info()
@@ -0,0 +1,141 @@
+"""
+response_handlers.py
+--------------------
+Fast response path for large read endpoints.
+
+- FastJSONResponse: JSON rendered with orjson (falls back to the stdlib json
+  module if orjson is not installed). Returning it from a route skips
+  FastAPI's response_model validation and serialization.
+- construct_rows: build models from trusted database rows with
+  `model_construct` (no validation); only the columns present in the row are
+  serialized, so `fields=` projections stay intact.
+- stream_json_array: stream a JSON array item by item so large lists never
+  have to be held as a single encoded body.
+- make_etag / etag_matches / not_modified: conditional GETs for polled
+  endpoints; a matching If-None-Match is answered 304 before any work.
+- sse_event / SSE_HEADERS: server-sent event framing for push endpoints.
+
+Usage:
+    @router.get("/", response_model=List[Call])
+    def read_calls():
+        rows = construct_rows(Call, supabase.table("call").select("*").execute().data)
+        return FastJSONResponse(rows)
+"""
+
+import json
+import hashlib
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Type
+
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+# Items encoded per chunk when streaming arrays
+STREAM_CHUNK_ITEMS = 200
+
+# Browsers may keep the body but must revalidate (If-None-Match) on every use
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def _default(obj: Any) -> Any:
+    """Serialize what orjson does not handle natively (mostly constructed models)."""
+    if isinstance(obj, BaseModel):
+        # model_construct rows: emit exactly the columns the row had
+        return {name: getattr(obj, name) for name in obj.model_fields_set}
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def construct_rows(model: Type[BaseModel], rows: Optional[List[Dict[str, Any]]]) -> List[BaseModel]:
+    """Wrap trusted DB rows in `model` without running validation."""
+    construct = model.model_construct
+    return [construct(**row) for row in rows or []]
+
+
+def _iter_json_array(items: Iterable[Any], chunk_items: int) -> Iterator[bytes]:
+    yield b"["
+    first = True
+    chunk: List[bytes] = []
+    for item in items:
+        chunk.append(dumps(item))
+        if len(chunk) >= chunk_items:
+            yield (b"" if first else b",") + b",".join(chunk)
+            first = False
+            chunk = []
+    if chunk:
+        yield (b"" if first else b",") + b",".join(chunk)
+    yield b"]"
+
+
+def stream_json_array(
+    items: Iterable[Any],
+    headers: Optional[Dict[str, str]] = None,
+    chunk_items: int = STREAM_CHUNK_ITEMS,
+) -> StreamingResponse:
+    """Stream `items` (any iterable, e.g. a paged DB generator) as one JSON array."""
+    return StreamingResponse(
+        _iter_json_array(items, chunk_items),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+# ================== CONDITIONAL GET ==================
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag over everything the response depends on (data version, resolved filters, ...)."""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires."""
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
+
+
+# ================== SERVER-SENT EVENTS ==================
+
+# No caching, and no proxy buffering (nginx) so events are delivered as they are written
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+SSE_KEEPALIVE = b": keepalive\n\n"
+
+
+def sse_event(event: str, data: Any, event_id: Optional[Any] = None) -> bytes:
+    """One SSE frame; `data` is JSON-encoded on a single line."""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\n".encode("utf-8") + b"data: " + dumps(data) + b"\n\n"
@@ -0,0 +1,203 @@
+"""
+structured_logging.py
+---------------------
+Non-blocking, structured logging for the API and the reminder worker.
+
+`setup_logging()` puts a QueueHandler on the root logger: request threads
+only enqueue the record, and a QueueListener thread does the JSON
+formatting and the write to stderr. Anything logged through the stdlib
+`logging` module goes through it.
+
+`log_event()` is for hot paths (webhooks, reminder runs):
+- the sampling decision is made before any work is done, so a dropped
+  event costs one random() call. Warnings and errors are never sampled.
+- `payload=` is redacted (secrets, PII, transcripts) and size-capped
+  before it is attached to the record.
+
+Usage:
+    from backend.utils.structured_logging import log_event
+
+    log_event(logger, logging.INFO, "payu_webhook_received",
+              sample=WEBHOOK_LOG_SAMPLE_RATE, payload=form, txnid=txnid)
+
+Environment:
+    LOG_LEVEL              root level (default INFO)
+    LOG_FORMAT             "json" (default) or "text"
+    LOG_PAYLOAD_MAX_CHARS  cap on each logged string value (default 256)
+    LOG_REDACT_KEYS        extra comma-separated key fragments to redact
+"""
+
+import os
+import copy
+import json
+import queue
+import atexit
+import random
+import logging
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+PAYLOAD_MAX_CHARS = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "256"))
+PAYLOAD_MAX_ITEMS = 50
+PAYLOAD_MAX_DEPTH = 4
+
+# A key is redacted if its lowercased name contains any of these
+REDACT_KEY_FRAGMENTS = (
+    "hash", "salt", "secret", "token", "signature", "authorization", "password",
+    "api_key", "apikey", "email", "phone", "caller_number", "card", "address",
+    "transcript",
+) + tuple(k.strip().lower() for k in os.getenv("LOG_REDACT_KEYS", "").split(",") if k.strip())
+# ...or is exactly one of these
+REDACT_KEYS = {"key", "firstname", "lastname", "caller_name", "name_on_card", "customer_name"}
+
+REDACTED = "[redacted]"
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+# ================== REDACTION ==================
+
+def _redact_key(key: str) -> bool:
+    key = key.lower()
+    return key in REDACT_KEYS or any(fragment in key for fragment in REDACT_KEY_FRAGMENTS)
+
+
+def redact(value: Any, max_chars: int = PAYLOAD_MAX_CHARS, _depth: int = 0) -> Any:
+    """
+    Copy of `value` that is safe to log: sensitive keys are masked, strings
+    are cut at `max_chars`, containers at PAYLOAD_MAX_ITEMS entries and
+    nesting at PAYLOAD_MAX_DEPTH levels.
+    """
+    if isinstance(value, str):
+        return value if len(value) <= max_chars else f"{value[:max_chars]}...[{len(value)} chars]"
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if _depth >= PAYLOAD_MAX_DEPTH:
+        return f"[{type(value).__name__}]"
+    if hasattr(value, "items"):
+        out = {}
+        for i, (k, v) in enumerate(value.items()):
+            if i >= PAYLOAD_MAX_ITEMS:
+                out["..."] = f"{len(value) - PAYLOAD_MAX_ITEMS} more keys"
+                break
+            k = str(k)
+            out[k] = REDACTED if _redact_key(k) else redact(v, max_chars, _depth + 1)
+        return out
+    if isinstance(value, (list, tuple, set)):
+        items = [redact(v, max_chars, _depth + 1) for v in list(value)[:PAYLOAD_MAX_ITEMS]]
+        if len(value) > PAYLOAD_MAX_ITEMS:
+            items.append(f"... {len(value) - PAYLOAD_MAX_ITEMS} more items")
+        return items
+    return redact(str(value), max_chars, _depth)
+
+
+# ================== EVENTS ==================
+
+def log_event(
+    logger: logging.Logger,
+    level: int,
+    event: str,
+    *,
+    sample: float = 1.0,
+    payload: Any = None,
+    exc_info: bool = False,
+    **fields: Any,
+) -> None:
+    """
+    Log a structured event. `fields` become top-level JSON keys; `payload`
+    is redacted and capped first. INFO/DEBUG events are kept with probability
+    `sample`.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    if level < logging.WARNING and sample < 1.0 and random.random() >= sample:
+        return
+    if payload is not None:
+        fields["payload"] = redact(payload)
+    if sample < 1.0:
+        fields["sample_rate"] = sample
+    logger.log(level, event, extra=fields, exc_info=exc_info, stacklevel=2)
+
+
+# ================== FORMATTING ==================
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, any `extra=` fields, exc."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _QueueHandler(QueueHandler):
+    """
+    Enqueue the record with only the cheap work done: the message is
+    interpolated and the traceback rendered (arguments and exc_info may not
+    survive the thread hop), but JSON formatting is left to the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(level: str = LOG_LEVEL) -> None:
+    """
+    Route the root logger through a queue and a background writer thread.
+    Safe to call more than once; only the first call configures anything.
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+
+        stream = logging.StreamHandler()
+        if LOG_FORMAT == "text":
+            stream.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(name)s - %(message)s"))
+        else:
+            stream.setFormatter(JsonFormatter())
+
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_QueueHandler(log_queue))
+        root.setLevel(level)
+
+        _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
@@ -0,0 +1,119 @@
+"""
+upload_spool.py
+---------------
+Copies an upload to an anonymous temp file in fixed-size chunks, so a
+multi-hundred-MB document costs one chunk of memory instead of its full size.
+
+- The size limit is enforced while copying: the upload is abandoned as soon
+  as it passes `max_bytes`, not after it has been read in full.
+- Throughput (bytes, seconds, MB/s) is logged and recorded in the
+  upload_throughput_mb_per_second histogram on /metrics.
+- The temp file has no directory entry and is gone when closed (or when the
+  process dies), so there is nothing to clean up.
+
+Usage:
+    from backend.utils.upload_spool import UploadTooLarge, spool_upload
+
+    try:
+        with await spool_upload(file, "kb_document") as handle:
+            client.create_knowledge_base_document_from_file(handle, handle.name)
+    except UploadTooLarge as e:
+        ...
+"""
+
+import os
+import time
+import logging
+import tempfile
+from typing import AsyncIterator, BinaryIO, Optional
+
+from backend.utils.metrics import UPLOAD_THROUGHPUT
+from backend.utils.structured_logging import log_event
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for one knowledge-base document
+KB_UPLOAD_MAX_BYTES = int(os.getenv("KB_UPLOAD_MAX_BYTES", str(512 * 1024 * 1024)))
+# Read size per chunk; also the peak memory an upload costs
+KB_UPLOAD_CHUNK_BYTES = int(os.getenv("KB_UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        super().__init__(f"Upload exceeds the {max_bytes / (1024 * 1024):g} MB limit")
+
+
+def check_declared_size(content_length: Optional[str], max_bytes: int = KB_UPLOAD_MAX_BYTES) -> None:
+    """Reject up front when the client's Content-Length is already over the limit."""
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise UploadTooLarge(max_bytes)
+
+
+async def spool_chunks(
+    chunks: AsyncIterator[bytes],
+    filename: Optional[str],
+    target: str,
+    max_bytes: int = KB_UPLOAD_MAX_BYTES,
+) -> BinaryIO:
+    """
+    Write `chunks` to a temp file and return it rewound, with `.name` set to
+    `filename` (the SDK takes the document's file name from it). The caller
+    closes it. Raises UploadTooLarge once more than `max_bytes` has arrived.
+    """
+    handle = tempfile.TemporaryFile()
+    total = 0
+    started = time.perf_counter()
+    try:
+        async for chunk in chunks:
+            total += len(chunk)
+            if total > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            handle.write(chunk)
+        handle.flush()
+        handle.seek(0)
+    except BaseException:
+        handle.close()
+        log_event(logger, logging.WARNING, "upload_spool_aborted", target=target, file_name=filename, bytes=total)
+        raise
+
+    handle.raw.name = filename or "upload"
+    seconds = time.perf_counter() - started
+    mb_per_s = total / (1024 * 1024) / seconds if seconds > 0 else 0.0
+    UPLOAD_THROUGHPUT.observe((target,), mb_per_s)
+    log_event(
+        logger, logging.INFO, "upload_spooled",
+        target=target, file_name=filename, bytes=total,
+        seconds=round(seconds, 3), mb_per_s=round(mb_per_s, 1),
+    )
+    return handle
+
+
+async def _upload_chunks(file, chunk_bytes: int) -> AsyncIterator[bytes]:
+    while chunk := await file.read(chunk_bytes):
+        yield chunk
+
+
+async def spool_upload(
+    file,
+    target: str,
+    max_bytes: int = KB_UPLOAD_MAX_BYTES,
+    chunk_bytes: int = KB_UPLOAD_CHUNK_BYTES,
+) -> BinaryIO:
+    """`spool_chunks` for a FastAPI UploadFile, read `chunk_bytes` at a time."""
+    return await spool_chunks(_upload_chunks(file, chunk_bytes), file.filename, target, max_bytes)
+
+
+async def spool_request_body(
+    request,
+    filename: Optional[str],
+    target: str,
+    max_bytes: int = KB_UPLOAD_MAX_BYTES,
+) -> BinaryIO:
+    """
+    `spool_chunks` for a raw request body. Unlike a multipart UploadFile,
+    which Starlette has fully received before the route runs, this stops
+    reading the socket as soon as the limit is passed.
+    """
+    check_declared_size(request.headers.get("content-length"), max_bytes)
+    return await spool_chunks(request.stream(), filename, target, max_bytes)